@@ -55,7 +55,22 @@ app.UseSwaggerUI(c =>
 });
 
 // Serve static files (must come before routing)
-app.UseStaticFiles();
+app.UseStaticFiles(new StaticFileOptions
+{
+    OnPrepareResponse = ctx =>
+    {
+        var path = ctx.Context.Request.Path;
+        if (path.StartsWithSegments("/assets/dist"))
+        {
+            // Content-hashed names from publish_assets.py: new bytes always get a new URL
+            ctx.Context.Response.Headers.CacheControl = "public, max-age=31536000, immutable";
+        }
+        else if (path.Equals("/assets/manifest.json"))
+        {
+            ctx.Context.Response.Headers.CacheControl = "no-cache";
+        }
+    }
+});
 
 app.UseHttpsRedirection();
 app.UseAuthorization();
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Batch QR Code Generator for Job Fair Attendees
+Streams rows (url, name, style, logo) from a CSV or JSONL file and
+renders one styled QR code per row across a process pool
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import qr_profile
+from png_output import save_png
+
+STYLES = ("premium", "modern", "colorful", "classic")
+DEFAULT_STYLE = "premium"
+
+
+def read_rows(path, fmt=None):
+    """Yield attendee rows one at a time so the input is never fully loaded"""
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            for row in csv.DictReader(f):
+                yield {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def output_name(row, card=None, compact=True):
+    """Build a deterministic file name from the row contents (and the card template, if any)
+
+    compact=False (URLs encoded exactly as written) draws a different code,
+    so it gets a different name.
+    """
+    name = row.get("name") or "qr"
+    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")[:40] or "qr"
+    key = "\n".join(str(row.get(k) or "") for k in ("url", "style", "logo"))
+    if card:
+        key += f"\n{card}"
+    if not compact:
+        key += "\nkeep-case"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:10]
+    return f"{slug}-{digest}.png"
+
+
+def write_atomic(img, path):
+    """Save an image next to its destination, then rename it into place"""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".png", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            save_png(img, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def row_logo(row, size=100, atlas=None):
+    """The row's logo at size, or None: a sprite when the atlas has it at size, else create_logo (a file or style)"""
+    from generate_qr import create_logo
+
+    logo = row.get("logo")
+    if not logo:
+        return None
+    with qr_profile.stage("logo"):
+        if atlas and not os.path.exists(logo):
+            from logo_registry import open_atlas
+
+            # Opened once per worker; every worker maps the same raw pixels. Only exact
+            # sizes come from the atlas: a resampled sprite differs from a direct render
+            sprites = open_atlas(atlas)
+            if str(size) in sprites.sprites.get(logo, {}):
+                return sprites.get(logo, size)
+        return create_logo(size=size, logo_path=logo)
+
+
+def _card_qr(layout, row, style, verify, compact, atlas=None):
+    """The row's code drawn straight at the size of the card's qr slot, logo scaled to match"""
+    import qrcode
+
+    from create_premium_qr import create_beautiful_qr
+    from qr_matrix import get_matrix, module_pitch
+
+    size = min(layout.slot_size("qr"))
+    logo = None
+    if row.get("logo"):
+        matrix = get_matrix(row["url"], error_correction=qrcode.constants.ERROR_CORRECT_H, compact=compact)
+        scale = module_pitch(matrix, box_size=12, size=size) / 12
+        logo = row_logo(row, round(100 * scale), atlas)
+    return create_beautiful_qr(row["url"], style, logo=logo, size=size, verify=verify, compact=compact)
+
+
+def render_row(row, out_dir, verify=False, compact=True, card=None, atlas=None):
+    """Render and save one QR code, or one card from card_templates.json (runs inside a worker process)"""
+    from create_premium_qr import create_beautiful_qr
+
+    url = row.get("url")
+    if not url:
+        raise ValueError("row has no url")
+
+    style = row.get("style") or DEFAULT_STYLE
+    if style not in STYLES:
+        raise ValueError(f"unknown style {style!r} (expected one of {', '.join(STYLES)})")
+
+    if card:
+        from card_layout import display_url, get_layout
+
+        layout = get_layout(card)
+        fields = {"qr": _card_qr(layout, row, style, verify, compact, atlas), "url": display_url(url)}
+        # Text fields come from the row only: a template default (the site owner's name) must
+        # never end up on an attendee's card, so a missing value prints as blank
+        slots = {field for field, _ in layout.images}
+        for field in layout.fields:
+            if field not in fields and field not in slots:
+                fields[field] = row.get(field) or ""
+        with qr_profile.stage("card"):
+            img = layout.render(**fields)
+    else:
+        img = create_beautiful_qr(url, style, logo=row_logo(row, 100, atlas), verify=verify, compact=compact)
+
+    path = os.path.join(out_dir, output_name(row, card, compact))
+    with qr_profile.stage("save"):
+        write_atomic(img, path)
+    return path
+
+
+def render_row_profiled(row, out_dir, verify=False, compact=True, card=None, atlas=None):
+    """render_row with stage profiling on; returns the worker's stage records"""
+    qr_profile.enable(memory=os.environ.get("QR_PROFILE_MEMORY", "1") not in ("", "0"))
+    try:
+        with qr_profile.stage("row"):
+            render_row(row, out_dir, verify, compact, card, atlas)
+    finally:
+        records = qr_profile.take_records()
+    return records
+
+
+def _stack_entry(row, compact, atlas=None):
+    """(matrix, style, logo) for one row, validated like render_row"""
+    import qrcode
+
+    from qr_matrix import get_matrix
+
+    url = row.get("url")
+    if not url:
+        raise ValueError("row has no url")
+    style = row.get("style") or DEFAULT_STYLE
+    if style not in STYLES:
+        raise ValueError(f"unknown style {style!r} (expected one of {', '.join(STYLES)})")
+
+    with qr_profile.stage("encode"):
+        matrix = get_matrix(url, error_correction=qrcode.constants.ERROR_CORRECT_H, compact=compact)
+    return matrix, style, row_logo(row, 100, atlas)
+
+
+def render_chunk(rows, out_dir, verify=False, compact=True, profile=False, atlas=None):
+    """Render [(line_no, row)] as stacks of same-version codes (see qr_stack.py)
+
+    Returns (succeeded, [(line_no, error)], stage records); a bad row fails
+    on its own without taking the rest of its stack down.
+    """
+    import qrcode
+
+    from qr_matrix import module_geometry
+    from qr_stack import render_stack
+    from qr_verify import check_raster
+
+    if profile:
+        qr_profile.enable(memory=os.environ.get("QR_PROFILE_MEMORY", "1") not in ("", "0"))
+    succeeded = 0
+    errors = []
+    groups = {}
+    try:
+        for line_no, row in rows:
+            try:
+                matrix, style, logo = _stack_entry(row, compact, atlas)
+            except Exception as e:
+                errors.append((line_no, str(e)))
+                continue
+            groups.setdefault(len(matrix), []).append((line_no, row, matrix, style, logo))
+
+        for group in groups.values():
+            with qr_profile.stage("composite"):
+                images = render_stack([entry[2] for entry in group], [entry[3] for entry in group],
+                                      [entry[4] for entry in group])
+            for (line_no, row, matrix, _, _), img in zip(group, images):
+                try:
+                    if verify:
+                        origin, pitch = module_geometry(matrix, box_size=12)
+                        with qr_profile.stage("verify"):
+                            check_raster(img, matrix, qrcode.constants.ERROR_CORRECT_H, origin=origin, pitch=pitch)
+                    with qr_profile.stage("save"):
+                        write_atomic(img, os.path.join(out_dir, output_name(row, compact=compact)))
+                    succeeded += 1
+                except Exception as e:
+                    errors.append((line_no, str(e)))
+    finally:
+        records = qr_profile.take_records() if profile else []
+    return succeeded, errors, records
+
+
+def run_batch(input_path, out_dir, workers=None, fmt=None, max_in_flight=None, verify=False, profile=False,
+              compact=True, stack=None, card=None, atlas=None):
+    """Render every row of the input file and return (succeeded, failed, seconds)
+
+    compact uppercases each URL's scheme and host so it encodes in a
+    smaller version (see qr_payload.py); paths keep their case.
+
+    With profile=True each worker records its stages and the records are
+    merged into this process (see qr_profile.records()).
+
+    With stack set, workers take chunks of that many rows and composite
+    each chunk's same-version codes in one pass (render_chunk) instead of
+    rendering row by row; the images are the same.
+
+    card names a card_templates.json layout with a qr slot: every row then
+    becomes a finished card with its name and URL filled in (row by row
+    only, not with stack).
+
+    atlas is a logo_registry atlas (PNG or JSON index): rows whose logo
+    names one of its sprites get it sliced from the memory-mapped atlas.
+    """
+    if stack and card:
+        raise ValueError("Cards are rendered row by row; stack does not apply")
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    # Only a fixed window of rows (or chunks) is ever queued, which keeps memory bounded
+    max_in_flight = max_in_flight or workers * (2 if stack else 4)
+
+    succeeded = failed = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def drain(return_when):
+            nonlocal succeeded, failed
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                line_no = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"⚠️ Row {line_no}: {e}", file=sys.stderr)
+                    continue
+                if stack:
+                    done_rows, errors, result = result
+                    succeeded += done_rows
+                    failed += len(errors)
+                    for error_line, error in errors:
+                        print(f"⚠️ Row {error_line}: {error}", file=sys.stderr)
+                else:
+                    succeeded += 1
+                if profile:
+                    qr_profile.add_records(result)
+
+        def submit(*args):
+            if len(pending) >= max_in_flight:
+                drain(FIRST_COMPLETED)
+            task = render_chunk if stack else render_row_profiled if profile else render_row
+            pending[pool.submit(task, *args)] = line_no
+
+        chunk = []
+        for line_no, row in enumerate(read_rows(input_path, fmt), start=1):
+            if not stack:
+                submit(row, out_dir, verify, compact, card, atlas)
+                continue
+            chunk.append((line_no, row))
+            if len(chunk) >= stack:
+                submit(chunk, out_dir, verify, compact, profile, atlas)
+                chunk = []
+        if chunk:
+            submit(chunk, out_dir, verify, compact, profile, atlas)
+
+        while pending:
+            drain(FIRST_COMPLETED)
+
+    return succeeded, failed, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate one styled QR code per attendee row")
+    parser.add_argument("input", help="CSV or JSONL file with url, name, style, logo columns")
+    parser.add_argument("-o", "--out", default="qr_batch", help="output directory (default: qr_batch)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="input format (default: from extension)")
+    parser.add_argument("--verify", action="store_true",
+                        help="fail rows whose logo damages the code beyond its error correction budget")
+    parser.add_argument("--keep-case", action="store_true",
+                        help="encode URLs exactly as given instead of uppercasing scheme and host")
+    parser.add_argument("--stack", type=int, nargs="?", const=0, metavar="N",
+                        help="hand workers N rows at a time and composite same-version codes together "
+                             "(default N: 128; see qr_stack.py)")
+    parser.add_argument("--card", metavar="TEMPLATE",
+                        help="render each row onto a card from card_templates.json, e.g. business")
+    parser.add_argument("--atlas", nargs="?", const="", metavar="PNG",
+                        help="slice logos named by style (logo column, e.g. tech) from this sprite atlas "
+                             "(default: wwwroot/assets/logo-atlas.png)")
+    parser.add_argument("--profile", action="store_true", help="print per-stage timings aggregated over all rows")
+    parser.add_argument("--profile-jsonl", help="also write every stage record to this JSON lines file")
+    args = parser.parse_args(argv)
+
+    profile = args.profile or bool(args.profile_jsonl)
+    if args.atlas == "":
+        from logo_registry import ATLAS_PATH
+
+        args.atlas = ATLAS_PATH
+    if args.card:
+        if args.stack is not None:
+            parser.error("--card renders row by row and cannot be combined with --stack")
+        from card_layout import get_layout
+
+        try:
+            get_layout(args.card).slot_size("qr")
+        except KeyError as e:
+            parser.error(e.args[0])
+    if args.stack == 0:
+        from qr_stack import DEFAULT_STACK_SIZE
+
+        args.stack = DEFAULT_STACK_SIZE
+    succeeded, failed, seconds = run_batch(args.input, args.out, args.workers, args.format, verify=args.verify,
+                                           profile=profile, compact=not args.keep_case, stack=args.stack,
+                                           card=args.card, atlas=args.atlas)
+    rate = succeeded / seconds if seconds else 0.0
+
+    print(f"✅ Generated {succeeded} QR codes in {seconds:.2f}s ({rate:.1f} codes/sec)")
+    print(f"📁 Saved in: {args.out}")
+    if failed:
+        print(f"⚠️ {failed} rows failed")
+    if profile:
+        print(qr_profile.format_summary())
+        if args.profile_jsonl:
+            qr_profile.write_jsonl(args.profile_jsonl)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for the QR and Logo Generators
+Runs deterministic, offline workloads (single codes, the premium
+collection, every logo style at several sizes and batch throughput),
+writes the results as JSON and fails when they regress past a stored
+baseline
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_THRESHOLD = 0.25         # 25% slower (or lower throughput) is a regression
+DEFAULT_MEMORY_THRESHOLD = 0.50  # 50% more peak memory is a regression
+MIN_DELTA_MS = 1.0               # Ignore slowdowns smaller than this (timer noise on tiny logos)
+
+BENCH_URL = "https://lotriet.dev"
+STYLES = ("premium", "modern", "colorful", "classic")
+LOGO_SIZES = (100, 200, 400)
+BATCH_SIZES = (1000, 10000)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the generators' progress output while they are timed"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def measure(func, rounds, setup=None, memory=True):
+    """Time func over several rounds and return latency and peak allocation stats
+
+    setup runs before every round outside the timed region (e.g. to clear
+    caches for a cold measurement); one extra untimed round under
+    tracemalloc gives the peak Python allocation.
+    """
+    times = []
+    for _ in range(rounds):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+
+    result = {
+        "rounds": rounds,
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+        "max_ms": round(max(times), 3),
+    }
+
+    if memory:
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            func()
+            result["peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def _clear_caches():
+    import card_layout
+    import logo_cache
+    import qr_matrix
+
+    card_layout.cache_clear()
+    qr_matrix.cache_clear()
+    logo_cache.default_cache.clear(disk=True)
+
+
+def bench_single(rounds):
+    """Latency of one create_beautiful_qr call per style, cold and warm"""
+    from create_premium_qr import create_beautiful_qr
+
+    results = {}
+    for style in STYLES:
+        results[f"single/{style}/cold"] = measure(
+            lambda: create_beautiful_qr(BENCH_URL, style), rounds, setup=_clear_caches)
+        create_beautiful_qr(BENCH_URL, style)
+        results[f"single/{style}/warm"] = measure(lambda: create_beautiful_qr(BENCH_URL, style), rounds)
+    return results
+
+
+def bench_portfolio(rounds):
+    """The classic portfolio card and the full premium collection (both write PNGs)"""
+    from create_premium_qr import create_portfolio_qr_premium
+    from generate_qr import create_portfolio_qr
+
+    def run(func):
+        with quiet():
+            func()
+
+    return {
+        "portfolio_card/cold": measure(lambda: run(create_portfolio_qr), rounds, setup=_clear_caches),
+        "premium_collection/cold": measure(lambda: run(create_portfolio_qr_premium), rounds,
+                                           setup=_clear_caches),
+        "premium_collection/warm": measure(lambda: run(create_portfolio_qr_premium), rounds),
+    }
+
+
+def bench_logos(rounds):
+    """Every logo style at several sizes, rendered without the logo cache"""
+    from create_advanced_logos import (create_business_logo, create_coffee_logo, create_creative_logo,
+                                       create_tech_logo)
+    from create_premium_qr import create_premium_logo
+    from create_sample_logo import render_sample_logo
+
+    renderers = {
+        "coffee": create_coffee_logo.uncached,
+        "tech": create_tech_logo.uncached,
+        "business": create_business_logo.uncached,
+        "creative": create_creative_logo.uncached,
+        "sample": render_sample_logo.uncached,
+        "premium-gradient": lambda size: create_premium_logo.uncached(size=size, style="gradient"),
+        "premium-modern": lambda size: create_premium_logo.uncached(size=size, style="modern"),
+        "premium-glass": lambda size: create_premium_logo.uncached(size=size, style="glass"),
+    }
+
+    results = {}
+    for name, render in renderers.items():
+        for size in LOGO_SIZES:
+            results[f"logo/{name}/{size}"] = measure(lambda: render(size=size), rounds)
+    return results
+
+
+def bench_modules(rounds):
+    """Styled module rendering of a version 40 code (177x177) at 20 px per module"""
+    import qrcode
+
+    from qr_matrix import get_matrix
+    from qr_modules import MODULE_STYLES, render_styled
+
+    matrix = get_matrix(BENCH_URL, error_correction=qrcode.constants.ERROR_CORRECT_L, version=40)
+    results = {}
+    for module in MODULE_STYLES:
+        results[f"modules/{module}/v40"] = measure(
+            lambda: render_styled(matrix, 20, module=module, finder="rounded"), rounds)
+    return results
+
+
+def write_batch_input(path, count, logo_path):
+    """Write a deterministic attendee CSV: styles cycle and every 10th row has a logo"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["url", "name", "style", "logo"])
+        for i in range(count):
+            writer.writerow([
+                f"https://jobfair.example/attendee/{i:05d}",
+                f"Attendee {i:05d}",
+                STYLES[i % len(STYLES)],
+                logo_path if i % 10 == 0 else "",
+            ])
+
+
+def bench_batch(sizes, workers, workdir):
+    """Batch throughput (codes/sec) through batch_qr.run_batch"""
+    from batch_qr import run_batch
+
+    results = {}
+    for count in sizes:
+        input_path = os.path.join(workdir, f"attendees-{count}.csv")
+        out_dir = os.path.join(workdir, f"batch-{count}")
+        write_batch_input(input_path, count, os.path.join(workdir, "logo.png"))
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            succeeded, failed, seconds = run_batch(input_path, out_dir, workers)
+        if failed:
+            raise RuntimeError(f"batch of {count} had {failed} failed rows")
+
+        results[f"batch/{count}"] = {
+            "rounds": 1,
+            "codes": succeeded,
+            "workers": workers,
+            "seconds": round(seconds, 3),
+            "codes_per_sec": round(succeeded / seconds, 2),
+            "worker_max_rss_kb": _children_max_rss_kb(),
+        }
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return results
+
+
+def _children_max_rss_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def environment():
+    """Describe the machine and library versions the numbers were taken on"""
+    import PIL
+    import qrcode
+
+    try:
+        from importlib.metadata import version
+        qrcode_version = version("qrcode")
+    except Exception:
+        qrcode_version = getattr(qrcode, "__version__", "unknown")
+
+    return {
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "qrcode": qrcode_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, memory_threshold=DEFAULT_MEMORY_THRESHOLD):
+    """Return (lines, regressions) comparing results against a baseline's results"""
+    lines, regressions = [], []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            lines.append(f"  {name:<36} new")
+            continue
+
+        checks = []
+        # The fastest round is the least disturbed by other load on the machine
+        if "min_ms" in current and "min_ms" in previous:
+            checks.append(("min_ms", current["min_ms"] / previous["min_ms"] - 1, threshold))
+        if "codes_per_sec" in current and "codes_per_sec" in previous:
+            checks.append(("codes_per_sec", previous["codes_per_sec"] / current["codes_per_sec"] - 1, threshold))
+        if current.get("peak_kb") and previous.get("peak_kb"):
+            checks.append(("peak_kb", current["peak_kb"] / previous["peak_kb"] - 1, memory_threshold))
+
+        for metric, change, limit in checks:
+            regressed = change > limit
+            if metric == "min_ms" and current[metric] - previous[metric] < MIN_DELTA_MS:
+                regressed = False
+            flag = "REGRESSION" if regressed else ""
+            lines.append(f"  {name:<36} {metric:<14} {previous[metric]:>12,.2f} -> {current[metric]:>12,.2f} "
+                         f"({change:+.0%}) {flag}".rstrip())
+            if regressed:
+                regressions.append(f"{name} {metric}")
+    return lines, regressions
+
+
+def run_suite(quick=False, rounds=None, batch_sizes=None, workers=None, only=None):
+    """Run the selected workloads in a scratch directory and return the results dict"""
+    rounds = rounds or (3 if quick else 7)
+    batch_sizes = batch_sizes or ((100,) if quick else BATCH_SIZES)
+    workers = workers or os.cpu_count() or 1
+    groups = only or ("single", "portfolio", "logos", "modules", "batch")
+
+    workdir = tempfile.mkdtemp(prefix="qr-bench-")
+    cwd = os.getcwd()
+    # Fresh, private logo cache so earlier runs cannot turn misses into hits
+    import logo_cache
+    saved_dir = logo_cache.default_cache.disk_dir
+    saved_env = os.environ.get("QR_LOGO_CACHE_DIR")
+    logo_cache.default_cache.disk_dir = os.environ["QR_LOGO_CACHE_DIR"] = os.path.join(workdir, "logo_cache")
+    logo_cache.default_cache.clear()
+    try:
+        os.chdir(workdir)
+        from create_sample_logo import render_sample_logo
+        render_sample_logo.uncached().save("logo.png")
+
+        results = {}
+        if "single" in groups:
+            results.update(bench_single(rounds))
+        if "portfolio" in groups:
+            results.update(bench_portfolio(rounds))
+        if "logos" in groups:
+            results.update(bench_logos(rounds))
+        if "modules" in groups:
+            results.update(bench_modules(rounds))
+        if "batch" in groups:
+            results.update(bench_batch(batch_sizes, workers, workdir))
+        return results
+    finally:
+        os.chdir(cwd)
+        logo_cache.default_cache.disk_dir = saved_dir
+        logo_cache.default_cache.clear()
+        # Batch workers read the cache directory from the environment; do not leak ours
+        if saved_env is None:
+            os.environ.pop("QR_LOGO_CACHE_DIR", None)
+        else:
+            os.environ["QR_LOGO_CACHE_DIR"] = saved_env
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def format_results(results):
+    lines = [f"{'benchmark':<36} {'median ms':>10} {'min ms':>10} {'peak KB':>10} {'codes/sec':>10}"]
+    lines.append("-" * len(lines[0]))
+    for name, r in results.items():
+        median = f"{r['median_ms']:,.2f}" if "median_ms" in r else "-"
+        minimum = f"{r['min_ms']:,.2f}" if "min_ms" in r else "-"
+        peak = f"{r['peak_kb']:,.0f}" if r.get("peak_kb") else "-"
+        rate = f"{r['codes_per_sec']:,.1f}" if "codes_per_sec" in r else "-"
+        lines.append(f"{name:<36} {median:>10} {minimum:>10} {peak:>10} {rate:>10}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the QR and logo generators")
+    parser.add_argument("--quick", action="store_true", help="fewer rounds and a 100-code batch")
+    parser.add_argument("--rounds", type=int, help="timed rounds per benchmark (default 7, quick 3)")
+    parser.add_argument("--batch-sizes", help="comma separated batch sizes (default 1000,10000)")
+    parser.add_argument("-w", "--workers", type=int, help="batch worker processes (default: CPU count)")
+    parser.add_argument("--only", help="comma separated groups: single,portfolio,logos,modules,batch")
+    parser.add_argument("-o", "--output", help="write the results JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help=f"baseline file (default {DEFAULT_BASELINE})")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--no-compare", action="store_true", help="only measure; skip the baseline comparison")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before failing, as a fraction (default 0.25)")
+    parser.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD,
+                        help="allowed peak memory growth before failing (default 0.5)")
+    args = parser.parse_args(argv)
+
+    batch_sizes = tuple(int(n) for n in args.batch_sizes.split(",")) if args.batch_sizes else None
+    only = tuple(args.only.split(",")) if args.only else None
+
+    results = run_suite(args.quick, args.rounds, batch_sizes, args.workers, only)
+    report = {"environment": environment(), "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "quick": args.quick, "results": results}
+    print(format_results(results))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📁 Results saved as: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline saved as: {args.baseline}")
+        return 0
+    if args.no_compare:
+        return 0
+
+    if not os.path.exists(args.baseline):
+        # A regression check with nothing to compare against must not pass silently
+        print(f"❌ No baseline at {args.baseline}; run with --save-baseline to create one "
+              f"(or --no-compare to only measure)", file=sys.stderr)
+        return 2
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("environment") != report["environment"]:
+        print("⚠️ Baseline was recorded on a different machine or library versions", file=sys.stderr)
+
+    lines, regressions = compare(results, baseline.get("results", {}), args.threshold, args.memory_threshold)
+    print(f"\nCompared with {args.baseline}:")
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
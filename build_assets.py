@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Incremental Asset Build for QR Codes and Logos
+Keeps a manifest of what every generated file was built from (input file
+hashes, parameters and the source of the code that drew it) and only
+rebuilds outputs whose inputs changed, in parallel, with an optional
+watch mode for live edits to logo.png
+"""
+
+import argparse
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from source_hashes import FileHasher, local_imports
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MANIFEST = os.path.join(ROOT, ".asset_manifest.json")
+MANIFEST_VERSION = 1
+
+# Bump to force a full rebuild after changes the code hashes cannot see
+BUILD_EPOCH = 1
+
+
+class Target:
+    """One build step: call module.function(**kwargs) to write outputs from inputs"""
+
+    def __init__(self, name, module, function, outputs, inputs=(), **kwargs):
+        self.name = name
+        self.module = module
+        self.function = function
+        self.outputs = list(outputs)
+        self.inputs = list(inputs)
+        self.kwargs = kwargs
+
+    @property
+    def spec(self):
+        return self.module, self.function, self.kwargs
+
+
+def default_targets(vector=False):
+    """The generated files checked into the repository and how each is made
+
+    vector=True adds the SVG and PDF cards for the print shop, which are
+    built on request and not checked in.
+    """
+    targets = [
+        Target(name, "create_advanced_logos", "write_logo", [name], filename=name)
+        for name in ("logo_coffee.png", "logo_tech.png", "logo_business.png", "logo_creative.png")
+    ]
+    targets.append(Target("logo-atlas", "logo_registry", "write_atlas",
+                          ["wwwroot/assets/logo-atlas.png", "wwwroot/assets/logo-atlas.json"],
+                          png_path="wwwroot/assets/logo-atlas.png"))
+    targets += [
+        Target("portfolio_qr_code_with_logo.png", "generate_qr", "create_portfolio_qr",
+               ["portfolio_qr_code_with_logo.png"], ["logo.png", "card_templates.json"],
+               output_path="portfolio_qr_code_with_logo.png", logo_path="logo.png"),
+        Target("premium_qr", "create_premium_qr", "create_portfolio_qr_premium",
+               ["premium_qr_collection.png", "premium_portfolio_qr.png"], ["card_templates.json"],
+               output_path="premium_qr_collection.png", single_path="premium_portfolio_qr.png"),
+    ]
+    for ext in ("svg", "pdf") if vector else ():
+        targets += [
+            Target(f"portfolio_qr_code_with_logo.{ext}", "qr_vector", "write_portfolio_card",
+                   [f"portfolio_qr_code_with_logo.{ext}"], ["logo.png", "card_templates.json"],
+                   path=f"portfolio_qr_code_with_logo.{ext}", logo_path="logo.png"),
+            Target(f"premium_portfolio_qr.{ext}", "qr_vector", "write_premium_card",
+                   [f"premium_portfolio_qr.{ext}"], path=f"premium_portfolio_qr.{ext}"),
+        ]
+    return targets
+
+
+def environment():
+    """Library versions that change rendered pixels"""
+    from importlib.metadata import PackageNotFoundError, version
+
+    versions = {}
+    for package in ("pillow", "qrcode"):
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def signature(target, hasher, env):
+    """Everything an output depends on, with the hash of that description"""
+    code = {path: hasher.digest(path) for path in sorted(local_imports(target.module, hasher))}
+    description = {
+        "epoch": BUILD_EPOCH,
+        "build": [target.module, target.function, target.kwargs],
+        "inputs": {path: hasher.digest(path) for path in target.inputs},
+        "code": code,
+        "env": env,
+    }
+    blob = json.dumps(description, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest(), description
+
+
+def load_manifest(path=MANIFEST):
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"version": MANIFEST_VERSION, "files": {}, "targets": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "files": {}, "targets": {}}
+    return manifest
+
+
+def save_manifest(manifest, path=MANIFEST):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def run_build(spec):
+    """Call one build function with stdout captured (runs in-process or in a worker)"""
+    module, function, kwargs = spec
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            getattr(importlib.import_module(module), function)(**kwargs)
+        return out.getvalue()
+    finally:
+        os.chdir(cwd)
+
+
+class Builder:
+    """Decides which targets are dirty and rebuilds them"""
+
+    def __init__(self, targets=None, jobs=None, manifest_path=MANIFEST, verbose=False):
+        self.targets = targets or default_targets()
+        self.jobs = jobs or os.cpu_count() or 1
+        self.manifest_path = manifest_path
+        self.verbose = verbose
+        self.env = environment()
+        # Source hash of each module when this process first imported it
+        self.loaded = {}
+
+    def plan(self, manifest, hasher, names=None, force=False):
+        """Return [(target, signature, description)] for targets that need rebuilding"""
+        dirty = []
+        for target in self.targets:
+            if names and target.name not in names:
+                continue
+            sig, description = signature(target, hasher, self.env)
+            record = manifest["targets"].get(target.name)
+            fresh = (
+                not force and record is not None and record["signature"] == sig
+                and all(hasher.digest(out) == record["outputs"].get(out) for out in target.outputs)
+            )
+            if not fresh:
+                dirty.append((target, sig, description))
+        return dirty
+
+    def _in_process_ok(self, description):
+        # Code already imported here is only reusable if its source has not changed since
+        code = description["code"]
+        if any(path in self.loaded and self.loaded[path] != digest for path, digest in code.items()):
+            return False
+        for path, digest in code.items():
+            self.loaded.setdefault(path, digest)
+        return True
+
+    def build(self, names=None, force=False, dry_run=False):
+        """Rebuild dirty targets and return (built, failed, skipped, seconds)"""
+        start = time.perf_counter()
+        manifest = load_manifest(self.manifest_path)
+        hasher = FileHasher(manifest["files"])
+
+        if names:
+            unknown = set(names) - {t.name for t in self.targets}
+            if unknown:
+                raise ValueError(f"Unknown target(s): {', '.join(sorted(unknown))}")
+
+        dirty = self.plan(manifest, hasher, names, force)
+        selected = len([t for t in self.targets if not names or t.name in names])
+        if dry_run or not dirty:
+            for target, _, _ in dirty:
+                print(f"🔸 {target.name} is out of date")
+            return [], [], selected - len(dirty), time.perf_counter() - start
+
+        built, failed = [], []
+
+        def finish(target, sig, description, error):
+            if error is None:
+                manifest["targets"][target.name] = {
+                    "signature": sig,
+                    "inputs": description["inputs"],
+                    "params": target.kwargs,
+                    "code": description["code"],
+                    "outputs": {out: hasher.digest(out) for out in target.outputs},
+                }
+                built.append(target.name)
+            else:
+                manifest["targets"].pop(target.name, None)
+                failed.append(target.name)
+                print(f"❌ {target.name}: {error}", file=sys.stderr)
+
+        local = [item for item in dirty if (len(dirty) == 1 or self.jobs == 1) and self._in_process_ok(item[2])]
+        remote = [item for item in dirty if item not in local]
+
+        for target, sig, description in local:
+            try:
+                log = run_build(target.spec)
+                error = None
+                if self.verbose and log:
+                    print(log, end="")
+            except Exception as e:
+                error = e
+            finish(target, sig, description, error)
+
+        if remote:
+            # Fresh interpreters, so edited generator code is always re-imported
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(self.jobs, len(remote)), mp_context=context) as pool:
+                futures = {pool.submit(run_build, target.spec): (target, sig, description)
+                           for target, sig, description in remote}
+                for future in as_completed(futures):
+                    target, sig, description = futures[future]
+                    try:
+                        log = future.result()
+                        error = None
+                        if self.verbose and log:
+                            print(log, end="")
+                    except Exception as e:
+                        error = e
+                    finish(target, sig, description, error)
+
+        manifest["files"] = hasher.known
+        save_manifest(manifest, self.manifest_path)
+        return built, failed, selected - len(dirty), time.perf_counter() - start
+
+    def watched_files(self):
+        hasher = FileHasher()
+        files = set()
+        for target in self.targets:
+            files.update(target.inputs)
+            files.update(local_imports(target.module, hasher))
+        return sorted(files)
+
+    def watch(self, names=None, interval=0.2, debounce=0.3):
+        """Poll inputs and generator sources, rebuilding once edits settle"""
+        files = self.watched_files()
+        print(f"👀 Watching {len(files)} files (Ctrl+C to stop)")
+        report(*self.build(names))
+
+        def snapshot():
+            state = {}
+            for path in files:
+                try:
+                    st = os.stat(os.path.join(ROOT, path))
+                    state[path] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    state[path] = None
+            return state
+
+        last = snapshot()
+        changed_at = None
+        try:
+            while True:
+                time.sleep(interval)
+                current = snapshot()
+                if current != last:
+                    last = current
+                    changed_at = time.monotonic()
+                elif changed_at is not None and time.monotonic() - changed_at >= debounce:
+                    changed_at = None
+                    report(*self.build(names))
+                    # New imports in edited code may add files to watch
+                    files = self.watched_files()
+                    last = snapshot()
+        except KeyboardInterrupt:
+            pass
+
+
+def report(built, failed, skipped, seconds):
+    if built:
+        print(f"✅ Rebuilt {len(built)}: {', '.join(built)}")
+    print(f"⏱️ {len(built)} built, {len(failed)} failed, {skipped} up to date in {seconds * 1000:.0f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild generated QR codes and logos when their inputs change")
+    parser.add_argument("targets", nargs="*", help="targets to build (default: all)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="parallel builds (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="rebuild even if up to date")
+    parser.add_argument("--dry-run", action="store_true", help="only list out-of-date targets")
+    parser.add_argument("--list", action="store_true", help="list targets and their outputs")
+    parser.add_argument("--watch", action="store_true", help="rebuild when inputs or generator code change")
+    parser.add_argument("--debounce", type=float, default=0.3, help="seconds of quiet before a watch rebuild")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show the generators' own output")
+    parser.add_argument("--vector", action="store_true",
+                        help="also build the SVG and PDF print cards (not checked in)")
+    parser.add_argument("--publish", action="store_true",
+                        help="then publish the web assets under content-hashed names (publish_assets.py)")
+    args = parser.parse_args(argv)
+
+    builder = Builder(default_targets(vector=args.vector), jobs=args.jobs, verbose=args.verbose)
+    if args.list:
+        for target in builder.targets:
+            inputs = f" <- {', '.join(target.inputs)}" if target.inputs else ""
+            print(f"{target.name}: {', '.join(target.outputs)}{inputs}")
+        return 0
+    if args.watch:
+        builder.watch(args.targets or None, debounce=args.debounce)
+        return 0
+
+    built, failed, skipped, seconds = builder.build(args.targets or None, args.force, args.dry_run)
+    report(built, failed, skipped, seconds)
+    if failed:
+        return 1
+    if args.publish and not args.dry_run:
+        from publish_assets import main as publish
+
+        return publish([])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Declarative Card Layouts
+Cards are described in card_templates.json and compiled once per process:
+every static shape and line of text is measured and drawn into a base
+layer, so rendering a card is a copy of that layer plus its per-card
+fields (QR codes, a name, a URL) instead of a textbbox call and centering
+math for every line on every card
+"""
+
+import functools
+import json
+import os
+import string
+
+from PIL import Image, ImageDraw
+
+from fonts import get_font
+
+TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "card_templates.json")
+
+# Fitted text shrinks one point at a time, down to this size
+MIN_FIT_SIZE = 8
+
+ALIGNS = ("left", "center", "right")
+
+
+def load_templates(path=TEMPLATES_PATH):
+    """The raw {name: template} mapping from a template file"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _color(value):
+    # JSON has no tuples; RGBA lists such as [0, 0, 0, 30] become tuples for ImageDraw
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _placeholders(text):
+    return {name for _, name, _, _ in string.Formatter().parse(text) if name}
+
+
+def _line_x(width, left, box_width, align):
+    if align == "left":
+        return left
+    if align == "right":
+        return left + box_width - width
+    return left + (box_width - width) // 2
+
+
+def _text_width(draw, text, font):
+    bbox = draw.textbbox((0, 0), text, font=font)
+    return bbox[2] - bbox[0]
+
+
+def _wrap(draw, text, font, width):
+    """Greedy word wrap of one line into lines no wider than width"""
+    lines = []
+    for word in text.split():
+        if lines and _text_width(draw, f"{lines[-1]} {word}", font) <= width:
+            lines[-1] = f"{lines[-1]} {word}"
+        else:
+            lines.append(word)
+    return lines
+
+
+class TextElement:
+    """One block of text: static text is drawn at compile time, fields at render time"""
+
+    def __init__(self, spec, card_width):
+        lines = spec["text"]
+        self.lines = [lines] if isinstance(lines, str) else list(lines)
+        self.family = spec.get("font", "sans")
+        self.size = spec.get("size", 18)
+        self.font = get_font(self.family, self.size)
+        self.fill = _color(spec.get("fill", "black"))
+        self.x = spec.get("x", 0)
+        self.y = spec.get("y", 0)
+        self.width = spec.get("width", card_width - self.x)
+        self.align = spec.get("align", "center")
+        if self.align not in ALIGNS:
+            raise ValueError(f"Unknown align {self.align!r} (expected one of {', '.join(ALIGNS)})")
+        self.line_height = spec.get("line_height", round(self.size * 1.25))
+        self.wrap = spec.get("wrap", False)
+        self.fit = spec.get("fit", False)
+        self.fields = set().union(*(_placeholders(line) for line in self.lines))
+
+    def _font_for(self, draw, lines):
+        if not self.fit:
+            return self.font
+        size = self.size
+        font = self.font
+        widest = max(_text_width(draw, line, font) for line in lines)
+        while size > MIN_FIT_SIZE and widest > self.width:
+            # Text width scales with the font size, so one guess usually lands; step down if hinting disagrees
+            size = max(MIN_FIT_SIZE, min(size - 1, size * self.width // widest))
+            font = get_font(self.family, size)
+            widest = max(_text_width(draw, line, font) for line in lines)
+        return font
+
+    def draw(self, draw, values=None):
+        lines = [line.format_map(values) for line in self.lines] if values is not None else self.lines
+        if self.wrap:
+            lines = [wrapped for line in lines for wrapped in _wrap(draw, line, self.font, self.width)]
+        font = self._font_for(draw, lines)
+        for i, line in enumerate(lines):
+            x = _line_x(_text_width(draw, line, font), self.x, self.width, self.align)
+            draw.text((x, self.y + i * self.line_height), line, fill=self.fill, font=font)
+
+
+class CardLayout:
+    """A compiled template: a pre-drawn base layer plus the slots filled per card"""
+
+    def __init__(self, name, base, images, texts, defaults):
+        self.name = name
+        self.base = base
+        self.images = images
+        self.texts = texts
+        self.defaults = defaults
+
+    @property
+    def size(self):
+        return self.base.size
+
+    @property
+    def fields(self):
+        """Every field a render can fill: image slots first, then text fields"""
+        names = [field for field, _ in self.images]
+        for text in self.texts:
+            names += sorted(text.fields - set(names))
+        return names
+
+    def slot_size(self, field):
+        """(width, height) of an image slot; render images at this size to fill it"""
+        for name, box in self.images:
+            if name == field:
+                return box[2], box[3]
+        raise KeyError(f"Card {self.name!r} has no image slot {field!r}")
+
+    def render(self, **fields):
+        """The finished RGB card; images are centered in their slots, text fields formatted in"""
+        values = {**self.defaults, **fields}
+        missing = [field for field in self.fields if field not in values]
+        if missing:
+            raise ValueError(f"Card {self.name!r} needs {', '.join(missing)}")
+
+        img = self.base.copy()
+        for field, (x, y, width, height) in self.images:
+            image = values[field]
+            if image.size[0] > width or image.size[1] > height:
+                raise ValueError(f"{field} is {image.size[0]}x{image.size[1]}, "
+                                 f"larger than its {width}x{height} slot on card {self.name!r}")
+            position = (x + (width - image.size[0]) // 2, y + (height - image.size[1]) // 2)
+            img.paste(image, position, image if image.mode == "RGBA" else None)
+
+        if self.texts:
+            draw = ImageDraw.Draw(img)
+            for text in self.texts:
+                text.draw(draw, values)
+        return img
+
+
+def compile_layout(name, template):
+    """Draw a template's static elements into its base layer and collect the per-card slots
+
+    Elements are drawn in template order; image slots and text with {field}
+    placeholders are drawn over the finished base layer at render time.
+    """
+    width, height = template["size"]
+    base = Image.new("RGB", (width, height), _color(template.get("background", "white")))
+    draw = ImageDraw.Draw(base)
+    images, texts = [], []
+
+    for spec in template["elements"]:
+        kind = spec["type"]
+        if kind == "rect":
+            draw.rounded_rectangle(spec["box"], radius=spec.get("radius", 0), fill=_color(spec.get("fill")),
+                                   outline=_color(spec.get("outline")), width=spec.get("width", 1))
+        elif kind == "image":
+            images.append((spec["field"], tuple(spec["box"])))
+        elif kind == "text":
+            text = TextElement(spec, width)
+            if text.fields:
+                texts.append(text)
+            else:
+                text.draw(draw)
+        else:
+            raise ValueError(f"Unknown element type {kind!r} in card {name!r}")
+
+    return CardLayout(name, base, images, texts, dict(template.get("defaults", {})))
+
+
+@functools.lru_cache(maxsize=32)
+def _compiled(path, stamp, name):
+    templates = load_templates(path)
+    if name not in templates:
+        raise KeyError(f"No card template {name!r} in {path} (have: {', '.join(templates)})")
+    return compile_layout(name, templates[name])
+
+
+def get_layout(name, path=TEMPLATES_PATH):
+    """The compiled layout for a template, recompiled only when the template file changes"""
+    path = os.path.abspath(path)
+    return _compiled(path, os.stat(path).st_mtime_ns, name)
+
+
+def template_names(path=TEMPLATES_PATH):
+    return list(load_templates(path))
+
+
+def cache_clear():
+    """Forget every compiled layout"""
+    _compiled.cache_clear()
+
+
+def display_url(url):
+    """A URL as printed on a card: no scheme, no trailing slash"""
+    return url.split("://", 1)[-1].rstrip("/")
+
+
+def main(argv=None):
+    """Render one card and compare compiling with rendering: python card_layout.py business"""
+    import argparse
+    import time
+
+    from create_premium_qr import STYLE_COLORS, create_beautiful_qr
+    from generate_qr import PORTFOLIO_URL
+
+    parser = argparse.ArgumentParser(description="Render a card from card_templates.json")
+    parser.add_argument("template", nargs="?", default="business", help="template name (see --list)")
+    parser.add_argument("--url", default=PORTFOLIO_URL, help="URL encoded in the card's QR codes")
+    parser.add_argument("--name", help="name field, for templates that have one")
+    parser.add_argument("--style", choices=STYLE_COLORS, default="classic", help="style of the QR slots")
+    parser.add_argument("--templates", default=TEMPLATES_PATH, help="template file")
+    parser.add_argument("--list", action="store_true", help="list the templates and their fields")
+    parser.add_argument("-n", "--renders", type=int, default=100, help="renders to time (default 100)")
+    parser.add_argument("-o", "--output", help="output PNG (default: card_<template>.png)")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        templates = load_templates(args.templates)
+        for name, template in templates.items():
+            layout = get_layout(name, args.templates)
+            print(f"🃏 {name}: {layout.size[0]}x{layout.size[1]}, fields {', '.join(layout.fields)}")
+            print(f"   {template.get('description', '')}")
+        return 0
+
+    start = time.perf_counter()
+    try:
+        layout = get_layout(args.template, args.templates)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 1
+    compiled = (time.perf_counter() - start) * 1000
+
+    # Image slots named after a style get that style; any other slot gets --style
+    fields = {}
+    for field, _ in layout.images:
+        style = field if field in STYLE_COLORS else args.style
+        fields[field] = create_beautiful_qr(args.url, style, size=min(layout.slot_size(field)), compact=True)
+    if "url" in layout.fields:
+        fields["url"] = display_url(args.url)
+    if args.name:
+        fields["name"] = args.name
+
+    start = time.perf_counter()
+    for _ in range(args.renders):
+        card = layout.render(**fields)
+    rendered = (time.perf_counter() - start) * 1000 / args.renders
+
+    output = args.output or f"card_{args.template}.png"
+    card.save(output)
+    print(f"✅ {args.template}: compiled in {compiled:.1f} ms, {rendered:.2f} ms per card")
+    print(f"📁 Saved as: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
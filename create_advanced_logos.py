@@ -4,9 +4,15 @@ Advanced Logo Creator for QR Codes
 Creates various logo styles for professional QR codes
 """
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import os
 
+from fonts import get_font
+from logo_cache import cached_logo
+from logo_registry import ATLAS_PATH, get_logo, index_path, write_atlas
+from png_output import save_png
+
+@cached_logo
 def create_coffee_logo(size=100):
     """Create a coffee cup logo - perfect for café business cards"""
     logo = Image.new('RGBA', (size, size), (0, 0, 0, 0))
@@ -43,6 +49,7 @@ def create_coffee_logo(size=100):
     
     return logo
 
+@cached_logo
 def create_tech_logo(size=100):
     """Create a tech/coding logo with brackets"""
     logo = Image.new('RGBA', (size, size), (0, 0, 0, 0))
@@ -59,10 +66,7 @@ def create_tech_logo(size=100):
                         fill=colors[i])
     
     # Draw brackets < >
-    try:
-        font = ImageFont.truetype("arial.ttf", size // 2)
-    except:
-        font = ImageFont.load_default()
+    font = get_font("sans", size // 2)
     
     text = "</>"
     bbox = draw.textbbox((0, 0), text, font=font)
@@ -79,6 +83,7 @@ def create_tech_logo(size=100):
     
     return logo
 
+@cached_logo
 def create_business_logo(initials="LT", size=100):
     """Create a professional business logo with initials"""
     logo = Image.new('RGBA', (size, size), (0, 0, 0, 0))
@@ -98,10 +103,7 @@ def create_business_logo(initials="LT", size=100):
                 outline=accent_color, width=2)
     
     # Initials
-    try:
-        font = ImageFont.truetype("arial.ttf", size // 2.5)
-    except:
-        font = ImageFont.load_default()
+    font = get_font("sans", size // 2.5)
     
     bbox = draw.textbbox((0, 0), initials, font=font)
     text_width = bbox[2] - bbox[0]
@@ -114,6 +116,7 @@ def create_business_logo(initials="LT", size=100):
     
     return logo
 
+@cached_logo
 def create_creative_logo(size=100):
     """Create a creative/artistic logo"""
     logo = Image.new('RGBA', (size, size), (0, 0, 0, 0))
@@ -138,10 +141,7 @@ def create_creative_logo(size=100):
                 fill=(255, 255, 255, 255), outline=(0, 0, 0, 255), width=2)
     
     # Star or symbol in center
-    try:
-        font = ImageFont.truetype("arial.ttf", size // 4)
-    except:
-        font = ImageFont.load_default()
+    font = get_font("sans", size // 4)
     
     text = "★"
     bbox = draw.textbbox((0, 0), text, font=font)
@@ -155,32 +155,56 @@ def create_creative_logo(size=100):
     
     return logo
 
-def main():
-    """Create different logo options"""
+# Output file for each logo style registered in logo_registry
+LOGO_FILES = {f"logo_{name}.png": name for name in ("coffee", "tech", "business", "creative")}
+
+def write_logo(filename, output_path=None):
+    """Render one of LOGO_FILES and save it (to output_path if given)"""
+    return save_png(get_logo(LOGO_FILES[filename]), output_path or filename)
+
+def main(argv=None):
+    """Create the logo files, or the sprite atlas the web front end loads in one request"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Render logo styles")
+    parser.add_argument("styles", nargs="*", metavar="style",
+                        help=f"styles to write (default: all of {', '.join(LOGO_FILES.values())})")
+    parser.add_argument("--atlas", nargs="?", const=ATLAS_PATH, metavar="PNG",
+                        help="instead write every registered style into one sprite atlas with a JSON index")
+    args = parser.parse_args(argv)
+    unknown = set(args.styles) - set(LOGO_FILES.values())
+    if unknown:
+        parser.error(f"unknown style {', '.join(sorted(unknown))} (choose from {', '.join(LOGO_FILES.values())})")
+    
     print("🎨 Advanced Logo Creator")
     print("=" * 30)
     
-    # Create different logo styles
-    logos = {
-        "logo_coffee.png": create_coffee_logo(),
-        "logo_tech.png": create_tech_logo(),
-        "logo_business.png": create_business_logo("LT"),
-        "logo_creative.png": create_creative_logo()
-    }
+    if args.atlas:
+        index = write_atlas(args.atlas)
+        print(f"✅ Atlas: {len(index['sprites'])} styles on {index['width']}x{index['height']} "
+              f"({index['bytes']:,} bytes)")
+        print(f"📁 Saved as: {args.atlas} + {os.path.basename(index_path(args.atlas))}")
+        return 0
     
-    for filename, logo in logos.items():
-        logo.save(filename, "PNG")
-        print(f"✅ Created: {filename}")
+    # Only the styles asked for are rendered
+    for filename, name in LOGO_FILES.items():
+        if args.styles and name not in args.styles:
+            continue
+        report = write_logo(filename)
+        print(f"✅ Created: {filename} ({report['bytes']:,} bytes, {report['mode']})")
     
     print("\n💡 Usage:")
     print("1. Choose your preferred logo style")
-    print("2. Rename it to 'logo.png' or update generate_qr.py")
+    print("2. Pass its name as the logo (e.g. --logo tech), or rename its file to 'logo.png'")
     print("3. Run generate_qr.py to create QR code with your chosen logo")
     print("\n🎯 Logo styles:")
     print("• logo_coffee.png - Perfect for cafés, restaurants")
     print("• logo_tech.png - Great for developers, tech companies")
     print("• logo_business.png - Professional business cards")
     print("• logo_creative.png - Artists, designers, creative fields")
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import sys
+    
+    sys.exit(main())
@@ -5,31 +5,59 @@ Creates beautiful, professional QR codes with various design options
 """
 
 import qrcode
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
-import os
+from PIL import Image, ImageDraw, ImageFilter
+import functools
 import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from card_layout import get_layout
+from fonts import get_font
+from gradients import radial_gradient
+from logo_cache import cached_logo
+from png_output import format_report, save_png
+from qr_fill import FILL_KINDS, render_filled
+from qr_matrix import get_matrix, module_geometry, module_pitch, physical_to_pixels, render_matrix
+from qr_modules import render_styled
+import qr_profile
+from qr_profile import profiled, stage
+from qr_verify import check_raster
+
+PREMIUM_URL = "https://lotriet.dev"
 
+# (module color, background color) for each QR style
+STYLE_COLORS = {
+    "premium": ("#1a365d", "#ffffff"),   # Dark blue on white
+    "modern": ("#2d3748", "#f7fafc"),    # Modern dark gray on light gray
+    "colorful": ("#6b46c1", "#fef3c7"),  # Purple on light yellow
+    "classic": ("black", "white"),
+}
+
+# Gradient stops for each style when a gradient fill is asked for
+STYLE_GRADIENTS = {
+    "premium": ("#1a365d", "#3182ce"),
+    "modern": ("#2d3748", "#4a5568"),
+    "colorful": ("#6b46c1", "#d53f8c"),  # Purple to pink
+    "classic": ("black", "#4a5568"),
+}
+
+# Styles whose modules are gradient-filled unless the caller picks a fill
+STYLE_FILLS = {"colorful": "linear"}
+
+@cached_logo
 def create_premium_logo(size=100, style="gradient"):
     """Create premium logo designs"""
     logo = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(logo)
     
     if style == "gradient":
-        # Create gradient effect manually
-        for y in range(size):
-            for x in range(size):
-                # Calculate distance from center
-                center = size // 2
-                distance = math.sqrt((x - center) ** 2 + (y - center) ** 2)
-                
-                if distance <= center - 3:
-                    # Create gradient from blue to purple
-                    ratio = distance / (center - 3)
-                    r = int(102 + (118 - 102) * ratio)  # 102->118
-                    g = int(126 + (75 - 126) * ratio)   # 126->75
-                    b = int(234 + (162 - 234) * ratio)  # 234->162
-                    
-                    logo.putpixel((x, y), (r, g, b, 255))
+        # Radial gradient from blue to purple, built as one image operation
+        center = size // 2
+        logo = radial_gradient(
+            size, [(102, 126, 234), (118, 75, 162)],
+            center=(center, center), radius=center - 3,
+        )
+        draw = ImageDraw.Draw(logo)
         
         # Add white border
         draw.ellipse([2, 2, size-2, size-2], outline=(255, 255, 255, 255), width=4)
@@ -51,10 +79,7 @@ def create_premium_logo(size=100, style="gradient"):
     
     # Add initials
     text = "CL"
-    try:
-        font = ImageFont.truetype("arial.ttf", size // 2.2)
-    except:
-        font = ImageFont.load_default()
+    font = get_font("sans", size // 2.2)
     
     bbox = draw.textbbox((0, 0), text, font=font)
     text_width = bbox[2] - bbox[0]
@@ -73,59 +98,70 @@ def create_premium_logo(size=100, style="gradient"):
     
     return logo
 
-def create_beautiful_qr(url, style="premium"):
-    """Create a beautiful QR code with various styling options"""
+def round_corners(qr_img, scale=1.0):
+    """Give an RGBA code the premium style's subtle rounded corners (in place)
+
+    The radius is 20 px at the 12 px reference module, times scale.
+    """
+    mask = Image.new('L', qr_img.size, 0)
+    mask_draw = ImageDraw.Draw(mask)
+    mask_draw.rounded_rectangle([0, 0, qr_img.size[0], qr_img.size[1]], radius=round(20 * scale), fill=255)
+    qr_img.putalpha(mask)
+    return qr_img
+
+@profiled()
+def create_beautiful_qr(url, style="premium", logo=None, size=None, size_mm=None, dpi=300,
+                        strategy="pad", verify=False, modules="square", finder=None, fill=None, compact=False):
+    """Create a beautiful QR code with various styling options
     
-    # QR code generation with high error correction
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_H,  # Highest error correction
-        box_size=12,  # Larger boxes for better quality
-        border=4,
-    )
+    Pass size (pixels) or size_mm plus dpi to draw the code directly at its
+    final size; strategy is "pad" or "fractional" (see render_matrix).
+    With verify=True the finished code is checked against its error
+    correction budget and QRVerificationError is raised if the logo covers
+    too much of any block. modules and finder pick styled module and finder
+    pattern shapes (see qr_modules.py). fill paints the modules with a
+    gradient ("linear", "radial", "conic" in the style's colors, or a
+    (kind, stops) pair) or a photo/texture (an image or its path); pass
+    "flat" for the plain style color. compact=True uppercases a URL's scheme
+    and host for a smaller code (see qr_payload.py).
+    """
     
-    qr.add_data(url)
-    qr.make(fit=True)
+    # QR code matrix with high error correction (encoded once per URL and cached)
+    with stage("encode"):
+        matrix = get_matrix(url, error_correction=qrcode.constants.ERROR_CORRECT_H, compact=compact)
+    if size_mm is not None:
+        size = physical_to_pixels(size_mm, dpi)
     
-    if style == "premium":
-        # Premium style with rounded corners and gradients
-        qr_img = qr.make_image(
-            fill_color="#1a365d",  # Dark blue
-            back_color="#ffffff"
-        ).convert("RGBA")
-        
-        # Add subtle rounded corners effect
-        mask = Image.new('L', qr_img.size, 0)
-        mask_draw = ImageDraw.Draw(mask)
-        mask_draw.rounded_rectangle([0, 0, qr_img.size[0], qr_img.size[1]], radius=20, fill=255)
-        
-        # Apply mask for rounded corners
-        rounded_qr = Image.new('RGBA', qr_img.size, (0, 0, 0, 0))
-        rounded_qr.paste(qr_img, (0, 0))
-        rounded_qr.putalpha(mask)
-        
-        qr_img = rounded_qr
-        
-    elif style == "modern":
-        # Modern flat design
-        qr_img = qr.make_image(
-            fill_color="#2d3748",  # Modern dark gray
-            back_color="#f7fafc"   # Light gray background
-        ).convert("RGBA")
-        
-    elif style == "colorful":
-        # Colorful gradient style
-        qr_img = qr.make_image(
-            fill_color="#6b46c1",  # Purple
-            back_color="#fef3c7"   # Light yellow background
-        ).convert("RGBA")
+    # 12 px boxes by default; with a target size the renderer picks the module size
+    render = dict(box_size=12, border=4, size=size, strategy=strategy)
+    scale = module_pitch(matrix, **render) / 12
+    
+    fill_color, back_color = STYLE_COLORS.get(style, STYLE_COLORS["classic"])
+
+    if fill is None:
+        fill = STYLE_FILLS.get(style, "flat")
+    if fill in FILL_KINDS:
+        fill = (fill, STYLE_GRADIENTS.get(style, STYLE_GRADIENTS["classic"]))
+
+    # Plain squares keep the fast path; styled modules are stamped in bulk
+    if fill != "flat":
+        rasterize = functools.partial(render_filled, fill=fill, module=modules, finder=finder)
+    elif modules != "square" or finder is not None:
+        rasterize = functools.partial(render_styled, fill_color=fill_color, module=modules, finder=finder)
+    else:
+        rasterize = functools.partial(render_matrix, fill_color=fill_color)
     
-    else:  # classic
-        qr_img = qr.make_image(fill_color="black", back_color="white").convert("RGBA")
+    with stage("rasterize"):
+        qr_img = rasterize(matrix, **render, back_color=back_color).convert("RGBA")
+
+        if style == "premium":
+            round_corners(qr_img, scale)
     
-    # Add premium logo
-    logo_style = "gradient" if style == "premium" else "modern" if style == "modern" else "glass"
-    logo = create_premium_logo(size=100, style=logo_style)
+    # Add premium logo (unless the caller supplied their own)
+    if logo is None:
+        logo_style = "gradient" if style == "premium" else "modern" if style == "modern" else "glass"
+        with stage("logo"):
+            logo = create_premium_logo(size=round(100 * scale), style=logo_style)
     
     # Calculate position for logo (center of QR code)
     qr_width, qr_height = qr_img.size
@@ -133,143 +169,171 @@ def create_beautiful_qr(url, style="premium"):
     logo_pos = ((qr_width - logo_size) // 2, (qr_height - logo_size) // 2)
     
     # Paste logo onto QR code
-    qr_img.paste(logo, logo_pos, logo)
+    with stage("composite"):
+        qr_img.paste(logo, logo_pos, logo)
+    
+    if verify:
+        origin, pitch = module_geometry(matrix, **render)
+        with stage("verify"):
+            check_raster(qr_img, matrix, qrcode.constants.ERROR_CORRECT_H, origin=origin, pitch=pitch)
     
     return qr_img
 
-def create_portfolio_qr_premium():
-    """Create premium portfolio QR code"""
-    url = "https://lotriet.dev"
-    
-    # Create multiple style variants
-    styles = {
-        "premium": "Premium gradient style with rounded corners",
-        "modern": "Modern flat design with clean aesthetics", 
-        "colorful": "Vibrant colors for creative portfolios",
-        "classic": "Traditional professional look"
-    }
-    
-    # Create a large composition with multiple styles
-    width, height = 1200, 1600
+# Module treatments crossed with every style for the style review sheet
+REVIEW_TREATMENTS = [
+    ("Square", {}),
+    ("Rounded", {"modules": "rounded", "finder": "rounded"}),
+    ("Dots", {"modules": "dot", "finder": "circle"}),
+    ("Connected", {"modules": "connected", "finder": "rounded"}),
+    ("Conic", {"modules": "rounded", "fill": "conic"}),
+]
+
+# Contact sheet geometry: every card is a 300 px code on a 450 x 400 px pitch;
+# taller sheets space their rows out so the cards do not run together
+CARD_QR_SIZE = 300
+CARD_PITCH = (450, 400)
+REVIEW_PITCH = (450, 480)
+SHEET_LEFT, SHEET_TOP = 150, 200
+
+
+def review_variants():
+    """Every style with every module treatment (20 variants)"""
+    variants = []
+    for style in STYLE_COLORS:
+        for treatment, options in REVIEW_TREATMENTS:
+            described = ", ".join(f"{key} {value}" for key, value in options.items()) or "plain square modules"
+            variants.append((f"{style.capitalize()} {treatment}", described, {"style": style, **options}))
+    return variants
+
+
+def _render_buffer(url, options, size):
+    """Render one variant in a worker; returns a raw pixel buffer plus profile records"""
+    img = create_beautiful_qr(url, size=size, verify=True, **options)
+    return img.mode, img.size, img.tobytes(), qr_profile.take_records()
+
+
+def render_variants(url, jobs, workers=None):
+    """Render [(options, size)] jobs, in a process pool when more than one core is available"""
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return [create_beautiful_qr(url, size=size, verify=True, **options) for options, size in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_render_buffer, url, options, size) for options, size in jobs]
+        images = []
+        for future in futures:
+            mode, dimensions, data, records = future.result()
+            qr_profile.add_records(records)
+            images.append(Image.frombytes(mode, dimensions, data))
+    return images
+
+
+def _draw_centered(draw, text, font, left, width, y, fill):
+    bbox = draw.textbbox((0, 0), text, font=font)
+    draw.text((left + (width - (bbox[2] - bbox[0])) // 2, y), text, fill=fill, font=font)
+
+
+def draw_contact_sheet(cards, title, subtitle, footer, columns=None, pitch=CARD_PITCH):
+    """Place [(image, name, description)] cards on a grid and draw all the text"""
+    columns = columns or max(2, math.ceil(math.sqrt(len(cards))))
+    rows = math.ceil(len(cards) / columns)
+    width = pitch[0] * columns + 300
+    height = max(1600, SHEET_TOP + pitch[1] * rows + 200)
     img = Image.new('RGB', (width, height), '#f8fafc')
     draw = ImageDraw.Draw(img)
     
-    # Title
-    try:
-        title_font = ImageFont.truetype("arial.ttf", 48)
-        subtitle_font = ImageFont.truetype("arial.ttf", 24)
-        desc_font = ImageFont.truetype("arial.ttf", 18)
-    except:
-        title_font = ImageFont.load_default()
-        subtitle_font = ImageFont.load_default()
-        desc_font = ImageFont.load_default()
-    
-    # Draw title
-    title = "Premium QR Code Collection"
-    title_bbox = draw.textbbox((0, 0), title, font=title_font)
-    title_width = title_bbox[2] - title_bbox[0]
-    draw.text(((width - title_width) // 2, 50), title, fill="#1a365d", font=title_font)
+    title_font = get_font("sans", 48)
+    subtitle_font = get_font("sans", 24)
+    desc_font = get_font("sans", 18)
     
-    # Draw subtitle
-    subtitle = "Professional Portfolio Access"
-    subtitle_bbox = draw.textbbox((0, 0), subtitle, font=subtitle_font)
-    subtitle_width = subtitle_bbox[2] - subtitle_bbox[0]
-    draw.text(((width - subtitle_width) // 2, 120), subtitle, fill="#4a5568", font=subtitle_font)
+    with stage("text"):
+        _draw_centered(draw, title, title_font, 0, width, 50, "#1a365d")
+        _draw_centered(draw, subtitle, subtitle_font, 0, width, 120, "#4a5568")
     
-    # Generate and place QR codes in a 2x2 grid
-    y_start = 200
-    for i, (style_name, description) in enumerate(styles.items()):
-        row = i // 2
-        col = i % 2
-        
-        qr_img = create_beautiful_qr(url, style_name)
-        qr_img = qr_img.resize((300, 300), Image.Resampling.LANCZOS)
-        
-        x = 150 + col * 450
-        y = y_start + row * 400
-        
-        # Create a card background
-        card_margin = 30
-        card_x1 = x - card_margin
-        card_y1 = y - card_margin
-        card_x2 = x + 300 + card_margin
-        card_y2 = y + 300 + card_margin + 80
-        
-        # Draw card shadow
-        shadow_offset = 5
-        draw.rounded_rectangle(
-            [card_x1 + shadow_offset, card_y1 + shadow_offset, card_x2 + shadow_offset, card_y2 + shadow_offset],
-            radius=15, fill=(0, 0, 0, 30)
-        )
-        
-        # Draw card background
-        draw.rounded_rectangle([card_x1, card_y1, card_x2, card_y2], radius=15, fill="white")
-        
-        # Paste QR code
-        img.paste(qr_img, (x, y), qr_img)
+    for i, (qr_img, name, description) in enumerate(cards):
+        x = SHEET_LEFT + (i % columns) * pitch[0]
+        y = SHEET_TOP + (i // columns) * pitch[1]
         
-        # Add style name
-        style_title = style_name.capitalize()
-        style_bbox = draw.textbbox((0, 0), style_title, font=subtitle_font)
-        style_width = style_bbox[2] - style_bbox[0]
-        draw.text((x + (300 - style_width) // 2, y + 320), style_title, fill="#1a365d", font=subtitle_font)
+        with stage("composite"):
+            # Card shadow, card background, then the code itself
+            card_margin = 30
+            card = [x - card_margin, y - card_margin, x + CARD_QR_SIZE + card_margin, y + CARD_QR_SIZE + card_margin + 80]
+            shadow_offset = 5
+            draw.rounded_rectangle([c + shadow_offset for c in card], radius=15, fill=(0, 0, 0, 30))
+            draw.rounded_rectangle(card, radius=15, fill="white")
+            img.paste(qr_img, (x, y), qr_img)
         
-        # Add description
-        desc_lines = description.split()
-        line1 = " ".join(desc_lines[:3])
-        line2 = " ".join(desc_lines[3:]) if len(desc_lines) > 3 else ""
+        with stage("text"):
+            _draw_centered(draw, name, subtitle_font, x, CARD_QR_SIZE, y + 320, "#1a365d")
         
-        line1_bbox = draw.textbbox((0, 0), line1, font=desc_font)
-        line1_width = line1_bbox[2] - line1_bbox[0]
-        draw.text((x + (300 - line1_width) // 2, y + 350), line1, fill="#718096", font=desc_font)
-        
-        if line2:
-            line2_bbox = draw.textbbox((0, 0), line2, font=desc_font)
-            line2_width = line2_bbox[2] - line2_bbox[0]
-            draw.text((x + (300 - line2_width) // 2, y + 370), line2, fill="#718096", font=desc_font)
-    
-    # Add footer
-    footer = f"Scan any QR code to visit: {url}"
-    footer_bbox = draw.textbbox((0, 0), footer, font=desc_font)
-    footer_width = footer_bbox[2] - footer_bbox[0]
-    draw.text(((width - footer_width) // 2, height - 100), footer, fill="#4a5568", font=desc_font)
-    
-    # Save the collection
-    output_path = "premium_qr_collection.png"
-    img.save(output_path, "PNG", quality=100)
+            # Description over two lines
+            words = description.split()
+            _draw_centered(draw, " ".join(words[:3]), desc_font, x, CARD_QR_SIZE, y + 350, "#718096")
+            if len(words) > 3:
+                _draw_centered(draw, " ".join(words[3:]), desc_font, x, CARD_QR_SIZE, y + 370, "#718096")
     
-    # Also save individual premium version
-    premium_qr = create_beautiful_qr(url, "premium")
-    premium_single = Image.new('RGB', (600, 700), '#f8fafc')
+    with stage("text"):
+        _draw_centered(draw, footer, desc_font, 0, width, height - 100, "#4a5568")
+    return img
+
+@profiled()
+def create_portfolio_qr_premium(output_path="premium_qr_collection.png", single_path="premium_portfolio_qr.png",
+                                workers=None):
+    """Create premium portfolio QR code"""
+    url = PREMIUM_URL
     
-    # Add padding and center the QR code
+    # Both cards are card_templates.json layouts; their static text is drawn once per process.
+    # The collection's image slots are named after the styles they show
+    collection = get_layout("collection")
+    styles = [field for field, _ in collection.images]
+
+    # The style variants and the single premium code render in parallel
     qr_size = 400
-    premium_qr_resized = premium_qr.resize((qr_size, qr_size), Image.Resampling.LANCZOS)
-    premium_single.paste(premium_qr_resized, ((600 - qr_size) // 2, 100), premium_qr_resized)
+    jobs = [({"style": style}, min(collection.slot_size(style))) for style in styles]
+    jobs.append(({"style": "premium"}, qr_size))
+    *variants, premium_qr = render_variants(url, jobs, workers)
     
-    # Add title
-    single_draw = ImageDraw.Draw(premium_single)
-    title = "Premium Portfolio QR"
-    title_bbox = single_draw.textbbox((0, 0), title, font=title_font)
-    title_width = title_bbox[2] - title_bbox[0]
-    single_draw.text(((600 - title_width) // 2, 30), title, fill="#1a365d", font=title_font)
+    with stage("composite"):
+        img = collection.render(url=url, **dict(zip(styles, variants)))
     
-    # Add URL
-    url_text = url
-    url_bbox = single_draw.textbbox((0, 0), url_text, font=subtitle_font)
-    url_width = url_bbox[2] - url_bbox[0]
-    single_draw.text(((600 - url_width) // 2, 520), url_text, fill="#4a5568", font=subtitle_font)
+    # Save the collection
+    with stage("save"):
+        reports = [save_png(img, output_path)]
+    
+    # Also save individual premium version
+    with stage("composite"):
+        premium_single = get_layout("premium").render(qr=premium_qr, url=url)
     
-    premium_single.save("premium_portfolio_qr.png", "PNG", quality=100)
+    with stage("save"):
+        reports.append(save_png(premium_single, single_path))
     
     print(f"✅ Premium QR codes generated successfully!")
     print(f"📁 Collection saved as: {output_path}")
-    print(f"📁 Premium single saved as: premium_portfolio_qr.png")
+    print(f"📁 Premium single saved as: {single_path}")
     print(f"🌐 URL: {url}")
     print(f"🎨 4 different premium styles created")
+    for report in reports:
+        print(f"📦 {format_report(report)}")
     print(f"🖨️ Ready for professional use!")
     
     return output_path
 
+@profiled()
+def create_style_review(output_path="premium_qr_review.png", workers=None):
+    """Contact sheet of every style and module treatment, rendered on all cores"""
+    url = PREMIUM_URL
+    variants = review_variants()
+    images = render_variants(url, [(options, CARD_QR_SIZE) for _, _, options in variants], workers)
+    
+    cards = [(qr_img, name, description) for qr_img, (name, description, _) in zip(images, variants)]
+    img = draw_contact_sheet(cards, "QR Style Review", f"{len(cards)} style variants",
+                             f"Every variant links to: {url}", pitch=REVIEW_PITCH)
+    with stage("save"):
+        report = save_png(img, output_path)
+    
+    print(f"✅ Style review saved as: {output_path}")
+    print(f"📦 {format_report(report)}")
+    return output_path
+
 if __name__ == "__main__":
     create_portfolio_qr_premium()
\ No newline at end of file
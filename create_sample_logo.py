@@ -3,11 +3,15 @@
 Creates a sample logo for the QR code
 """
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
-def create_sample_logo():
-    """Create a professional sample logo"""
-    size = 100
+from fonts import get_font
+from logo_cache import cached_logo
+from png_output import save_png
+
+@cached_logo
+def render_sample_logo(size=100, text="LT"):
+    """Render the professional sample logo"""
     logo = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(logo)
     
@@ -22,11 +26,7 @@ def create_sample_logo():
                         fill=(*color, 200))
     
     # Add initials in the center
-    text = "LT"
-    try:
-        font = ImageFont.truetype("arial.ttf", size // 3)
-    except:
-        font = ImageFont.load_default()
+    font = get_font("sans", size // 3)
     
     bbox = draw.textbbox((0, 0), text, font=font)
     text_width = bbox[2] - bbox[0]
@@ -40,8 +40,14 @@ def create_sample_logo():
     # Add main text
     draw.text((text_x, text_y), text, fill=(255, 255, 255, 255), font=font)
     
+    return logo
+
+def create_sample_logo():
+    """Create a professional sample logo"""
+    logo = render_sample_logo()
+    
     # Save the logo
-    logo.save("logo.png", "PNG")
+    save_png(logo, "logo.png")
     print("✅ Sample logo created: logo.png")
     print("🎨 You can replace this with your own logo file")
 
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Font Registry for Logos and Cards
+Resolves typefaces once per process (configured paths, system font
+directories, then Pillow's bundled font) and caches FreeTypeFont objects
+per (family, size) instead of calling ImageFont.truetype ad hoc
+"""
+
+import os
+from functools import lru_cache
+
+from PIL import ImageFont
+
+# Candidate file names per family, in order of preference
+FAMILIES = {
+    "sans": [
+        "arial.ttf", "Arial.ttf", "DejaVuSans.ttf", "LiberationSans-Regular.ttf",
+        "FreeSans.ttf", "Helvetica.ttc",
+    ],
+    "sans-bold": [
+        "arialbd.ttf", "Arial Bold.ttf", "DejaVuSans-Bold.ttf", "LiberationSans-Bold.ttf",
+        "FreeSansBold.ttf",
+    ],
+    "mono": [
+        "consola.ttf", "DejaVuSansMono.ttf", "LiberationMono-Regular.ttf", "FreeMono.ttf",
+    ],
+}
+
+
+class FontNotFoundError(OSError):
+    """Raised in strict mode when no font file exists for a family"""
+
+
+def _system_font_dirs():
+    """Standard font directories (the ones fontconfig scans, plus macOS/Windows)"""
+    home = os.path.expanduser("~")
+    dirs = [os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts")]
+    if os.environ.get("LOCALAPPDATA"):
+        dirs.append(os.path.join(os.environ["LOCALAPPDATA"], "Microsoft", "Windows", "Fonts"))
+    return dirs + [
+        "/usr/share/fonts",
+        "/usr/local/share/fonts",
+        os.path.join(home, ".fonts"),
+        os.path.join(home, ".local", "share", "fonts"),
+        "/System/Library/Fonts",
+        "/Library/Fonts",
+        os.path.join(home, "Library", "Fonts"),
+    ]
+
+
+_config = {
+    # Extra directories or font files, e.g. QR_FONT_PATH=./fonts:/opt/brand/Brand.ttf
+    "paths": [p for p in os.environ.get("QR_FONT_PATH", "").split(os.pathsep) if p],
+    "strict": os.environ.get("QR_FONTS_STRICT", "") not in ("", "0"),
+}
+
+
+def configure(paths=None, strict=None):
+    """Set extra font paths and/or strict mode, and forget anything resolved so far"""
+    if paths is not None:
+        _config["paths"] = list(paths)
+    if strict is not None:
+        _config["strict"] = strict
+    _font_index.cache_clear()
+    find_font.cache_clear()
+    get_font.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def _font_index():
+    """Map lower-cased font file names to paths, scanning each directory once"""
+    index = {}
+
+    # Explicitly configured files win over anything found by scanning
+    for path in _config["paths"]:
+        if os.path.isfile(path):
+            index.setdefault(os.path.basename(path).lower(), path)
+
+    for directory in [p for p in _config["paths"] if os.path.isdir(p)] + _system_font_dirs():
+        if not os.path.isdir(directory):
+            continue
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.lower().endswith((".ttf", ".otf", ".ttc")):
+                    index.setdefault(name.lower(), os.path.join(root, name))
+
+    return index
+
+
+@lru_cache(maxsize=None)
+def find_font(family="sans"):
+    """Return the font file used for a family, or None if only the fallback is left"""
+    index = _font_index()
+
+    # A family may also be given directly as a file name or path
+    if os.path.isfile(family):
+        return family
+
+    for name in FAMILIES.get(family, [family]):
+        path = index.get(name.lower())
+        if path:
+            return path
+
+    if _config["strict"]:
+        searched = ", ".join(FAMILIES.get(family, [family]))
+        raise FontNotFoundError(f"No font found for family {family!r} (looked for: {searched})")
+    return None
+
+
+@lru_cache(maxsize=256)
+def get_font(family="sans", size=12):
+    """Return a cached FreeTypeFont for (family, size)"""
+    path = find_font(family)
+    if path:
+        return ImageFont.truetype(path, size)
+
+    # Pillow's bundled scalable font keeps the requested size when nothing else is available
+    return ImageFont.load_default(size)
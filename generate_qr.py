@@ -6,31 +6,33 @@ Enhanced with logo overlay support
 """
 
 import qrcode
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import os
 
+from card_layout import get_layout
+from fonts import get_font
+from logo_cache import cached_logo
+from logo_ingest import circular_logo
+from logo_registry import get_logo, styles as logo_styles
+from png_output import format_report, save_png
+from qr_matrix import get_matrix, render_matrix
+from qr_profile import profiled, stage
+from qr_verify import check_raster, format_report as format_check
+
+# Your live Azure URL
+PORTFOLIO_URL = "https://lotriet-jobfair-site-d4gvegbgaybne9cq.canadacentral-01.azurewebsites.net"
+DISPLAY_URL = "lotriet-jobfair-site.azurewebsites.net"
+
+@cached_logo(source_arg="logo_path")
 def create_logo(size=80, logo_path=None):
-    """Create a logo for the QR code center"""
+    """Create a logo for the QR code center (logo_path is an image file or a logo_registry style)"""
+    if logo_path and not os.path.exists(logo_path) and logo_path in logo_styles():
+        return get_logo(logo_path, size)
     if logo_path and os.path.exists(logo_path):
         # Use custom logo file
         try:
-            logo = Image.open(logo_path)
-            logo = logo.convert("RGBA")
-            
-            # Resize logo to fit
-            logo = logo.resize((size, size), Image.Resampling.LANCZOS)
-            
-            # Create circular mask
-            mask = Image.new('L', (size, size), 0)
-            mask_draw = ImageDraw.Draw(mask)
-            mask_draw.ellipse([0, 0, size, size], fill=255)
-            
-            # Apply circular mask to logo
-            circular_logo = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-            circular_logo.paste(logo, (0, 0))
-            circular_logo.putalpha(mask)
-            
-            return circular_logo
+            # Decodes only what an 80 px circle needs, even from a camera photo
+            return circular_logo(logo_path, size)
         except Exception as e:
             print(f"Warning: Could not load logo from {logo_path}: {e}")
             print("Falling back to default logo...")
@@ -47,13 +49,7 @@ def create_logo(size=80, logo_path=None):
     
     # Draw initials or icon in the center
     text = "LT"  # Your initials
-    try:
-        # Try to use a larger font
-        font_size = size // 3
-        font = ImageFont.truetype("arial.ttf", font_size)
-    except:
-        # Fallback to default font
-        font = ImageFont.load_default()
+    font = get_font("sans", size // 3)
     
     # Get text bounding box
     bbox = draw.textbbox((0, 0), text, font=font)
@@ -68,96 +64,57 @@ def create_logo(size=80, logo_path=None):
     
     return logo
 
-def create_portfolio_qr():
-    # Your live Azure URL
-    url = "https://lotriet-jobfair-site-d4gvegbgaybne9cq.canadacentral-01.azurewebsites.net"
+@profiled()
+def create_portfolio_qr(output_path="portfolio_qr_code_with_logo.png", logo_path="logo.png"):
+    url = PORTFOLIO_URL
     
-    # Create QR code instance
-    qr = qrcode.QRCode(
-        version=1,  # Controls the size of the QR Code
-        error_correction=qrcode.constants.ERROR_CORRECT_H,  # High error correction for logo overlay
-        box_size=10,  # Size of each box in pixels
-        border=4,    # Size of the border (minimum is 4)
-    )
+    # Encode the URL with high error correction for logo overlay (cached per URL);
+    # the uppercased host fits alphanumeric mode, version 6 instead of 8
+    with stage("encode"):
+        matrix = get_matrix(url, error_correction=qrcode.constants.ERROR_CORRECT_H, compact=True)
     
-    # Add data to QR code
-    qr.add_data(url)
-    qr.make(fit=True)
-    
-    # Create QR code image
-    qr_img = qr.make_image(fill_color="black", back_color="white")
+    # Create QR code image (10 px boxes, 4-module border which is the minimum)
+    with stage("rasterize"):
+        qr_img = render_matrix(matrix, box_size=10, border=4, fill_color="black", back_color="white")
     
     # Add logo to the center of QR code
     # You can specify a custom logo file here, e.g., "logo.png"
-    logo = create_logo(size=80, logo_path="logo.png")
+    with stage("logo"):
+        logo = create_logo(size=80, logo_path=logo_path)
     
     # Calculate position for logo (center of QR code)
     qr_width, qr_height = qr_img.size
     logo_size = logo.size[0]
     logo_pos = ((qr_width - logo_size) // 2, (qr_height - logo_size) // 2)
     
-    # Convert QR code to RGBA for transparency support
-    qr_img = qr_img.convert("RGBA")
+    with stage("composite"):
+        # Convert QR code to RGBA for transparency support
+        qr_img = qr_img.convert("RGBA")
     
-    # Paste logo onto QR code
-    qr_img.paste(logo, logo_pos, logo)
+        # Paste logo onto QR code
+        qr_img.paste(logo, logo_pos, logo)
     
-    # Create a larger image for the complete design
-    width, height = 800, 1000
-    img = Image.new('RGB', (width, height), 'white')
+    # Make sure the logo leaves every error correction block recoverable
+    with stage("verify"):
+        check = check_raster(qr_img, matrix, qrcode.constants.ERROR_CORRECT_H, border=4)
     
-    # Paste QR code in the center
-    qr_width, qr_height = qr_img.size
-    qr_x = (width - qr_width) // 2
-    qr_y = 200
-    img.paste(qr_img, (qr_x, qr_y))
-    
-    # Add text (simplified without custom fonts)
-    draw = ImageDraw.Draw(img)
-    
-    # Title
-    title = "🎯 Portfolio Demo"
-    title_bbox = draw.textbbox((0, 0), title)
-    title_width = title_bbox[2] - title_bbox[0]
-    draw.text(((width - title_width) // 2, 50), title, fill="black")
-    
-    # Subtitle
-    subtitle = "Scan to view .NET Micro API"
-    subtitle_bbox = draw.textbbox((0, 0), subtitle)
-    subtitle_width = subtitle_bbox[2] - subtitle_bbox[0]
-    draw.text(((width - subtitle_width) // 2, 100), subtitle, fill="gray")
-    
-    # URL
-    url_text = "lotriet-jobfair-site.azurewebsites.net"
-    url_bbox = draw.textbbox((0, 0), url_text)
-    url_width = url_bbox[2] - url_bbox[0]
-    draw.text(((width - url_width) // 2, qr_y + qr_height + 30), url_text, fill="black")
-    
-    # Features
-    features = [
-        "✅ .NET 8 Web API",
-        "✅ Async/Await Patterns", 
-        "✅ SQLite + Entity Framework",
-        "✅ Polly Retry Policy",
-        "✅ Azure Cloud Hosting",
-        "✅ Professional Portfolio"
-    ]
-    
-    y_start = qr_y + qr_height + 80
-    for i, feature in enumerate(features):
-        feature_bbox = draw.textbbox((0, 0), feature)
-        feature_width = feature_bbox[2] - feature_bbox[0]
-        draw.text(((width - feature_width) // 2, y_start + i * 30), feature, fill="darkblue")
+    with stage("composite"):
+        # The card's static text is drawn once per process (see card_templates.json);
+        # the code goes on opaque, as the logo paste leaves its edge partly transparent
+        img = get_layout("portfolio").render(qr=qr_img.convert("RGB"), url=DISPLAY_URL)
+        width, height = img.size
     
     # Save the image
-    output_path = "portfolio_qr_code_with_logo.png"
-    img.save(output_path, "PNG", quality=100)
+    with stage("save"):
+        report = save_png(img, output_path)
     
     print(f"✅ QR Code with logo generated successfully!")
     print(f"📁 Saved as: {output_path}")
     print(f"🌐 URL: {url}")
     print(f"📏 Image size: {width}x{height} pixels")
     print(f"🎨 Logo: Embedded in center")
+    print(f"🔍 {format_check(check)}")
+    print(f"📦 {format_report(report)}")
     print(f"🖨️ Ready for printing!")
     
     return output_path
@@ -8,7 +8,7 @@ C:/Expo/DotNetMicroDemo/.venv/Scripts/python.exe create_sample_logo.py
 
 echo.
 echo Step 2: Generating QR code with logo...
-C:/Expo/DotNetMicroDemo/.venv/Scripts/python.exe generate_qr.py
+C:/Expo/DotNetMicroDemo/.venv/Scripts/python.exe qrtool.py portfolio
 
 echo.
 echo ✅ Generation complete!
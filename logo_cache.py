@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Two-Tier Logo Render Cache
+Keeps rendered logos in an in-memory LRU in front of a content-addressed
+on-disk store, so repeat renders with the same parameters (and the same
+source image bytes) are a dictionary lookup instead of a redraw
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import sys
+import tempfile
+from collections import OrderedDict
+
+from PIL import Image
+
+from fonts import FAMILIES, FontNotFoundError, find_font
+from source_hashes import source_digest
+
+DEFAULT_CACHE_DIR = os.environ.get("QR_LOGO_CACHE_DIR", ".logo_cache")
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_DISK_BYTES = 64 * 1024 * 1024
+
+_digests = {}
+
+
+def file_digest(path):
+    """Return the SHA-256 of a file, memoized on (path, size, mtime)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    stamp = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _digests.get(stamp)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+        digest = _digests[stamp] = h.hexdigest()
+    return digest
+
+
+def font_paths():
+    """The font file each family resolves to right now (None for Pillow's fallback)"""
+    paths = []
+    for family in FAMILIES:
+        try:
+            paths.append((family, find_font(family)))
+        except FontNotFoundError:
+            paths.append((family, None))
+    return tuple(paths)
+
+
+@functools.lru_cache(maxsize=None)
+def code_digest(module):
+    """SHA-256 of a module's source and every local module it imports (what build_assets hashes)
+
+    Any edit to a renderer or the helpers it draws with changes the digest,
+    so the disk tier never serves a logo drawn by older code.
+    """
+    if module == "__main__":
+        module = os.path.splitext(os.path.basename(getattr(sys.modules[module], "__file__", "") or ""))[0]
+    return source_digest(module)
+
+
+@functools.lru_cache(maxsize=None)
+def renderer_stamp(module, qualname):
+    """The code and font part of a renderer's cache keys, worked out once per process
+
+    Call renderer_stamp.cache_clear() after fonts.configure() in a process
+    that has already rendered, so later keys see the new fonts.
+    """
+    return code_digest(module), font_paths()
+
+
+class LogoCache:
+    """In-memory LRU of logo images backed by a size-bounded directory of PNGs"""
+
+    def __init__(self, memory_entries=DEFAULT_MEMORY_ENTRIES, disk_dir=DEFAULT_CACHE_DIR,
+                 disk_max_bytes=DEFAULT_DISK_BYTES):
+        self.memory_entries = memory_entries
+        self.disk_dir = disk_dir or None
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()
+        self._disk_bytes = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_render(self, key, render):
+        """Return the cached logo for key, calling render() only on a miss"""
+        logo = self._memory.get(key)
+        if logo is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return logo
+
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        logo = self._read_disk(digest)
+        if logo is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            logo = render()
+            self._write_disk(digest, logo)
+
+        self._remember(key, logo)
+        return logo
+
+    def clear(self, disk=False):
+        """Empty the memory tier (and optionally the disk tier)"""
+        self._memory.clear()
+        if disk and self.disk_dir:
+            for _, _, path in list(self._disk_entries()):
+                os.remove(path)
+            self._disk_bytes = 0
+
+    def stats(self):
+        """Return hit/miss counters and the size of both tiers"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "disk_bytes": self._scan_disk() if self.disk_dir else 0,
+        }
+
+    def _remember(self, key, logo):
+        self._memory[key] = logo
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, digest):
+        return os.path.join(self.disk_dir, digest[:2], digest + ".png")
+
+    def _read_disk(self, digest):
+        if not self.disk_dir:
+            return None
+        path = self._path(digest)
+        try:
+            with Image.open(path) as img:
+                img.load()
+                logo = img.copy()
+            os.utime(path)  # Mark as recently used for eviction
+            return logo
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, digest, logo):
+        if not self.disk_dir:
+            return
+        path = self._path(digest)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".png", dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                logo.save(f, "PNG")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not write logo cache entry: {e}")
+            return
+
+        if self._disk_bytes is None:
+            self._scan_disk()
+        else:
+            self._disk_bytes += os.path.getsize(path)
+        if self._disk_bytes > self.disk_max_bytes:
+            self._evict_disk()
+
+    def _disk_entries(self):
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if name.endswith(".png") and not name.startswith(".tmp-"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    yield st.st_mtime, st.st_size, path
+
+    def _scan_disk(self):
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+        return self._disk_bytes
+
+    def _evict_disk(self):
+        # Drop least recently used files until the store is back under 90% of its budget
+        target = self.disk_max_bytes * 0.9
+        total = sum(size for _, size, _ in self._disk_entries())
+        for _, size, path in sorted(self._disk_entries()):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.evictions += 1
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+
+default_cache = LogoCache()
+
+
+def cached_logo(func=None, *, source_arg=None):
+    """Decorator that serves a logo renderer's results from the default cache
+
+    The key is the renderer name, the hash of its code, the resolved font
+    files and its bound arguments; when source_arg names a file-path
+    argument, that file's content hash is part of the key too. Callers get a copy they are free to modify.
+    """
+    if func is None:
+        return functools.partial(cached_logo, source_arg=source_arg)
+
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = tuple(sorted(bound.arguments.items()))
+
+        source = None
+        if source_arg and bound.arguments.get(source_arg):
+            source = file_digest(bound.arguments[source_arg])
+
+        key = (func.__module__, func.__qualname__, renderer_stamp(func.__module__, func.__qualname__), arguments, source)
+        return default_cache.get_or_render(key, lambda: func(*args, **kwargs)).copy()
+
+    wrapper.uncached = func
+    return wrapper
+
+
+def cache_stats():
+    """Return statistics for the default logo cache"""
+    return default_cache.stats()
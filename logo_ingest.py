@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Bounded-Memory Logo Ingestion
+Turns whatever image someone drops in as a logo (a 24 MP camera JPEG, a huge
+PNG export) into a small square without decoding more than it needs: JPEGs
+are decoded at a reduced scale (draft mode), the center square is cropped
+and resampled in one step with reducing_gap, and oversized sources are
+refused before any pixel data is read
+"""
+
+import functools
+
+from PIL import Image, ImageChops, ImageDraw
+
+# Refuse sources above this many pixels (a 12000 x 8000 image) before decoding
+DEFAULT_MAX_PIXELS = 96_000_000
+
+# Decode at least this many times the target size so LANCZOS has detail to work with
+DRAFT_HEADROOM = 2
+
+# Box-reduce by whole factors until within this many times the target, then LANCZOS
+REDUCING_GAP = 3.0
+
+SUPERSAMPLE = 4
+
+# EXIF orientation tag -> transpose that makes the image upright
+_ORIENTATION = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+@functools.lru_cache(maxsize=32)
+def circle_mask(size):
+    """An antialiased circle filling a size x size L image (cached; do not modify)"""
+    big = size * SUPERSAMPLE
+    mask = Image.new('L', (big, big), 0)
+    ImageDraw.Draw(mask).ellipse([0, 0, big - 1, big - 1], fill=255)
+    return mask.reduce(SUPERSAMPLE)
+
+
+def _center_square(width, height):
+    side = min(width, height)
+    left, top = (width - side) / 2, (height - side) / 2
+    return (left, top, left + side, top + side)
+
+
+def load_square(source, size, max_pixels=DEFAULT_MAX_PIXELS):
+    """Decode the center square of an image (path or file object) as a size x size image
+
+    The result is RGBA when the source has transparency and RGB otherwise,
+    upright according to its EXIF orientation. Raises ValueError for
+    sources above max_pixels.
+    """
+    with Image.open(source) as img:
+        width, height = img.size
+        if width * height > max_pixels:
+            raise ValueError(f"Logo is {width}x{height} ({width * height / 1e6:.0f} MP); "
+                             f"the limit is {max_pixels / 1e6:.0f} MP")
+        orientation = img.getexif().get(0x0112)
+
+        # JPEG can decode at 1/2, 1/4 or 1/8 scale; this picks the smallest that
+        # still leaves DRAFT_HEADROOM x size pixels across the short side
+        short = min(width, height)
+        target = size * DRAFT_HEADROOM
+        if short > target:
+            img.draft("RGB", (width * target // short, height * target // short))
+
+        if img.mode not in ("RGB", "RGBA") or "transparency" in img.info:
+            transparent = img.mode in ("LA", "PA", "RGBA") or "transparency" in img.info
+            img = img.convert("RGBA" if transparent else "RGB")
+        square = img.resize((size, size), Image.Resampling.LANCZOS,
+                            box=_center_square(*img.size), reducing_gap=REDUCING_GAP)
+
+    if orientation in _ORIENTATION:
+        # The center square of a rotated image is the rotated center square
+        square = square.transpose(_ORIENTATION[orientation])
+    return square
+
+
+def circular_logo(source, size, max_pixels=DEFAULT_MAX_PIXELS):
+    """The center of an image as a size x size RGBA circle with an antialiased edge"""
+    logo = load_square(source, size, max_pixels).convert("RGBA")
+    if logo.getchannel("A").getextrema() != (255, 255):
+        # Keep the source's own transparency inside the circle
+        logo.putalpha(ImageChops.darker(logo.getchannel("A"), circle_mask(size)))
+    else:
+        logo.putalpha(circle_mask(size))
+    return logo
+
+
+def main(argv=None):
+    """Ingest one logo and report the time and peak memory: python logo_ingest.py photo.jpg"""
+    import argparse
+    import resource
+    import time
+
+    parser = argparse.ArgumentParser(description="Make a circular logo from any image with bounded memory")
+    parser.add_argument("source")
+    parser.add_argument("--size", type=int, default=80, help="logo width in pixels (default 80)")
+    parser.add_argument("--max-pixels", type=int, default=DEFAULT_MAX_PIXELS)
+    parser.add_argument("-o", "--output", default="logo_ingested.png")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        logo = circular_logo(args.source, args.size, args.max_pixels)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = (time.perf_counter() - start) * 1000
+    logo.save(args.output)
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"✅ Saved {args.output} ({args.size}px, {elapsed:.1f} ms, peak RSS {peak_mb:.0f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Logo Style Registry and Sprite Atlas
+Logo styles are registered by name as render callables (or "module:function"
+references, imported on first use) and drawn lazily at whatever size is
+asked for. The registry packs every style into one sprite atlas with a
+JSON index, so the web front end fetches all logos in one request, and
+batch jobs memory-map a raw copy of the atlas and slice logos out of it
+instead of decoding a PNG per logo
+"""
+
+import functools
+import hashlib
+import importlib
+import json
+import mmap
+import os
+import re
+import tempfile
+
+from PIL import Image
+
+from logo_cache import DEFAULT_CACHE_DIR
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Served by the ASP.NET app from wwwroot/assets
+ATLAS_PATH = os.path.join(ROOT, "wwwroot", "assets", "logo-atlas.png")
+ATLAS_SIZES = (100, 200)
+ATLAS_PADDING = 2
+ATLAS_VERSION = 1
+
+
+class LogoStyle:
+    """A named logo renderer: render(size=...) with any fixed options"""
+
+    def __init__(self, name, render, description="", options=None):
+        self.name = name
+        self._render = render
+        self.description = description
+        self.options = dict(options or {})
+
+    @property
+    def renderer(self):
+        # "module:function" references are only imported when a logo is first drawn
+        if isinstance(self._render, str):
+            module, function = self._render.split(":")
+            self._render = getattr(importlib.import_module(module), function)
+        return self._render
+
+    def render(self, size=100):
+        return self.renderer(size=size, **self.options)
+
+
+_styles = {}
+
+
+def register(name, render=None, description="", **options):
+    """Register a logo style; use as register("name", func) or as a @register("name") decorator
+
+    render takes a size keyword and returns an RGBA image; options are
+    passed to it on every call. Registering an existing name replaces it.
+    """
+    if render is None:
+        return functools.partial(_register_decorator, name, description, options)
+    _styles[name] = LogoStyle(name, render, description, options)
+    return render
+
+
+def _register_decorator(name, description, options, render):
+    return register(name, render, description, **options)
+
+
+def styles():
+    """Names of every registered style, in registration order"""
+    return list(_styles)
+
+
+def get_style(name):
+    try:
+        return _styles[name]
+    except KeyError:
+        raise KeyError(f"No logo style {name!r} (have: {', '.join(_styles)})") from None
+
+
+def get_logo(name, size=100):
+    """Render a registered style at size (the renderers cache through logo_cache)"""
+    return get_style(name).render(size=size)
+
+
+register("coffee", "create_advanced_logos:create_coffee_logo", "Coffee cup, for cafés and restaurants")
+register("tech", "create_advanced_logos:create_tech_logo", "Code brackets, for developers and tech companies")
+register("business", "create_advanced_logos:create_business_logo", "Initials, for professional business cards",
+         initials="LT")
+register("creative", "create_advanced_logos:create_creative_logo", "Pie slices and a star, for creative fields")
+register("gradient", "create_premium_qr:create_premium_logo", "Premium gradient initials", style="gradient")
+register("modern", "create_premium_qr:create_premium_logo", "Flat initials with an accent ring", style="modern")
+register("glass", "create_premium_qr:create_premium_logo", "Translucent glass initials", style="glass")
+
+
+def _shelves(sizes, order, width, padding):
+    positions = [None] * len(sizes)
+    x = y = shelf = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w + padding > width:
+            x, y, shelf = 0, y + shelf, 0
+        positions[i] = (x + padding, y + padding)
+        x += w + padding
+        shelf = max(shelf, h + padding)
+    return width + padding, y + shelf + padding, positions
+
+
+def pack(sizes, padding=ATLAS_PADDING):
+    """Shelf-pack [(width, height)] rectangles; return (atlas width, atlas height, [(x, y)])
+
+    Tallest first onto rows, trying every row width that ends on a
+    rectangle edge and keeping the smallest sheet; each rectangle sits
+    padding pixels from its neighbours so scaled sprites do not bleed.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0], i))
+    widths, total = [], 0
+    for i in order:
+        total += sizes[i][0] + padding
+        widths.append(total)
+    packings = [_shelves(sizes, order, width, padding) for width in widths]
+    # Smallest area, then the squarer sheet
+    return min(packings, key=lambda p: (p[0] * p[1], abs(p[0] - p[1])))
+
+
+def build_atlas(names=None, sizes=ATLAS_SIZES, padding=ATLAS_PADDING):
+    """Render styles at every size onto one RGBA sheet; return (atlas, sprites)
+
+    sprites maps style name -> {str(size): [x, y, width, height]}.
+    """
+    names = list(names or styles())
+    logos = [(name, size, get_logo(name, size)) for name in names for size in sizes]
+    width, height, positions = pack([logo.size for _, _, logo in logos], padding)
+
+    atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    sprites = {name: {} for name in names}
+    for (name, size, logo), (x, y) in zip(logos, positions):
+        atlas.paste(logo, (x, y))
+        sprites[name][str(size)] = [x, y, logo.size[0], logo.size[1]]
+    return atlas, sprites
+
+
+def index_path(png_path):
+    return os.path.splitext(png_path)[0] + ".json"
+
+
+def write_atlas(png_path=ATLAS_PATH, names=None, sizes=ATLAS_SIZES, padding=ATLAS_PADDING):
+    """Write the atlas PNG and its JSON index next to it; return the index"""
+    from png_output import save_png
+
+    atlas, sprites = build_atlas(names, sizes, padding)
+    report = save_png(atlas, png_path)
+    with open(png_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+
+    index = {
+        "version": ATLAS_VERSION,
+        "image": os.path.basename(png_path),
+        "width": atlas.size[0],
+        "height": atlas.size[1],
+        "sha256": digest,
+        "sprites": sprites,
+        "styles": {name: get_style(name).description for name in sprites},
+    }
+    text = json.dumps(index, indent=2, sort_keys=True, ensure_ascii=False)
+    # One line per sprite box keeps the index readable
+    text = re.sub(r"\[\s+([\d,\s]+?)\s+\]", lambda m: "[" + ", ".join(n.strip() for n in m.group(1).split(",")) + "]",
+                  text)
+    with open(index_path(png_path), "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+    index["bytes"] = report["bytes"]
+    return index
+
+
+class LogoAtlas:
+    """A written atlas opened for slicing: the pixels are a read-only memory map
+
+    The PNG is decoded once into a raw RGBA file in the logo cache
+    directory (named by the PNG's hash); every later open, in any process,
+    maps that file, so slicing a logo only touches the pages it covers.
+    """
+
+    def __init__(self, path=ATLAS_PATH, cache_dir=DEFAULT_CACHE_DIR):
+        path = index_path(path) if path.endswith(".png") else path
+        with open(path, encoding="utf-8") as f:
+            self.index = json.load(f)
+        if self.index.get("version") != ATLAS_VERSION:
+            raise ValueError(f"{path} is atlas version {self.index.get('version')}, expected {ATLAS_VERSION}")
+
+        self.png_path = os.path.join(os.path.dirname(path), self.index["image"])
+        self.sprites = self.index["sprites"]
+        size = (self.index["width"], self.index["height"])
+        self._file = self._map = None
+
+        if not cache_dir:
+            with Image.open(self.png_path) as img:
+                self.image = img.convert("RGBA")
+            return
+
+        raw_path = os.path.join(cache_dir, "atlas", self.index["sha256"] + ".rgba")
+        if not os.path.exists(raw_path):
+            self._write_raw(raw_path)
+        self._file = open(raw_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.image = Image.frombuffer("RGBA", size, self._map, "raw", "RGBA", 0, 1)
+
+    def _write_raw(self, raw_path):
+        with Image.open(self.png_path) as img:
+            data = img.convert("RGBA").tobytes()
+        os.makedirs(os.path.dirname(raw_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".rgba", dir=os.path.dirname(raw_path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, raw_path)
+
+    def __contains__(self, name):
+        return name in self.sprites
+
+    def names(self):
+        return list(self.sprites)
+
+    def get(self, name, size=100):
+        """The sprite for a style at size; other sizes are resampled from the next larger sprite"""
+        if name not in self.sprites:
+            raise KeyError(f"No logo {name!r} in atlas {self.png_path}")
+        boxes = {int(s): box for s, box in self.sprites[name].items()}
+        nearest = min((s for s in boxes if s >= size), default=max(boxes))
+        x, y, w, h = boxes[nearest]
+        logo = self.image.crop((x, y, x + w, y + h))
+        if nearest != size:
+            logo = logo.resize((size, size), Image.Resampling.LANCZOS)
+        return logo
+
+    def close(self):
+        if self._map is not None:
+            self.image = None
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
+
+
+@functools.lru_cache(maxsize=4)
+def open_atlas(path=ATLAS_PATH):
+    """A LogoAtlas shared by everything in this process (e.g. one per batch worker)"""
+    return LogoAtlas(path)
+
+
+def main(argv=None):
+    """Write the atlas, or time slicing it against decoding one PNG per logo"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Logo style registry and sprite atlas")
+    parser.add_argument("--list", action="store_true", help="list the registered styles")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(ATLAS_SIZES), help="sprite sizes in pixels")
+    parser.add_argument("-o", "--output", default=ATLAS_PATH, help="atlas PNG (the JSON index goes next to it)")
+    parser.add_argument("--bench", type=int, metavar="N", help="slice N logos from the atlas vs decoding PNGs")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name in styles():
+            print(f"🎨 {name}: {get_style(name).description}")
+        return 0
+
+    start = time.perf_counter()
+    index = write_atlas(args.output, sizes=args.sizes)
+    elapsed = (time.perf_counter() - start) * 1000
+    sprites = sum(len(sizes) for sizes in index["sprites"].values())
+    print(f"✅ Atlas: {sprites} sprites on {index['width']}x{index['height']} "
+          f"({index['bytes']:,} bytes, {elapsed:.0f} ms)")
+    print(f"📁 Saved as: {args.output} + {os.path.basename(index_path(args.output))}")
+
+    if args.bench:
+        size = args.sizes[0]
+        files = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in index["sprites"]:
+                files[name] = os.path.join(tmp, f"{name}.png")
+                get_logo(name, size).save(files[name])
+            names = [list(files)[i % len(files)] for i in range(args.bench)]
+
+            start = time.perf_counter()
+            for name in names:
+                with Image.open(files[name]) as img:
+                    img.load()
+            decoded = (time.perf_counter() - start) * 1000
+
+        # The first open decodes the PNG into the raw cache file; time a later one
+        LogoAtlas(args.output).close()
+        open_atlas.cache_clear()
+        start = time.perf_counter()
+        atlas = open_atlas(args.output)
+        for name in names:
+            atlas.get(name, size)
+        sliced = (time.perf_counter() - start) * 1000
+        print(f"⏱️ {args.bench} logos at {size}px: PNG decode {decoded:.0f} ms, "
+              f"atlas slices {sliced:.0f} ms ({decoded / sliced:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
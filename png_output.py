@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+PNG Output Stage
+Saves images in the smallest lossless PNG mode (1-bit, grayscale or an
+exact adaptive palette with alpha) with tunable zlib settings, and
+reports the encode time and byte size of every file written
+"""
+
+import io
+import os
+import sys
+import time
+
+from PIL import Image, ImageChops
+
+# zlib strategies accepted by Pillow's PNG encoder (compress_type)
+STRATEGIES = {
+    "default": 0,
+    "filtered": 1,   # Favors PNG's own row filters; good for photos and gradients
+    "huffman": 2,    # Huffman only, no string matching: fastest
+    "rle": 3,        # Run-length matches only: fast and strong for flat QR/card art
+    "fixed": 4,
+}
+
+DEFAULT_COMPRESS_LEVEL = 6
+DEFAULT_STRATEGY = "default"
+
+
+def _identical(a, b):
+    return ImageChops.difference(a, b).getbbox() is None
+
+
+def reduce_mode(img):
+    """Return the image in the smallest PNG mode that loses no pixel data"""
+    if img.mode in ("1", "P"):
+        return img
+
+    if img.mode in ("LA", "RGBA", "PA"):
+        alpha = img.getchannel("A")
+        if alpha.getextrema() == (255, 255):
+            img = img.convert("RGB" if img.mode != "LA" else "L")
+
+    if img.mode not in ("L", "RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+
+    colors = img.getcolors(256)
+    if colors is None:
+        # More than 256 colors: at most drop color if every pixel is gray
+        if img.mode == "RGB":
+            gray = img.convert("L")
+            if _identical(gray.convert("RGB"), img):
+                return gray
+        return img
+
+    if img.mode != "RGBA":
+        rgb = [c if isinstance(c, tuple) else (c, c, c) for _, c in colors]
+        if all(r == g == b for r, g, b in rgb):
+            levels = {r for r, _, _ in rgb}
+            if levels <= {0, 255}:
+                return img.convert("L").point(lambda v: 255 if v else 0, "1")
+            if len(levels) > 16:
+                return img.convert("L")
+
+        # Exact palette: every color present becomes one palette entry
+        palette = Image.new("P", (1, 1))
+        flat = [channel for color in rgb for channel in color]
+        palette.putpalette(flat + flat[:3] * (256 - len(rgb)))
+        paletted = img.convert("RGB").quantize(palette=palette, dither=Image.Dither.NONE)
+        return paletted if _identical(paletted.convert("RGB"), img.convert("RGB")) else img
+
+    # RGBA with few colors: an octree palette keeps per-entry alpha via tRNS
+    paletted = img.quantize(len(colors), method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    return paletted if _identical(paletted.convert("RGBA"), img) else img
+
+
+def limit_colors(img, max_colors):
+    """Lossy fallback: quantize to an adaptive palette of at most max_colors"""
+    method = Image.Quantize.FASTOCTREE if img.mode == "RGBA" else Image.Quantize.MEDIANCUT
+    return img.quantize(max_colors, method=method, dither=Image.Dither.NONE)
+
+
+def save_png(img, target, compress_level=DEFAULT_COMPRESS_LEVEL, strategy=DEFAULT_STRATEGY,
+             optimize=False, reduce=True, max_colors=None):
+    """Save img as PNG to a path or binary file object and return a report dict
+
+    Mode reduction is always lossless; max_colors opts in to an adaptive
+    palette for images that still have too many colors (e.g. web assets).
+    Only pixel data is written: no ICC profile, text, time or dpi chunks
+    carried over from source images, so the same pixels always give the
+    same bytes and content-hashed asset names stay stable.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown zlib strategy: {strategy} (expected one of {', '.join(STRATEGIES)})")
+
+    start = time.perf_counter()
+    out = img if not reduce else reduce_mode(img)
+    lossy = False
+    if max_colors and out.mode in ("RGB", "RGBA") and out.getcolors(max_colors) is None:
+        out = limit_colors(out, max_colors)
+        lossy = True
+    reduced = time.perf_counter()
+
+    buffer = io.BytesIO()
+    # Pillow copies an opened file's ICC profile into the output unless told not to
+    out.save(buffer, "PNG", compress_level=compress_level, compress_type=STRATEGIES[strategy],
+             optimize=optimize, icc_profile=None)
+    data = buffer.getvalue()
+    encoded = time.perf_counter()
+
+    if hasattr(target, "write"):
+        target.write(data)
+        path = getattr(target, "name", None)
+    else:
+        with open(target, "wb") as f:
+            f.write(data)
+        path = target
+
+    return {
+        "path": path,
+        "source_mode": img.mode,
+        "mode": out.mode,
+        "lossy": lossy,
+        "bytes": len(data),
+        "reduce_ms": (reduced - start) * 1000,
+        "encode_ms": (encoded - reduced) * 1000,
+    }
+
+
+def format_report(report):
+    """One-line human readable summary of a save_png report"""
+    lossy = " (palette)" if report.get("lossy") else ""
+    return (f"{report['path']}: {report['bytes']:,} bytes, {report['source_mode']} -> {report['mode']}{lossy}, "
+            f"encoded in {report['reduce_ms'] + report['encode_ms']:.1f} ms")
+
+
+def main(argv=None):
+    """Re-encode existing PNG files in place with the output stage"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Losslessly shrink PNG files")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--level", type=int, default=DEFAULT_COMPRESS_LEVEL, help="zlib level 0-9")
+    parser.add_argument("--strategy", choices=STRATEGIES, default=DEFAULT_STRATEGY)
+    parser.add_argument("--optimize", action="store_true", help="extra encoder pass (slower)")
+    parser.add_argument("--colors", type=int, default=None,
+                        help="allow a lossy adaptive palette of this many colors for busy images")
+    args = parser.parse_args(argv)
+
+    for path in args.files:
+        before = os.path.getsize(path)
+        with Image.open(path) as img:
+            img.load()
+
+        buffer = io.BytesIO()
+        report = save_png(img, buffer, args.level, args.strategy, args.optimize, max_colors=args.colors)
+        report["path"] = path
+        if report["bytes"] >= before:
+            print(f"⏭️ {path}: already {before:,} bytes, left unchanged")
+            continue
+
+        with open(path, "wb") as f:
+            f.write(buffer.getvalue())
+        print(f"✅ {format_report(report)} (was {before:,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Content-Hashed Asset Publishing
+Copies the generated web assets into wwwroot/assets/dist under names that
+carry a hash of their bytes (logo-atlas.1a2b3c4d5e6f.png), records
+logical name -> URL in wwwroot/assets/manifest.json and points the pages
+at the current names. A file whose hash is already published is neither
+written nor reported as changed, so only new bytes need uploading, and
+every published URL can be cached forever
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+WWWROOT = os.path.join(ROOT, "wwwroot")
+DIST_DIR = os.path.join(WWWROOT, "assets", "dist")
+MANIFEST_PATH = os.path.join(WWWROOT, "assets", "manifest.json")
+MANIFEST_VERSION = 1
+
+HASH_LENGTH = 12
+
+# Logical name -> generated file (relative to the repository root), in publish order:
+# the atlas index names its image, so the image is published first
+ASSETS = {
+    "logo-atlas.png": "wwwroot/assets/logo-atlas.png",
+    "logo-atlas.json": "wwwroot/assets/logo-atlas.json",
+    "portfolio_qr_code_with_logo.png": "portfolio_qr_code_with_logo.png",
+}
+
+# Pages whose asset references are kept pointing at the published names
+PAGE_PATTERNS = ("*.html", "assets/*.js", "assets/*.css")
+
+
+def hashed_name(name, data):
+    """name with the first HASH_LENGTH hex digits of the SHA-256 of data before its extension"""
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def url_for(path, root=WWWROOT):
+    """The site URL of a file under wwwroot, as pages reference it"""
+    return os.path.relpath(path, root).replace(os.sep, "/")
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """The manifest's {"files": {name: url}, "previous": [url]}, empty when missing or outdated"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"files": {}, "previous": []}
+    return {"files": manifest.get("files", {}), "previous": manifest.get("previous", [])}
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    # mkstemp files are owner-only; published files are served to everyone
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def _write_if_changed(path, data, dry_run=False):
+    """Write data unless the file already holds exactly it; return whether it changed"""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    if not dry_run:
+        _write_atomic(path, data)
+    return True
+
+
+def _read_asset(name, source, files):
+    with open(os.path.join(ROOT, source), "rb") as f:
+        data = f.read()
+    if name == "logo-atlas.json":
+        # The published index points at the published image, next to it in dist
+        index = json.loads(data)
+        image = files.get(index["image"])
+        if image:
+            index["image"] = image.rsplit("/", 1)[-1]
+        data = json.dumps(index, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return data
+
+
+def reference_pattern(name):
+    """Matches a page's reference to an asset: assets/<name> or any published assets/dist/<name>"""
+    stem, ext = os.path.splitext(name)
+    return re.compile(rf"assets/(?:dist/)?{re.escape(stem)}(?:\.[0-9a-f]{{{HASH_LENGTH}}})?{re.escape(ext)}")
+
+
+def page_paths(root=WWWROOT):
+    paths = set()
+    for pattern in PAGE_PATTERNS:
+        paths.update(glob.glob(os.path.join(root, pattern)))
+    return sorted(paths)
+
+
+def rewrite_page(text, files):
+    """Point every asset reference in a page at its published URL"""
+    for name, url in files.items():
+        text = reference_pattern(name).sub(url, text)
+    return text
+
+
+def publish(assets=None, dist_dir=DIST_DIR, manifest_path=MANIFEST_PATH, dry_run=False):
+    """Publish assets and rewrite the pages; return a report of what changed
+
+    The report lists written hashed files (the only ones to upload),
+    rewritten pages, stale hashed files removed and whether the manifest
+    changed. The hashed files replaced by the last publish that changed
+    anything are kept (listed as "previous" in the manifest) until the next
+    such publish, so pages already loaded from the old names keep working.
+    """
+    assets = ASSETS if assets is None else assets
+    root = os.path.dirname(os.path.dirname(manifest_path))
+    previous = load_manifest(manifest_path)
+    files, written, unchanged = {}, [], []
+
+    for name, source in assets.items():
+        data = _read_asset(name, source, files)
+        path = os.path.join(dist_dir, hashed_name(name, data))
+        files[name] = url_for(path, root)
+        if os.path.exists(path) and os.path.getsize(path) == len(data):
+            # The name is the hash: same name and size means the same bytes
+            unchanged.append(files[name])
+            continue
+        if not dry_run:
+            _write_atomic(path, data)
+        written.append(files[name])
+
+    if files == previous["files"]:
+        kept = previous["previous"]
+    else:
+        kept = sorted(set(previous["files"].values()) - set(files.values()))
+    manifest = {"version": MANIFEST_VERSION, "files": files, "previous": kept}
+    text = json.dumps(manifest, indent=2, sort_keys=True) + "\n"
+    manifest_changed = _write_if_changed(manifest_path, text.encode("utf-8"), dry_run)
+
+    pages = []
+    for path in page_paths(root):
+        with open(path, encoding="utf-8", newline="") as f:
+            page = f.read()
+        if _write_if_changed(path, rewrite_page(page, files).encode("utf-8"), dry_run):
+            pages.append(url_for(path, root))
+
+    keep = {url.rsplit("/", 1)[-1] for url in list(files.values()) + kept}
+    removed = []
+    if os.path.isdir(dist_dir):
+        for entry in sorted(os.listdir(dist_dir)):
+            if entry not in keep and not entry.startswith("."):
+                if not dry_run:
+                    os.remove(os.path.join(dist_dir, entry))
+                removed.append(entry)
+
+    return {
+        "files": files,
+        "written": written,
+        "unchanged": unchanged,
+        "pages": pages,
+        "removed": removed,
+        "manifest_changed": manifest_changed,
+    }
+
+
+def main(argv=None):
+    """Publish the generated assets: python publish_assets.py [--check] [--changes upload.txt]"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Publish generated assets under content-hashed names")
+    parser.add_argument("--check", action="store_true",
+                        help="change nothing; exit 1 if publishing would write or rewrite anything")
+    parser.add_argument("--changes", metavar="PATH",
+                        help="write the wwwroot paths of newly written files, one per line, for an upload step")
+    args = parser.parse_args(argv)
+
+    try:
+        report = publish(dry_run=args.check)
+    except FileNotFoundError as e:
+        print(f"❌ Missing generated file: {e.filename} (run build_assets.py first)")
+        return 1
+
+    verb = "Would write" if args.check else "Wrote"
+    for url in report["written"]:
+        print(f"✅ {verb} {url}")
+    for url in report["pages"]:
+        print(f"📝 {'Would rewrite' if args.check else 'Rewrote'} {url}")
+    for entry in report["removed"]:
+        print(f"🧹 {'Would remove' if args.check else 'Removed'} stale {entry}")
+    print(f"📦 {len(report['written'])} written, {len(report['unchanged'])} unchanged, "
+          f"manifest {'changed' if report['manifest_changed'] else 'unchanged'}")
+
+    if args.changes and not args.check:
+        with open(args.changes, "w", encoding="utf-8") as f:
+            f.writelines(f"{url}\n" for url in report["written"])
+
+    if args.check:
+        dirty = report["written"] or report["pages"] or report["removed"] or report["manifest_changed"]
+        return 1 if dirty else 0
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Load Test for the Local QR Service
+Opens many keep-alive connections to qr_server.py on localhost, replays a
+fixed set of /qr URLs and reports throughput and latency percentiles for
+cache hits, misses and conditional (304) requests
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode, urlsplit
+
+STYLES = ("premium", "modern", "colorful", "classic")
+
+
+def build_paths(count, fmt="png", size=300, prefix="https://jobfair.example/attendee/"):
+    """A deterministic set of distinct /qr request paths"""
+    return [
+        "/qr?" + urlencode({"data": f"{prefix}{i:05d}", "style": STYLES[i % len(STYLES)],
+                            "size": size, "fmt": fmt})
+        for i in range(count)
+    ]
+
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client for one connection"""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, path, headers=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f"GET {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await self.writer.drain()
+
+        head = (await self.reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        status = int(head[0].split(" ", 2)[1])
+        response_headers = {}
+        for line in head[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                response_headers[name.strip().lower()] = value.strip()
+        length = int(response_headers.get("content-length", 0))
+        body = await self.reader.readexactly(length) if length else b""
+        if response_headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, response_headers, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def run_phase(host, port, paths, requests, concurrency, etags=None):
+    """Send requests spread over paths from concurrency connections; return latencies and statuses"""
+    latencies, statuses = [], {}
+    counter = iter(range(requests))
+
+    async def client():
+        conn = Connection(host, port)
+        try:
+            for i in counter:
+                path = paths[i % len(paths)]
+                headers = {"If-None-Match": etags[path]} if etags and path in etags else None
+                start = time.perf_counter()
+                status, response_headers, _ = await conn.request(path, headers)
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            conn.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def format_phase(name, latencies, statuses, seconds):
+    codes = ", ".join(f"{code}x{count}" for code, count in sorted(statuses.items()))
+    return (f"{name:<12} {len(latencies):>7} req {len(latencies) / seconds:>9.0f} req/s   "
+            f"p50 {percentile(latencies, 50):7.2f} ms  p90 {percentile(latencies, 90):7.2f} ms  "
+            f"p99 {percentile(latencies, 99):7.2f} ms  max {max(latencies):7.2f} ms  [{codes}]")
+
+
+async def wait_ready(host, port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            conn = Connection(host, port)
+            status, _, _ = await conn.request("/healthz")
+            conn.close()
+            if status == 200:
+                return
+        except OSError:
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"QR service on {host}:{port} did not come up")
+        await asyncio.sleep(0.2)
+
+
+async def load_test(url, unique, requests, concurrency, fmt, size):
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    await wait_ready(host, port)
+
+    paths = build_paths(unique, fmt, size)
+    results = {}
+
+    # Misses: every distinct path once (renders in the pool, with dedupe under concurrency)
+    results["miss"] = await run_phase(host, port, paths, len(paths), concurrency)
+
+    # Hits: the same paths over and over, answered from the response cache
+    results["hit"] = await run_phase(host, port, paths, requests, concurrency)
+
+    # Conditional: clients that already hold the ETag get 304 with no body
+    conn = Connection(host, port)
+    etags = {}
+    for path in paths:
+        _, headers, _ = await conn.request(path)
+        etags[path] = headers["etag"]
+    conn.close()
+    results["conditional"] = await run_phase(host, port, paths, requests, concurrency, etags)
+
+    conn = Connection(host, port)
+    _, _, stats = await conn.request("/stats")
+    conn.close()
+    return results, stats.decode()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test qr_server.py on localhost")
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="service base URL")
+    parser.add_argument("-n", "--requests", type=int, default=20000, help="requests per hit/304 phase")
+    parser.add_argument("-c", "--concurrency", type=int, default=20, help="concurrent connections")
+    parser.add_argument("-u", "--unique", type=int, default=100, help="distinct codes in the working set")
+    parser.add_argument("--fmt", choices=("png", "svg"), default="png")
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--start-server", action="store_true", help="launch qr_server.py for the run")
+    parser.add_argument("--p99-budget", type=float, default=10.0,
+                        help="fail if cache-hit p99 latency exceeds this many ms (default 10)")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.start_server:
+        port = str(urlsplit(args.url).port or 8765)
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "qr_server.py")
+        server = subprocess.Popen([sys.executable, script, "--port", port], stdout=subprocess.DEVNULL)
+
+    try:
+        results, stats = asyncio.run(load_test(args.url, args.unique, args.requests, args.concurrency,
+                                               args.fmt, args.size))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    for name, (latencies, statuses, seconds) in results.items():
+        print(format_phase(name, latencies, statuses, seconds))
+    print(f"📊 Server stats: {stats}")
+
+    hit_p99 = percentile(results["hit"][0], 99)
+    if hit_p99 > args.p99_budget:
+        print(f"❌ Cache-hit p99 {hit_p99:.2f} ms is over the {args.p99_budget:g} ms budget")
+        return 1
+    print(f"✅ Cache-hit p99 {hit_p99:.2f} ms (budget {args.p99_budget:g} ms, "
+          f"median {statistics.median(results['hit'][0]):.2f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
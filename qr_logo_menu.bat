@@ -34,7 +34,7 @@ goto MENU
 :GENERATE_QR
 echo.
 echo 🔄 Generating QR code with logo...
-C:/Expo/DotNetMicroDemo/.venv/Scripts/python.exe generate_qr.py
+C:/Expo/DotNetMicroDemo/.venv/Scripts/python.exe qrtool.py portfolio
 echo.
 pause
 goto MENU
@@ -42,7 +42,7 @@ goto MENU
 :CREATE_LOGOS
 echo.
 echo 🎨 Creating logo style options...
-C:/Expo/DotNetMicroDemo/.venv/Scripts/python.exe create_advanced_logos.py
+C:/Expo/DotNetMicroDemo/.venv/Scripts/python.exe qrtool.py logos
 echo.
 pause
 goto MENU
@@ -57,26 +57,20 @@ echo 4. Creative/Artistic logo
 echo.
 set /p logochoice=Choose logo style (1-4): 
 
-if "%logochoice%"=="1" (
-    copy logo_coffee.png logo.png >nul
-    echo ✅ Coffee logo selected
-)
-if "%logochoice%"=="2" (
-    copy logo_tech.png logo.png >nul
-    echo ✅ Tech logo selected
-)
-if "%logochoice%"=="3" (
-    copy logo_business.png logo.png >nul
-    echo ✅ Business logo selected
-)
-if "%logochoice%"=="4" (
-    copy logo_creative.png logo.png >nul
-    echo ✅ Creative logo selected
+set logostyle=
+if "%logochoice%"=="1" set logostyle=coffee
+if "%logochoice%"=="2" set logostyle=tech
+if "%logochoice%"=="3" set logostyle=business
+if "%logochoice%"=="4" set logostyle=creative
+if "%logostyle%"=="" (
+    echo Invalid choice.
+    goto MENU
 )
+C:/Expo/DotNetMicroDemo/.venv/Scripts/python.exe qrtool.py logos %logostyle% --use %logostyle%
 
 echo.
 echo 🔄 Generating QR code with selected logo...
-C:/Expo/DotNetMicroDemo/.venv/Scripts/python.exe generate_qr.py
+C:/Expo/DotNetMicroDemo/.venv/Scripts/python.exe qrtool.py portfolio
 echo.
 pause
 goto MENU
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+QR Module Matrix Cache
+Encodes a payload once and keeps the boolean module grid in an LRU cache,
+so any number of styles, sizes and colors can be rendered from one encode
+"""
+
+from collections import OrderedDict
+
+import qrcode
+from PIL import Image, ImageColor
+
+from qr_payload import build_qr, compact_url
+
+DEFAULT_CACHE_SIZE = 256
+
+# bytes(row) of a bool row gives 0/1; map dark modules to 255 for an L mask
+_DARK_TO_MASK = bytes([0, 255]) + bytes(254)
+
+
+class MatrixCache:
+    """Least-recently-used cache of encoded module grids with hit/miss counters"""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        matrix = self._entries.get(key)
+        if matrix is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return matrix
+
+    def put(self, key, matrix):
+        self._entries[key] = matrix
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def info(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+_cache = MatrixCache()
+
+
+def get_matrix(data, error_correction=qrcode.constants.ERROR_CORRECT_H, version=None, mask_pattern=None,
+               compact=False):
+    """Return the module grid for a payload as a tuple of bool rows (no quiet zone)
+
+    The payload is split into its cheapest numeric/alphanumeric/byte
+    segments (see qr_payload.py); compact=True also uppercases the scheme
+    and host of a URL so they encode in alphanumeric mode.
+    """
+    key = (data, error_correction, version, mask_pattern, compact)
+    matrix = _cache.get(key)
+    if matrix is not None:
+        return matrix
+
+    qr = build_qr(compact_url(data) if compact else data, error_correction, version, mask_pattern)
+
+    matrix = tuple(tuple(bool(module) for module in row) for row in qr.modules)
+    _cache.put(key, matrix)
+    return matrix
+
+
+def cache_info():
+    """Return hit/miss counters and occupancy of the matrix cache"""
+    return _cache.info()
+
+
+def cache_clear():
+    """Drop every cached matrix and reset the counters"""
+    _cache.clear()
+
+
+def set_cache_size(maxsize):
+    """Change the LRU bound, evicting the oldest entries if needed"""
+    _cache.resize(maxsize)
+
+
+def module_mask(matrix, border=4):
+    """Return an L image with one pixel per module: 255 for dark, 0 for light"""
+    count = len(matrix)
+    packed = b"".join(bytes(row) for row in matrix).translate(_DARK_TO_MASK)
+    grid = Image.frombytes('L', (count, count), packed)
+    if not border:
+        return grid
+
+    mask = Image.new('L', (count + 2 * border, count + 2 * border), 0)
+    mask.paste(grid, (border, border))
+    return mask
+
+
+MM_PER_INCH = 25.4
+
+
+def physical_to_pixels(size_mm, dpi=300):
+    """Convert a printed size in millimetres to pixels at the given DPI"""
+    return int(round(size_mm / MM_PER_INCH * dpi))
+
+
+class SizeTooSmallError(ValueError):
+    """Raised when a requested pixel size cannot give every module at least one pixel"""
+
+
+def fit_box_size(module_count, size, border=4):
+    """Return (box_size, margin) for drawing a grid at exactly size pixels
+
+    box_size is the largest whole number of pixels per module that fits,
+    and margin is the extra quiet zone (in pixels) added on each side.
+    Raises SizeTooSmallError when size has fewer pixels than modules.
+    """
+    total = module_count + 2 * border
+    box_size = size // total
+    if box_size < 1:
+        raise SizeTooSmallError(f"{size}px is too small for {total} modules (including the quiet zone)")
+    return box_size, (size - total * box_size) // 2
+
+
+def matrix_mask(matrix, box_size=10, border=4, size=None, strategy="pad"):
+    """Return the L mask of a rendered code at its final size: 255 on dark modules
+
+    Takes the same sizing arguments as render_matrix.
+    """
+    mask = module_mask(matrix, border)
+    margin = 0
+
+    if size is None:
+        side = mask.size[0] * box_size
+    elif strategy == "pad":
+        box_size, margin = fit_box_size(len(matrix), size, border)
+        side = mask.size[0] * box_size
+    elif strategy == "fractional":
+        side = size
+    else:
+        raise ValueError(f"Unknown sizing strategy: {strategy}")
+
+    mask = mask.resize((side, side), Image.Resampling.NEAREST)
+    if size is not None and side != size:
+        canvas = Image.new('L', (size, size), 0)
+        canvas.paste(mask, (margin, margin))
+        mask = canvas
+    return mask
+
+
+def render_matrix(matrix, box_size=10, border=4, fill_color="black", back_color="white",
+                  size=None, strategy="pad"):
+    """Rasterize a module grid into an RGB image, like qrcode's make_image
+
+    With size set, the image is drawn once at exactly size x size pixels:
+    strategy "pad" keeps every module the same whole number of pixels and
+    widens the quiet zone with the remainder; "fractional" spreads the
+    remainder over the modules, so edges fall on the nearest pixel.
+    """
+    mask = matrix_mask(matrix, box_size, border, size, strategy)
+    img = Image.new('RGB', mask.size, ImageColor.getrgb(back_color))
+    img.paste(ImageColor.getrgb(fill_color), (0, 0), mask)
+    return img
+
+
+def module_pitch(matrix, border=4, box_size=10, size=None, strategy="pad"):
+    """Return the size of one module in pixels for the given render settings"""
+    if size is None:
+        return float(box_size)
+    if strategy == "pad":
+        return float(fit_box_size(len(matrix), size, border)[0])
+    return size / (len(matrix) + 2 * border)
+
+
+def module_geometry(matrix, border=4, box_size=10, size=None, strategy="pad"):
+    """Return (origin, pitch): where the first module starts and its size in pixels"""
+    pitch = module_pitch(matrix, border, box_size, size, strategy)
+    margin = 0
+    if size is not None and strategy == "pad":
+        margin = fit_box_size(len(matrix), size, border)[1]
+    return margin + border * pitch, pitch
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Styled QR Module Renderer
+Draws rounded, dot and neighbor-connected modules plus custom finder
+patterns. Each module shape is drawn once as an antialiased stamp, tiled
+across the canvas and masked by the module grid, so a whole code is a
+handful of image operations however many modules it has
+"""
+
+import functools
+
+from PIL import Image, ImageChops, ImageColor, ImageDraw
+
+from qr_matrix import fit_box_size, module_mask
+
+MODULE_STYLES = ("square", "rounded", "dot", "connected")
+FINDER_STYLES = ("square", "rounded", "circle")
+
+# Stamps are drawn this many times larger and box-filtered down for smooth edges
+SUPERSAMPLE = 4
+
+# Default corner radius (fraction of a module) and dot diameter for each style
+STYLE_DEFAULTS = {
+    "square": {"radius": 0.0, "scale": 1.0},
+    "rounded": {"radius": 0.3, "scale": 1.0},
+    "dot": {"radius": 0.5, "scale": 0.85},
+    "connected": {"radius": 0.5, "scale": 1.0},
+}
+
+FINDER_SIZE = 7
+
+# Pixels are drawn as an index: module code (which shape applies) * 64 plus the
+# stamp's coverage at that pixel in 6 bits, resolved with one lookup table
+EMPTY, SOLID, STAMP, FILLET = range(4)
+_CODE_SHIFT = 64
+
+
+@functools.lru_cache(maxsize=32)
+def module_stamp(box_size, radius=0.5, scale=1.0):
+    """One module as an L image: a rounded square (radius 0.5 is a circle)
+
+    radius is a fraction of the module size; scale shrinks the shape inside
+    its box, leaving a gap to the neighbors.
+    """
+    big = box_size * SUPERSAMPLE
+    inset = big * (1 - scale) / 2
+    stamp = Image.new('L', (big, big), 0)
+    shape = [inset, inset, big - inset - 1, big - inset - 1]
+    corner = radius * scale * big
+    if corner > 0:
+        ImageDraw.Draw(stamp).rounded_rectangle(shape, radius=corner, fill=255)
+    else:
+        ImageDraw.Draw(stamp).rectangle(shape, fill=255)
+    return stamp.reduce(SUPERSAMPLE)
+
+
+def tile(stamp, side):
+    """Repeat a stamp across a side x side image with log(n) doubling pastes"""
+    width = stamp.size[0]
+    row = Image.new('L', (side, width))
+    row.paste(stamp, (0, 0))
+    while width < side:
+        row.paste(row.crop((0, 0, width, row.size[1])), (width, 0))
+        width *= 2
+
+    height = row.size[1]
+    tiled = Image.new('L', (side, side))
+    tiled.paste(row, (0, 0))
+    while height < side:
+        tiled.paste(tiled.crop((0, 0, side, height)), (0, height))
+        height *= 2
+    return tiled
+
+
+def _finder_radius(modules, module, box_size):
+    """Corner radius in stamp pixels for a rounded finder shape modules wide
+
+    A corner of radius r modules leaves the corner module's center inside
+    the shape only while r < 1.71; anti-aliasing and the downsample eat into
+    that, so the radius is capped at 0.9 modules, which keeps every finder
+    module at its full value at its center from 3 px per module up. Below
+    that a rounded corner cannot be drawn without touching the center.
+    The radius is a whole number of pixels: Pillow rounds a fractional one
+    differently at each corner.
+    """
+    if box_size < 3:
+        return 0
+    return int(min(modules * 0.22, 0.9) * module)
+
+
+@functools.lru_cache(maxsize=16)
+def finder_stamp(box_size, style="rounded"):
+    """The 7x7-module finder pattern (ring plus 3x3 eye) as an L image"""
+    if style not in FINDER_STYLES:
+        raise ValueError(f"Unknown finder style: {style}")
+
+    module = box_size * SUPERSAMPLE
+    big = FINDER_SIZE * module
+    stamp = Image.new('L', (big, big), 0)
+    draw = ImageDraw.Draw(stamp)
+
+    def shape(offset, modules, fill):
+        box = [offset * module, offset * module, (offset + modules) * module - 1, (offset + modules) * module - 1]
+        if style == "circle":
+            draw.ellipse(box, fill=fill)
+        elif style == "rounded":
+            draw.rounded_rectangle(box, radius=_finder_radius(modules, module, box_size), fill=fill)
+        else:
+            draw.rectangle(box, fill=fill)
+
+    shape(0, 7, 255)   # outer ring
+    shape(1, 5, 0)
+    shape(2, 3, 255)   # eye
+    return stamp.reduce(SUPERSAMPLE)
+
+
+def _finder_origins(count):
+    return [(0, 0), (count - FINDER_SIZE, 0), (0, count - FINDER_SIZE)]
+
+
+def _connected_codes(grid):
+    """Shape code of every module quadrant, from a 1-pixel-per-module 0/255 grid
+
+    Returns codes * 64 at two pixels per module. A dark quadrant is SOLID
+    unless both of its outward neighbors are light, when it takes the
+    stamp's rounded corner (STAMP); a light quadrant whose three outward
+    neighbors are dark takes the stamp's complement (FILLET), the concave fillet.
+    """
+    width, height = grid.size[0] * 2, grid.size[1] * 2
+    dark = grid.resize((width, height), Image.Resampling.NEAREST)
+
+    # Top and left quadrants look up/left, bottom and right ones down/right
+    even_rows = Image.frombytes('L', (width, height), (b"\xff" * width + bytes(width)) * (height // 2))
+    even_cols = Image.frombytes('L', (width, height), b"\xff\x00" * (width // 2) * height)
+    vertical = Image.composite(ImageChops.offset(dark, 0, 1), ImageChops.offset(dark, 0, -1), even_rows)
+    horizontal = Image.composite(ImageChops.offset(dark, 1, 0), ImageChops.offset(dark, -1, 0), even_cols)
+    diagonal = Image.composite(
+        Image.composite(ImageChops.offset(dark, 1, 1), ImageChops.offset(dark, -1, 1), even_cols),
+        Image.composite(ImageChops.offset(dark, 1, -1), ImageChops.offset(dark, -1, -1), even_cols),
+        even_rows)
+
+    exposed = ImageChops.subtract(dark, ImageChops.lighter(vertical, horizontal))
+    # Only fill a corner that all three neighbors surround, so diagonal-only
+    # contacts (checkerboards) stay separate dots instead of star shapes
+    fillet = ImageChops.subtract(
+        ImageChops.multiply(ImageChops.multiply(vertical, horizontal), diagonal), dark)
+    codes = [
+        ImageChops.subtract(dark, exposed).point(lambda v: SOLID * _CODE_SHIFT if v else 0),
+        exposed.point(lambda v: STAMP * _CODE_SHIFT if v else 0),
+        fillet.point(lambda v: FILLET * _CODE_SHIFT if v else 0),
+    ]
+    return ImageChops.add_modulo(ImageChops.add_modulo(codes[0], codes[1]), codes[2])
+
+
+def _coverage(stamp):
+    return stamp.point(lambda v: v >> 2)
+
+
+def module_index(matrix, box_size=20, border=4, module="rounded", finder=None, radius=None, scale=None):
+    """Return the index image of the whole code (quiet zone included)
+
+    module is one of MODULE_STYLES; finder (one of FINDER_STYLES) draws the
+    three finder patterns as single shapes instead of from their modules.
+    radius and scale override the style's corner radius and module size.
+    """
+    if module not in MODULE_STYLES:
+        raise ValueError(f"Unknown module style: {module}")
+    defaults = STYLE_DEFAULTS[module]
+    radius = defaults["radius"] if radius is None else radius
+    scale = defaults["scale"] if scale is None else scale
+
+    count = len(matrix)
+    # One extra light module all round so neighbor lookups never wrap onto dark modules
+    grid = module_mask(matrix, border + 1)
+    if finder is not None:
+        for x, y in _finder_origins(count):
+            x, y = x + border + 1, y + border + 1
+            grid.paste(0, (x, y, x + FINDER_SIZE, y + FINDER_SIZE))
+
+    side = (count + 2 * border) * box_size
+    if module == "square" and scale == 1.0 and radius == 0:
+        codes = grid.point(lambda v: SOLID * _CODE_SHIFT if v else EMPTY)
+        index = codes.crop((1, 1, grid.size[0] - 1, grid.size[1] - 1))
+        index = index.resize((side, side), Image.Resampling.NEAREST)
+    else:
+        if module == "connected":
+            codes = _connected_codes(grid)
+            codes = codes.crop((2, 2, codes.size[0] - 2, codes.size[1] - 2))
+        else:
+            codes = grid.point(lambda v: STAMP * _CODE_SHIFT if v else EMPTY)
+            codes = codes.crop((1, 1, grid.size[0] - 1, grid.size[1] - 1))
+        codes = codes.resize((side, side), Image.Resampling.NEAREST)
+        index = ImageChops.add_modulo(codes, _coverage(tile(module_stamp(box_size, radius, scale), side)))
+
+    if finder is not None:
+        eye = _coverage(finder_stamp(box_size, finder)).point(lambda v: STAMP * _CODE_SHIFT + v)
+        for x, y in _finder_origins(count):
+            index.paste(eye, ((x + border) * box_size, (y + border) * box_size))
+    return index
+
+
+def _shade_table(dark, light):
+    """Lookup table from index values to a channel value between light and dark"""
+    def blend(coverage):
+        return round(light + (dark - light) * coverage / 63)
+
+    table = [light] * _CODE_SHIFT + [dark] * _CODE_SHIFT
+    table += [blend(c) for c in range(_CODE_SHIFT)]
+    table += [blend(63 - c) for c in range(_CODE_SHIFT)]
+    return table
+
+
+def _pad_geometry(matrix, box_size, border, size, strategy):
+    """(box_size, margin) for a target size; stamps need whole-pixel modules"""
+    if size is None:
+        return box_size, 0
+    if strategy != "pad":
+        raise ValueError("Styled modules need whole-pixel modules; use strategy='pad'")
+    return fit_box_size(len(matrix), size, border)
+
+
+def _pad(img, size, margin, background):
+    if size is None or img.size[0] == size:
+        return img
+    canvas = Image.new(img.mode, (size, size), background)
+    canvas.paste(img, (margin, margin))
+    return canvas
+
+
+def styled_mask(matrix, box_size=20, border=4, module="rounded", finder=None, radius=None, scale=None,
+                size=None, strategy="pad"):
+    """Return an L mask of the whole code (quiet zone included): 255 where it is dark"""
+    box_size, margin = _pad_geometry(matrix, box_size, border, size, strategy)
+    index = module_index(matrix, box_size, border, module, finder, radius, scale)
+    return _pad(index.point(_shade_table(255, 0)), size, margin, 0)
+
+
+def render_styled(matrix, box_size=20, border=4, fill_color="black", back_color="white",
+                  size=None, strategy="pad", module="rounded", finder=None, radius=None, scale=None):
+    """Rasterize a module grid with styled modules into an RGB image
+
+    Takes the same sizing arguments as render_matrix; stamps need a whole
+    number of pixels per module, so only the "pad" strategy is supported.
+    """
+    box_size, margin = _pad_geometry(matrix, box_size, border, size, strategy)
+    fill, back = ImageColor.getrgb(fill_color)[:3], ImageColor.getrgb(back_color)[:3]
+    img = module_index(matrix, box_size, border, module, finder, radius, scale)
+    # The index becomes a palette image, so coloring is a single conversion
+    palette = zip(*(_shade_table(f, b) for f, b in zip(fill, back)))
+    img.putpalette([channel for color in palette for channel in color])
+    return _pad(img.convert('RGB'), size, margin, back)
+
+
+def main(argv=None):
+    """Render one code per module style: python qr_modules.py [data]"""
+    import argparse
+    import time
+
+    from qr_matrix import get_matrix
+
+    parser = argparse.ArgumentParser(description="Render a QR code with styled modules")
+    parser.add_argument("data", nargs="?", default="https://lotriet.dev")
+    parser.add_argument("--module", choices=MODULE_STYLES, default="connected")
+    parser.add_argument("--finder", choices=FINDER_STYLES, default=None)
+    parser.add_argument("--box", type=int, default=20, help="pixels per module (default 20)")
+    parser.add_argument("-o", "--output", default="styled_qr.png")
+    args = parser.parse_args(argv)
+
+    matrix = get_matrix(args.data)
+    start = time.perf_counter()
+    img = render_styled(matrix, args.box, module=args.module, finder=args.finder)
+    elapsed = (time.perf_counter() - start) * 1000
+    img.save(args.output)
+    print(f"✅ Saved {args.output} ({len(matrix)}x{len(matrix)} modules, {img.size[0]}px, {elapsed:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
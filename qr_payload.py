@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+QR Payload Optimizer
+Splits a payload into the cheapest mix of numeric, alphanumeric and byte
+segments (qrcode only switches modes for runs of 20+ characters) and can
+uppercase the case-insensitive scheme and host of a URL so they fit the
+denser alphanumeric mode. Fewer bits means a smaller version: fewer
+modules to render and verify, and a faster lock-on for phones
+"""
+
+from bisect import bisect_left
+from urllib.parse import urlsplit
+
+import qrcode
+from qrcode.util import (
+    ALPHA_NUM, BIT_LIMIT_TABLE, MODE_8BIT_BYTE, MODE_ALPHA_NUM, MODE_NUMBER, QRData, mode_sizes_for_version,
+)
+
+MODES = (MODE_NUMBER, MODE_ALPHA_NUM, MODE_8BIT_BYTE)
+MODE_NAMES = {MODE_NUMBER: "numeric", MODE_ALPHA_NUM: "alphanumeric", MODE_8BIT_BYTE: "byte"}
+
+LEVELS = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H,
+}
+
+# Character count field widths change at versions 10 and 27
+VERSION_BANDS = ((1, 9), (10, 26), (27, 40))
+
+_DIGITS = frozenset(b"0123456789")
+_ALPHANUMERIC = frozenset(ALPHA_NUM)
+
+# Per-character cost in sixths of a bit: 10 bits per 3 digits, 11 per 2 alphanumerics, 8 per byte
+_CHAR_COST = {MODE_NUMBER: 20, MODE_ALPHA_NUM: 33, MODE_8BIT_BYTE: 48}
+
+
+def compact_url(data):
+    """Uppercase the scheme and host of an http(s) URL, which are case-insensitive
+
+    "https://lotriet.dev/Jobs" becomes "HTTPS://LOTRIET.DEV/Jobs": the path,
+    query and any user info keep their case. Anything else is returned as is.
+    """
+    try:
+        parts = urlsplit(data)
+    except ValueError:
+        return data
+    if parts.scheme.lower() not in ("http", "https") or not parts.netloc or not data.isascii():
+        return data
+
+    prefix = len(parts.scheme) + 3 + len(parts.netloc)
+    if data[len(parts.scheme):len(parts.scheme) + 3] != "://":
+        return data
+    userinfo, at, host = parts.netloc.rpartition("@")
+    return parts.scheme.upper() + "://" + userinfo + at + host.upper() + data[prefix:]
+
+
+def _data_bits(mode, length):
+    if mode == MODE_NUMBER:
+        return 10 * (length // 3) + (0, 4, 7)[length % 3]
+    if mode == MODE_ALPHA_NUM:
+        return 11 * (length // 2) + 6 * (length % 2)
+    return 8 * length
+
+
+def segment(data, version=1):
+    """Split data (str or bytes) into the cheapest [(mode, bytes)] segments for a version
+
+    Dynamic programming over the three modes: each character either extends
+    the current segment or starts a new one, paying the 4-bit mode header
+    plus the version's character count field.
+    """
+    data = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+    if not data:
+        return [(MODE_8BIT_BYTE, data)]
+
+    header = {mode: (4 + bits) * 6 for mode, bits in mode_sizes_for_version(version).items() if mode in MODES}
+    costs = dict(header)
+    # choices[i][mode]: the mode character i was encoded in, on the cheapest path ending in mode
+    choices = []
+    infinity = float("inf")
+    for byte in data:
+        current = {mode: infinity for mode in MODES}
+        chosen = {}
+        for mode in MODES:
+            if mode == MODE_NUMBER and byte not in _DIGITS:
+                continue
+            if mode == MODE_ALPHA_NUM and byte not in _ALPHANUMERIC:
+                continue
+            current[mode] = costs[mode] + _CHAR_COST[mode]
+            chosen[mode] = mode
+
+        # A new segment can start after this character in any mode
+        for to in MODES:
+            for source in MODES:
+                if current[source] == infinity:
+                    continue
+                switched = -(-current[source] // 6) * 6 + header[to]
+                if switched < current[to]:
+                    current[to] = switched
+                    chosen[to] = chosen[source]
+        choices.append(chosen)
+        costs = current
+
+    mode = min(MODES, key=lambda m: costs[m])
+    modes = []
+    for chosen in reversed(choices):
+        mode = chosen[mode]
+        modes.append(mode)
+    modes.reverse()
+
+    segments = []
+    start = 0
+    for i in range(1, len(data) + 1):
+        if i == len(data) or modes[i] != modes[start]:
+            segments.append((modes[start], data[start:i]))
+            start = i
+    return segments
+
+
+def segment_bits(segments, version):
+    """Total encoded bits of [(mode, bytes)] segments at a version"""
+    sizes = mode_sizes_for_version(version)
+    return sum(4 + sizes[mode] + _data_bits(mode, len(chunk)) for mode, chunk in segments)
+
+
+def fit(data, error_correction=qrcode.constants.ERROR_CORRECT_H, version=None):
+    """Return (version, segments): the smallest version that holds the optimized payload"""
+    if version is not None:
+        return version, segment(data, version)
+
+    limits = BIT_LIMIT_TABLE[error_correction]
+    for low, high in VERSION_BANDS:
+        segments = segment(data, low)
+        smallest = bisect_left(limits, segment_bits(segments, low), low)
+        if smallest <= high:
+            return smallest, segments
+    raise qrcode.exceptions.DataOverflowError()
+
+
+def build_qr(data, error_correction=qrcode.constants.ERROR_CORRECT_H, version=None, mask_pattern=None,
+             border=0):
+    """A made qrcode.QRCode holding data in its optimal segments"""
+    version, segments = fit(data, error_correction, version)
+    qr = qrcode.QRCode(version=version, error_correction=error_correction, border=border,
+                       mask_pattern=mask_pattern)
+    for mode, chunk in segments:
+        qr.add_data(QRData(chunk, mode=mode, check_data=False))
+    qr.make(fit=False)
+    return qr
+
+
+def plain_version(data, error_correction=qrcode.constants.ERROR_CORRECT_H):
+    """The version qrcode picks on its own (add_data's default mode switching)"""
+    qr = qrcode.QRCode(error_correction=error_correction)
+    qr.add_data(data)
+    return qr.best_fit()
+
+
+def version_report(data, compact=True):
+    """Version and module count at every error correction level, before and after"""
+    optimized = compact_url(data) if compact else data
+    rows = []
+    for name, level in LEVELS.items():
+        before = plain_version(data, level)
+        after, segments = fit(optimized, level)
+        rows.append({
+            "level": name,
+            "plain_version": before,
+            "version": after,
+            "modules": 17 + 4 * after,
+            "bits": segment_bits(segments, after),
+            "capacity_bits": BIT_LIMIT_TABLE[level][after],
+            "segments": [(MODE_NAMES[mode], len(chunk)) for mode, chunk in segments],
+        })
+    return rows
+
+
+def main(argv=None):
+    """Show what the optimizer does for a URL, or for every url in a batch file"""
+    import argparse
+    import time
+
+    from generate_qr import PORTFOLIO_URL
+
+    parser = argparse.ArgumentParser(description="Report QR versions with optimal mode segmentation")
+    parser.add_argument("data", nargs="?", default=PORTFOLIO_URL)
+    parser.add_argument("--batch", help="CSV or JSONL of attendee rows: summarize their url column instead")
+    parser.add_argument("--level", choices=LEVELS, default="H", help="error correction for --batch (default H)")
+    parser.add_argument("--keep-case", action="store_true", help="do not uppercase scheme and host")
+    args = parser.parse_args(argv)
+
+    if not args.batch:
+        print(f"🔗 {args.data}")
+        if not args.keep_case and compact_url(args.data) != args.data:
+            print(f"🔠 {compact_url(args.data)}")
+        for row in version_report(args.data, compact=not args.keep_case):
+            segments = " + ".join(f"{count} {mode}" for mode, count in row["segments"])
+            print(f"   {row['level']}: version {row['plain_version']:>2} -> {row['version']:>2} "
+                  f"({row['modules']}x{row['modules']} modules, {row['bits']}/{row['capacity_bits']} bits: {segments})")
+        return 0
+
+    from batch_qr import read_rows
+
+    level = LEVELS[args.level]
+    count = before = after = 0
+    # Summed module areas (side squared), which is what rendering and verify scale with
+    start = time.perf_counter()
+    for row in read_rows(args.batch):
+        url = row.get("url")
+        if not url:
+            continue
+        count += 1
+        before += (17 + 4 * plain_version(url, level)) ** 2
+        after += (17 + 4 * fit(url if args.keep_case else compact_url(url), level)[0]) ** 2
+    if not count:
+        print("❌ No rows with a url")
+        return 1
+
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"✅ {count:,} urls at level {args.level}: {before / count:,.0f} -> {after / count:,.0f} modules "
+          f"per code on average ({1 - after / before:.0%} fewer) in {elapsed:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Tiled Poster Renderer
+Rasterizes print layouts at banner size (a 2 m card at 300 dpi is about
+24000 x 30000 pixels) one horizontal band at a time. The layout is recorded
+once as a list of shapes; each band draws only the shapes that cross it and
+is streamed straight into a PNG or TIFF file, so peak memory is one band
+instead of the whole poster
+"""
+
+import os
+import struct
+import time
+import zlib
+
+from PIL import Image, ImageColor, ImageDraw
+
+from fonts import get_font
+from png_output import DEFAULT_COMPRESS_LEVEL, STRATEGIES
+from qr_matrix import MM_PER_INCH, module_mask, physical_to_pixels
+
+DEFAULT_BAND_HEIGHT = 256
+DEFAULT_STRATEGY = "rle"  # Flat QR and card art compresses well and fast with run-length matches
+
+# Classic TIFF offsets are 32 bit
+TIFF_MAX_BYTES = 2 ** 32 - 1
+
+
+class BandCanvas:
+    """Same drawing API as qr_vector's canvases, rasterized band by band
+
+    Coordinates are in layout units; scale is pixels per unit. Shapes are
+    kept as (top, bottom, draw) records and only drawn into the bands they
+    cross, with images resampled once to their placed size.
+    """
+
+    def __init__(self, width, height, background="white", scale=1.0, mode="RGB"):
+        self.scale = scale
+        self.mode = mode
+        self.size = (round(width * scale), round(height * scale))
+        self.background = ImageColor.getcolor(background, mode)
+        self.shapes = []
+
+    def _px(self, value):
+        return round(value * self.scale)
+
+    def _color(self, fill):
+        return ImageColor.getcolor(fill, self.mode)
+
+    def rect(self, x, y, w, h, fill, radius=0):
+        left, top = self._px(x), self._px(y)
+        right, bottom = self._px(x + w), self._px(y + h)
+        color, radius = self._color(fill), self._px(radius)
+
+        def draw(band, y0):
+            ImageDraw.Draw(band).rounded_rectangle(
+                [left, top - y0, right - 1, bottom - 1 - y0], radius=radius, fill=color)
+
+        self.shapes.append((top, bottom, draw))
+
+    def modules(self, matrix, x, y, module, fill):
+        # Whole-pixel modules keep every edge crisp; the grid is upscaled
+        # only for the module rows that fall in the band
+        pitch = max(1, self._px(module))
+        left, top = self._px(x), self._px(y)
+        count = len(matrix)
+        grid = module_mask(matrix, border=0)
+        color = self._color(fill)
+
+        def draw(band, y0):
+            first = max(0, (y0 - top) // pitch)
+            last = min(count, (y0 + band.size[1] - 1 - top) // pitch + 1)
+            rows = grid.crop((0, first, count, last))
+            rows = rows.resize((count * pitch, (last - first) * pitch), Image.Resampling.NEAREST)
+            band.paste(color, (left, top + first * pitch - y0), rows)
+
+        self.shapes.append((top, top + count * pitch, draw))
+
+    def image(self, img, x, y, w, h):
+        left, top = self._px(x), self._px(y)
+        size = (self._px(x + w) - left, self._px(y + h) - top)
+        placed = img.convert("RGBA")
+        if placed.size != size:
+            placed = placed.resize(size, Image.Resampling.LANCZOS)
+        if self.mode != "RGBA":
+            alpha = placed.getchannel("A")
+            placed = placed.convert(self.mode)
+        else:
+            alpha = placed
+
+        def draw(band, y0):
+            band.paste(placed, (left, top - y0), alpha)
+
+        self.shapes.append((top, top + size[1], draw))
+
+    def text(self, x, y, text, size, fill="black", bold=False, anchor="middle"):
+        font = get_font("sans-bold" if bold else "sans", self._px(size))
+        # y is the top of the ascender, as in the SVG and PDF canvases
+        pil_anchor = {"middle": "ma", "start": "la", "end": "ra"}[anchor]
+        position = (self._px(x), self._px(y))
+        bbox = font.getbbox(text, anchor=pil_anchor)
+        color = self._color(fill)
+
+        def draw(band, y0):
+            ImageDraw.Draw(band).text((position[0], position[1] - y0), text, fill=color, font=font,
+                                      anchor=pil_anchor)
+
+        self.shapes.append((position[1] + bbox[1], position[1] + bbox[3], draw))
+
+    def render_band(self, y0, y1):
+        """Rasterize rows y0..y1 (exclusive) of the poster"""
+        band = Image.new(self.mode, (self.size[0], y1 - y0), self.background)
+        for top, bottom, draw in self.shapes:
+            if top < y1 and bottom > y0:
+                draw(band, y0)
+        return band
+
+    def bands(self, band_height=DEFAULT_BAND_HEIGHT):
+        """Yield every band of the poster from top to bottom"""
+        for y0 in range(0, self.size[1], band_height):
+            yield self.render_band(y0, min(y0 + band_height, self.size[1]))
+
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+class PngStreamWriter:
+    """Writes an 8-bit L or RGB PNG from bands of rows without holding the image"""
+
+    # Emit an IDAT chunk whenever this much compressed data is pending
+    CHUNK_BYTES = 1 << 20
+
+    def __init__(self, f, width, height, mode="RGB", dpi=None, compress_level=DEFAULT_COMPRESS_LEVEL,
+                 strategy=DEFAULT_STRATEGY):
+        if mode not in ("L", "RGB"):
+            raise ValueError(f"Streaming PNG supports L and RGB bands, not {mode}")
+        self.f, self.width, self.height, self.mode = f, width, height, mode
+        self.rows = 0
+        self.compressor = zlib.compressobj(compress_level, zlib.DEFLATED, zlib.MAX_WBITS, 9, STRATEGIES[strategy])
+        self.pending = []
+        self.pending_bytes = 0
+
+        color_type = 2 if mode == "RGB" else 0
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)))
+        if dpi:
+            per_metre = round(dpi / MM_PER_INCH * 1000)
+            f.write(_png_chunk(b"pHYs", struct.pack(">IIB", per_metre, per_metre, 1)))
+
+    def write(self, band):
+        if band.mode != self.mode or band.size[0] != self.width:
+            raise ValueError(f"Band is {band.mode} {band.size[0]}px wide; expected {self.mode} {self.width}px")
+        data = band.tobytes()
+        stride = len(data) // band.size[1]
+        # Filter type 0 (none) in front of every row
+        rows = b"".join(b"\x00" + data[i:i + stride] for i in range(0, len(data), stride))
+        self._queue(self.compressor.compress(rows))
+        self.rows += band.size[1]
+
+    def _queue(self, data, flush=False):
+        if data:
+            self.pending.append(data)
+            self.pending_bytes += len(data)
+        if self.pending_bytes >= self.CHUNK_BYTES or (flush and self.pending):
+            self.f.write(_png_chunk(b"IDAT", b"".join(self.pending)))
+            self.pending, self.pending_bytes = [], 0
+
+    def close(self):
+        if self.rows != self.height:
+            raise ValueError(f"Wrote {self.rows} of {self.height} rows")
+        self._queue(self.compressor.flush(), flush=True)
+        self.f.write(_png_chunk(b"IEND", b""))
+
+
+class TiffStreamWriter:
+    """Writes a strip-per-band, deflate-compressed 8-bit L or RGB TIFF
+
+    Strips are written as they arrive; the directory follows them at the
+    end of the file and the header is patched to point at it, so the file
+    must be seekable. Every band but the last must be the same height.
+    """
+
+    def __init__(self, f, width, height, mode="RGB", dpi=None, compress_level=DEFAULT_COMPRESS_LEVEL,
+                 strategy=DEFAULT_STRATEGY):
+        if mode not in ("L", "RGB"):
+            raise ValueError(f"Streaming TIFF supports L and RGB bands, not {mode}")
+        self.f, self.width, self.height, self.mode = f, width, height, mode
+        self.dpi = dpi
+        self.compress_level, self.strategy = compress_level, STRATEGIES[strategy]
+        self.rows_per_strip = None
+        self.rows = 0
+        self.offsets, self.counts = [], []
+        self.start = f.tell()
+        f.write(b"II*\x00\x00\x00\x00\x00")  # Little endian; directory offset patched on close
+
+    def _tell(self):
+        return self.f.tell() - self.start
+
+    def write(self, band):
+        if band.mode != self.mode or band.size[0] != self.width:
+            raise ValueError(f"Band is {band.mode} {band.size[0]}px wide; expected {self.mode} {self.width}px")
+        if self.rows_per_strip is None:
+            self.rows_per_strip = band.size[1]
+        elif self.rows % self.rows_per_strip or band.size[1] > self.rows_per_strip:
+            raise ValueError("Only the last band may be shorter than the first")
+
+        compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED, zlib.MAX_WBITS, 9, self.strategy)
+        strip = compressor.compress(band.tobytes()) + compressor.flush()
+        self.offsets.append(self._tell())
+        self.counts.append(len(strip))
+        self.f.write(strip)
+        self.rows += band.size[1]
+        if self._tell() > TIFF_MAX_BYTES:
+            raise ValueError("Poster is over 4 GB, the classic TIFF limit; use PNG or larger bands")
+
+    def close(self):
+        if self.rows != self.height:
+            raise ValueError(f"Wrote {self.rows} of {self.height} rows")
+        SHORT, LONG, RATIONAL = 3, 4, 5
+        samples = 3 if self.mode == "RGB" else 1
+        dpi = round(self.dpi or 72)
+
+        # Arrays that do not fit in a directory entry go after the strips
+        extra = bytearray()
+        base = self._tell() + (self._tell() & 1)
+
+        def stored(fmt, values):
+            data = struct.pack("<%d%s" % (len(values), fmt), *values)
+            if len(data) <= 4:
+                return data.ljust(4, b"\x00")
+            offset = base + len(extra)
+            extra.extend(data + b"\x00" * (len(data) & 1))
+            return struct.pack("<I", offset)
+
+        entries = [
+            (256, LONG, [self.width]),
+            (257, LONG, [self.height]),
+            (258, SHORT, [8] * samples),
+            (259, SHORT, [8]),                      # Adobe deflate
+            (262, SHORT, [2 if samples == 3 else 1]),  # RGB or black is zero
+            (273, LONG, self.offsets),
+            (277, SHORT, [samples]),
+            (278, LONG, [self.rows_per_strip]),
+            (279, LONG, self.counts),
+            (282, RATIONAL, [dpi, 1]),
+            (283, RATIONAL, [dpi, 1]),
+            (284, SHORT, [1]),                      # Chunky pixels
+            (296, SHORT, [2]),                      # Resolution in inches
+        ]
+        directory = bytearray(struct.pack("<H", len(entries)))
+        for tag, kind, values in entries:
+            count = len(values) // 2 if kind == RATIONAL else len(values)
+            directory += struct.pack("<HHI", tag, kind, count)
+            directory += stored({SHORT: "H", LONG: "I", RATIONAL: "I"}[kind], values)
+        directory += b"\x00\x00\x00\x00"
+
+        ifd = base + len(extra)
+        if ifd + len(directory) > TIFF_MAX_BYTES:
+            raise ValueError("Poster is over 4 GB, the classic TIFF limit; use PNG")
+        self.f.write(b"\x00" * (base - self._tell()) + bytes(extra) + bytes(directory))
+        end = self.f.tell()
+        self.f.seek(self.start + 4)
+        self.f.write(struct.pack("<I", ifd))
+        self.f.seek(end)
+
+
+WRITERS = {".png": PngStreamWriter, ".tif": TiffStreamWriter, ".tiff": TiffStreamWriter}
+
+
+def write_poster(canvas, path, band_height=DEFAULT_BAND_HEIGHT, dpi=300, compress_level=DEFAULT_COMPRESS_LEVEL,
+                 strategy=DEFAULT_STRATEGY):
+    """Stream a BandCanvas into a .png or .tif file and return a report dict"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in WRITERS:
+        raise ValueError(f"Unsupported poster format: {ext} (use .png, .tif or .tiff)")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown zlib strategy: {strategy} (expected one of {', '.join(STRATEGIES)})")
+
+    start = time.perf_counter()
+    width, height = canvas.size
+    with open(path, "wb") as f:
+        writer = WRITERS[ext](f, width, height, canvas.mode, dpi, compress_level, strategy)
+        bands = 0
+        for band in canvas.bands(band_height):
+            writer.write(band)
+            bands += 1
+        writer.close()
+
+    return {
+        "path": path,
+        "width": width,
+        "height": height,
+        "bands": bands,
+        "band_bytes": width * band_height * len(canvas.mode),
+        "bytes": os.path.getsize(path),
+        "ms": (time.perf_counter() - start) * 1000,
+    }
+
+
+def portfolio_poster(height_mm=2000, dpi=300, logo_path="logo.png"):
+    """The portfolio card (generate_qr.create_portfolio_qr) scaled to height_mm at dpi"""
+    from generate_qr import create_logo
+    from qr_vector import PORTFOLIO_CARD_SIZE, draw_portfolio_card
+
+    width, height = PORTFOLIO_CARD_SIZE
+    scale = physical_to_pixels(height_mm, dpi) / height
+    canvas = BandCanvas(width, height, "white", scale)
+    # The logo is drawn once at its placed size; only the source is loaded, not the poster
+    draw_portfolio_card(canvas, create_logo(size=round(80 * scale), logo_path=logo_path))
+    return canvas
+
+
+def main(argv=None):
+    """Render the portfolio card as a banner: python qr_poster.py --height-mm 2000 -o banner.tif"""
+    import argparse
+    import resource
+
+    parser = argparse.ArgumentParser(description="Render a poster-size QR card in bands with bounded memory")
+    parser.add_argument("--height-mm", type=float, default=2000, help="printed card height (default 2000 mm)")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--band", type=int, default=DEFAULT_BAND_HEIGHT, help="rows per band (default 256)")
+    parser.add_argument("--logo", default="logo.png")
+    parser.add_argument("--level", type=int, default=DEFAULT_COMPRESS_LEVEL, help="zlib level 0-9")
+    parser.add_argument("--strategy", choices=STRATEGIES, default=DEFAULT_STRATEGY)
+    parser.add_argument("-o", "--output", default="portfolio_poster.png", help=".png, .tif or .tiff")
+    args = parser.parse_args(argv)
+
+    canvas = portfolio_poster(args.height_mm, args.dpi, args.logo)
+    report = write_poster(canvas, args.output, args.band, args.dpi, args.level, args.strategy)
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    full_mb = report["width"] * report["height"] * len(canvas.mode) / 1024 / 1024
+    print(f"✅ Saved {report['path']} ({report['width']}x{report['height']} px, {report['bytes']:,} bytes)")
+    print(f"🧱 {report['bands']} bands of {args.band} rows in {report['ms'] / 1000:.1f} s")
+    print(f"💾 Peak RSS {peak_mb:.0f} MB (the full canvas would be {full_mb:,.0f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Per-Stage Profiler for the QR Pipeline
+Opt-in timing and memory instrumentation: each named stage records wall
+time, CPU time, peak Python allocation, RSS growth and the number of
+Pillow images created, as JSON lines or an aggregated summary table
+"""
+
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from PIL import Image
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_state = {
+    # QR_PROFILE=1 turns profiling on (also inside batch worker processes)
+    "enabled": os.environ.get("QR_PROFILE", "") not in ("", "0"),
+    # tracemalloc slows Python-heavy stages down; QR_PROFILE_MEMORY=0 skips it
+    "memory": os.environ.get("QR_PROFILE_MEMORY", "1") not in ("", "0"),
+    "records": [],
+    "stack": [],
+}
+
+_DISABLED = contextlib.nullcontext()
+
+
+def enable(memory=True):
+    """Start recording stages in this process"""
+    _state["enabled"] = True
+    _state["memory"] = memory
+
+
+def disable():
+    """Stop recording; stages become no-ops again"""
+    _state["enabled"] = False
+    if tracemalloc.is_tracing() and not _state["stack"]:
+        tracemalloc.stop()
+
+
+def is_enabled():
+    return _state["enabled"]
+
+
+def _max_rss_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def _images_created():
+    return Image.core.get_stats()["new_count"] if hasattr(Image.core, "get_stats") else 0
+
+
+class _Stage:
+    """Context manager that measures one stage (stages may nest)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.peak = 0
+
+    def __enter__(self):
+        stack = _state["stack"]
+        self.path = "/".join([s.name for s in stack] + [self.name])
+
+        if _state["memory"]:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            # The parent keeps the peak reached so far before we reset it
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak - stack[-1].base)
+            tracemalloc.reset_peak()
+            self.base = current
+
+        stack.append(self)
+        self.images = _images_created()
+        self.rss = _max_rss_kb()
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        stack = _state["stack"]
+        stack.pop()
+
+        record = {
+            "stage": self.path,
+            "wall_ms": round(wall * 1000, 3),
+            "cpu_ms": round(cpu * 1000, 3),
+            "images": _images_created() - self.images,
+            "pid": os.getpid(),
+        }
+        if _state["memory"] and tracemalloc.is_tracing():
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1] - self.base)
+            record["peak_kb"] = round(self.peak / 1024, 1)
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak + self.base - stack[-1].base)
+        if self.rss is not None:
+            record["rss_growth_kb"] = _max_rss_kb() - self.rss
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+
+        _state["records"].append(record)
+        return False
+
+
+def stage(name):
+    """Measure the enclosed block as a named stage when profiling is enabled"""
+    if not _state["enabled"]:
+        return _DISABLED
+    return _Stage(name)
+
+
+def profiled(name=None):
+    """Decorator form of stage(), named after the function by default"""
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state["enabled"]:
+                return func(*args, **kwargs)
+            with _Stage(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def records():
+    """Return the stage records collected so far in this process"""
+    return list(_state["records"])
+
+
+def take_records():
+    """Return and clear the collected records (used to ship them out of workers)"""
+    collected = _state["records"]
+    _state["records"] = []
+    return collected
+
+
+def add_records(more):
+    """Merge records gathered elsewhere (e.g. returned by a worker process)"""
+    _state["records"].extend(more)
+
+
+def reset():
+    _state["records"] = []
+
+
+def write_jsonl(target, items=None):
+    """Write records as JSON lines to a path or text file object"""
+    items = records() if items is None else items
+    lines = "".join(json.dumps(record) + "\n" for record in items)
+    if hasattr(target, "write"):
+        target.write(lines)
+    else:
+        with open(target, "w", encoding="utf-8") as f:
+            f.write(lines)
+
+
+def summarize(items=None):
+    """Aggregate records per stage: count, total/mean/max wall, CPU and peak memory"""
+    items = records() if items is None else items
+    stages = {}
+    for record in items:
+        entry = stages.setdefault(record["stage"], {
+            "stage": record["stage"], "count": 0, "wall_ms": 0.0, "max_wall_ms": 0.0,
+            "cpu_ms": 0.0, "peak_kb": None, "images": 0,
+        })
+        entry["count"] += 1
+        entry["wall_ms"] += record["wall_ms"]
+        entry["max_wall_ms"] = max(entry["max_wall_ms"], record["wall_ms"])
+        entry["cpu_ms"] += record["cpu_ms"]
+        entry["images"] += record["images"]
+        if "peak_kb" in record:
+            entry["peak_kb"] = max(entry["peak_kb"] or 0.0, record["peak_kb"])
+    return list(stages.values())
+
+
+def format_summary(items=None):
+    """Render the per-stage summary as a plain text table"""
+    rows = summarize(items)
+    width = max([len(row["stage"]) for row in rows] + [20])
+    header = f"{'stage':<{width}} {'n':>5} {'total ms':>10} {'mean ms':>9} {'max ms':>9} {'cpu ms':>10} {'peak KB':>9} {'imgs':>6}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        peak = "-" if row["peak_kb"] is None else f"{row['peak_kb']:,.0f}"
+        lines.append(f"{row['stage']:<{width}} {row['count']:>5} {row['wall_ms']:>10.1f} "
+                     f"{row['wall_ms'] / row['count']:>9.2f} {row['max_wall_ms']:>9.2f} "
+                     f"{row['cpu_ms']:>10.1f} {peak:>9} {row['images']:>6}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Profile one run of a generator script: python qr_profile.py generate_qr.py"""
+    import argparse
+    import runpy
+
+    parser = argparse.ArgumentParser(description="Run a QR script with per-stage profiling")
+    parser.add_argument("script", help="script to run, e.g. generate_qr.py or create_premium_qr.py")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments passed to the script")
+    parser.add_argument("--jsonl", help="also write every stage record to this file")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (lower overhead)")
+    args = parser.parse_args(argv)
+
+    # Worker processes started by the script inherit the setting
+    os.environ["QR_PROFILE"] = "1"
+    os.environ["QR_PROFILE_MEMORY"] = "0" if args.no_memory else "1"
+    enable(memory=not args.no_memory)
+
+    sys.argv = [args.script] + args.args
+    try:
+        with stage("total"):
+            runpy.run_path(args.script, run_name="__main__")
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            raise
+    finally:
+        print(format_summary(), file=sys.stderr)
+        if args.jsonl:
+            write_jsonl(args.jsonl)
+    return 0
+
+
+if __name__ == "__main__":
+    # Run through the importable module so the script being profiled and
+    # this runner share one record list
+    import qr_profile
+    sys.exit(qr_profile.main())
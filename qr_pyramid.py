@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Multi-Resolution QR Output Pyramid
+Renders one code at every size the site needs (web thumbnails, the
+wwwroot/assets hero image, business card and banner) in a single call:
+the code is encoded once, its modules are rasterized once at the largest
+whole-pixel pitch and every other size is a nearest neighbor scale of
+that grid, and the logo is drawn once and resampled once per size. A
+JSON manifest lists every file for srcset
+"""
+
+import hashlib
+import io
+import json
+import os
+import time
+
+import qrcode
+from PIL import Image, ImageColor
+
+from create_premium_qr import (PREMIUM_URL, STYLE_COLORS, STYLE_FILLS, create_beautiful_qr, create_premium_logo,
+                               round_corners)
+from logo_ingest import load_square
+from png_output import save_png
+from qr_matrix import fit_box_size, get_matrix, module_mask, module_pitch
+from qr_verify import check_raster
+
+# Output sizes in pixels: 1x/2x web thumbnails, the site hero image, a 2 inch
+# business card code and a 6 inch banner code (both at 300 dpi)
+SIZES = {
+    "thumb": 128,
+    "thumb@2x": 256,
+    "hero": 480,
+    "card": 600,
+    "hero@2x": 960,
+    "banner": 1800,
+}
+
+# create_beautiful_qr's logo is 100 px at its 12 px reference module size
+LOGO_PX_PER_MODULE = 100 / 12
+LOGO_STYLES = {"premium": "gradient", "modern": "modern"}
+
+
+def logo_sizes(matrix, sizes, border=4):
+    """Logo width in pixels for each output size, as create_beautiful_qr would draw it"""
+    return {size: round(LOGO_PX_PER_MODULE * module_pitch(matrix, border=border, size=size)) for size in sizes}
+
+
+def flat_colors(style, modules="square", finder=None, fill=None):
+    """(module color, background color) when a style draws plain one-color squares, else None"""
+    if fill is None:
+        fill = STYLE_FILLS.get(style, "flat")
+    if fill != "flat" or modules != "square" or finder is not None:
+        return None
+    return STYLE_COLORS.get(style, STYLE_COLORS["classic"])
+
+
+def scaled_grids(matrix, boxes, colors, border=4):
+    """{box_size: two-color P image of the code} for each module size in boxes
+
+    The grid is rasterized once at the largest box size; every smaller one
+    is a NEAREST resize of it, which lands each pixel in the right module
+    because both sizes are whole pixels per module.
+    """
+    largest = max(boxes)
+    grid = module_mask(matrix, border).resize(
+        ((len(matrix) + 2 * border) * largest,) * 2, Image.Resampling.NEAREST)
+    # Dark modules are 255 in the mask; index 1 of the palette is the module color
+    grid = Image.frombytes("P", grid.size, grid.point([0] + [1] * 255).tobytes())
+    fill_color, back_color = colors
+    grid.putpalette(ImageColor.getrgb(back_color) + ImageColor.getrgb(fill_color))
+
+    grids = {}
+    for box in boxes:
+        side = (len(matrix) + 2 * border) * box
+        grids[box] = grid if box == largest else grid.resize((side, side), Image.Resampling.NEAREST)
+    return grids
+
+
+def render_pyramid(data=PREMIUM_URL, sizes=SIZES, style="premium", logo=None, verify=False, compact=False,
+                   **options):
+    """Return {name: image} with one code per entry of sizes ({name: pixels})
+
+    logo (an image) replaces the style's own logo. The largest logo is drawn
+    (or taken) once and every other size is a single LANCZOS resample of it.
+    Plain square modules are rasterized once (see scaled_grids); styled
+    modules, finders and fills (options, as for create_beautiful_qr) are
+    drawn per size, since their anti-aliased edges and gradients do not
+    survive a nearest neighbor scale. The images match create_beautiful_qr's.
+    """
+    matrix = get_matrix(data, error_correction=qrcode.constants.ERROR_CORRECT_H, compact=compact)
+    targets = logo_sizes(matrix, sizes.values())
+    largest = max(targets.values())
+    if logo is None:
+        master = create_premium_logo(size=largest, style=LOGO_STYLES.get(style, "glass"))
+    else:
+        master = logo.convert("RGBA")
+
+    resampled = {}
+    for px in set(targets.values()):
+        resampled[px] = master if master.size == (px, px) else master.resize((px, px), Image.Resampling.LANCZOS)
+
+    colors = flat_colors(style, **options)
+    if colors is None:
+        return {
+            name: create_beautiful_qr(data, style, logo=resampled[targets[size]], size=size, verify=verify,
+                                      compact=compact, **options)
+            for name, size in sizes.items()
+        }
+
+    fits = {size: fit_box_size(len(matrix), size) for size in set(sizes.values())}
+    grids = scaled_grids(matrix, {box for box, _ in fits.values()}, colors)
+    images = {}
+    for name, size in sizes.items():
+        box, margin = fits[size]
+        canvas = Image.new("P", (size, size), 0)
+        canvas.putpalette(grids[box].getpalette())
+        canvas.paste(grids[box], (margin, margin))
+        img = canvas.convert("RGBA")
+        if style == "premium":
+            round_corners(img, box / 12)
+
+        mark = resampled[targets[size]]
+        img.paste(mark, ((size - mark.size[0]) // 2, (size - mark.size[1]) // 2), mark)
+        if verify:
+            check_raster(img, matrix, qrcode.constants.ERROR_CORRECT_H, origin=margin + 4 * box, pitch=box)
+        images[name] = img
+    return images
+
+
+def write_pyramid(images, out_dir="qr_pyramid", basename="qr", manifest_name=None):
+    """Save every image as <basename>-<px>.png plus a manifest; return the manifest dict
+
+    Two images of the same width would share a file name, so that raises ValueError.
+    """
+    widths = sorted(img.size[0] for img in images.values())
+    duplicates = sorted({px for px in widths if widths.count(px) > 1})
+    if duplicates:
+        raise ValueError(f"More than one size is {', '.join(map(str, duplicates))} px; file names would collide")
+    os.makedirs(out_dir, exist_ok=True)
+    entries = []
+    for name, img in sorted(images.items(), key=lambda item: item[1].size[0]):
+        buffer = io.BytesIO()
+        report = save_png(img, buffer)
+        body = buffer.getvalue()
+        filename = f"{basename}-{img.size[0]}.png"
+        with open(os.path.join(out_dir, filename), "wb") as f:
+            f.write(body)
+        entries.append({
+            "name": name,
+            "path": filename,
+            "width": img.size[0],
+            "height": img.size[1],
+            "bytes": len(body),
+            "mode": report["mode"],
+            "sha256": hashlib.sha256(body).hexdigest(),
+        })
+
+    manifest = {
+        "images": entries,
+        # Ready to paste into <img srcset="...">
+        "srcset": ", ".join(f"{entry['path']} {entry['width']}w" for entry in entries),
+    }
+    path = os.path.join(out_dir, manifest_name or f"{basename}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render one QR code at every web and print size")
+    parser.add_argument("data", nargs="?", default=PREMIUM_URL)
+    parser.add_argument("--style", default="premium", choices=("premium", "modern", "colorful", "classic"))
+    parser.add_argument("--sizes", help="comma separated name=pixels pairs (default: "
+                        + ",".join(f"{name}={px}" for name, px in SIZES.items()) + ")")
+    parser.add_argument("--logo", help="use this image as the logo instead of the style's own")
+    parser.add_argument("--verify", action="store_true", help="check every size still decodes")
+    parser.add_argument("-o", "--out", default="qr_pyramid", help="output directory (default: qr_pyramid)")
+    parser.add_argument("--name", default="qr", help="file name prefix (default: qr)")
+    args = parser.parse_args(argv)
+
+    sizes = SIZES
+    if args.sizes:
+        sizes = {}
+        for item in args.sizes.split(","):
+            name, _, px = item.rpartition("=")
+            if int(px) in sizes.values():
+                parser.error(f"--sizes lists {px} px twice; each size is saved as {args.name}-<px>.png")
+            sizes[name or px] = int(px)
+
+    start = time.perf_counter()
+    logo = None
+    if args.logo:
+        # Only the largest logo's worth of pixels is decoded, center-cropped to a square
+        largest = max(logo_sizes(get_matrix(args.data), sizes.values()).values())
+        logo = load_square(args.logo, largest)
+    images = render_pyramid(args.data, sizes, args.style, logo=logo, verify=args.verify)
+    manifest = write_pyramid(images, args.out, args.name)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for entry in manifest["images"]:
+        print(f"✅ {entry['name']:<10} {entry['path']:<16} {entry['bytes']:>9,} bytes  {entry['sha256'][:12]}")
+    print(f"📁 Manifest saved as: {os.path.join(args.out, args.name + '.json')}")
+    print(f"⏱️ {len(images)} sizes in {elapsed:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Local QR Rendering Service
+A small asyncio HTTP server around create_beautiful_qr:
+
+    GET /qr?data=https://lotriet.dev&style=premium&size=400&fmt=png|svg
+
+Renders run in a process pool off the event loop, identical in-flight
+requests share one render, and finished responses live in a bounded LRU
+with strong ETags so repeat requests are answered from memory (or 304)
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import signal
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+STYLES = ("premium", "modern", "colorful", "classic")
+FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+MIN_SIZE, MAX_SIZE = 64, 4096
+# Byte-mode capacity of a version 40 code at error correction H, the level every style uses
+MAX_DATA_BYTES = 1273
+MAX_HEADER_BYTES = 16 * 1024
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_ENTRIES = 1024
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+# The URL fully determines the image, so clients may keep it for a day
+CACHE_CONTROL = "public, max-age=86400"
+
+
+class BadRequest(ValueError):
+    """Invalid query parameters (answered with 400)"""
+
+
+def parse_params(query):
+    """Validate the /qr query string and return a normalized (data, style, size, fmt) key"""
+    params = {k: v[-1] for k, v in parse_qs(query, keep_blank_values=True).items()}
+
+    data = params.get("data", "")
+    if not data:
+        raise BadRequest("data is required")
+    if len(data.encode("utf-8")) > MAX_DATA_BYTES:
+        raise BadRequest(f"data is longer than {MAX_DATA_BYTES} bytes, the most a QR code holds at level H")
+
+    style = params.get("style", "premium")
+    if style not in STYLES:
+        raise BadRequest(f"style must be one of {', '.join(STYLES)}")
+
+    fmt = params.get("fmt", "png")
+    if fmt not in FORMATS:
+        raise BadRequest(f"fmt must be one of {', '.join(FORMATS)}")
+
+    size = params.get("size")
+    if size:
+        try:
+            size = int(size)
+        except ValueError:
+            raise BadRequest("size must be an integer") from None
+        if not MIN_SIZE <= size <= MAX_SIZE:
+            raise BadRequest(f"size must be between {MIN_SIZE} and {MAX_SIZE}")
+    else:
+        size = None
+
+    return data, style, size, fmt
+
+
+def response_head(status, headers, content_length, keep_alive):
+    """Serialize a status line and headers (including the blank line) to bytes"""
+    head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    head += [f"{name}: {value}" for name, value in headers.items()]
+    if content_length is not None:
+        head.append(f"Content-Length: {content_length}")
+    head.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1")
+
+
+def parse_headers(block):
+    """Parse the header lines we act on (the rest are skipped without splitting)"""
+    lower = block.lower()
+    headers = {}
+    for name in ("if-none-match", "connection"):
+        start = lower.find(name + ":")
+        if start >= 0 and (start == 0 or lower[start - 1] == "\n"):
+            end = block.find("\r\n", start)
+            headers[name] = block[start + len(name) + 1:end if end >= 0 else None].strip()
+    return headers
+
+
+def render_payload(data, style, size, fmt):
+    """Render one response body (runs inside a worker process)
+
+    Payloads that do not fit and sizes too small for the code's modules
+    raise BadRequest, so the client gets a 400 with the reason.
+    """
+    from qrcode.exceptions import DataOverflowError
+
+    from qr_matrix import SizeTooSmallError
+
+    try:
+        return _render(data, style, size, fmt)
+    except (DataOverflowError, SizeTooSmallError) as e:
+        raise BadRequest(str(e) or "data does not fit in a QR code") from None
+
+
+def _render(data, style, size, fmt):
+    if fmt == "svg":
+        from qr_matrix import get_matrix
+        from qr_vector import qr_canvas
+
+        # Same geometry as the PNG: module size follows the requested pixel size
+        count = len(get_matrix(data)) + 8
+        module = size / count if size else 12
+        return qr_canvas("svg", data, style, module=module).to_bytes()
+
+    from create_premium_qr import create_beautiful_qr
+    from png_output import save_png
+
+    buffer = io.BytesIO()
+    save_png(create_beautiful_qr(data, style, size=size), buffer)
+    return buffer.getvalue()
+
+
+def _worker_init():
+    # Ctrl-C and SIGTERM are handled by the server, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+class CachedResponse:
+    """A rendered body with its strong ETag and prebuilt response heads"""
+
+    __slots__ = ("body", "etag", "headers", "heads")
+
+    def __init__(self, body, content_type):
+        self.body = body
+        self.etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+        self.headers = {"Content-Type": content_type, "ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        # Keep-alive cache hits are answered by writing these bytes as they are
+        self.heads = {200: response_head(200, self.headers, len(body), keep_alive=True),
+                      304: response_head(304, self.headers, None, keep_alive=True)}
+
+    def head(self, status, keep_alive=True):
+        if keep_alive:
+            return self.heads[status]
+        return response_head(status, self.headers, len(self.body) if status == 200 else None, keep_alive=False)
+
+    def matches(self, if_none_match):
+        """True when an If-None-Match header names this response"""
+        if not if_none_match:
+            return False
+        return if_none_match.strip() == "*" or self.etag in [tag.strip() for tag in if_none_match.split(",")]
+
+
+class ResponseCache:
+    """LRU of rendered bodies bounded by entry count and total bytes"""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, body):
+        """Store a rendered body and return its CachedResponse"""
+        entry = CachedResponse(body, FORMATS[key[3]])
+        if len(body) > self.max_bytes:
+            return entry
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old.body)
+        self._entries[key] = entry
+        self.bytes += len(body)
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= len(evicted.body)
+            self.evictions += 1
+        return entry
+
+    def info(self):
+        return {"entries": len(self._entries), "bytes": self.bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+class QRService:
+    """Request handling: cache lookup, in-flight dedupe and pooled rendering"""
+
+    def __init__(self, workers=None, cache_entries=DEFAULT_CACHE_ENTRIES, cache_bytes=DEFAULT_CACHE_BYTES):
+        self.pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_worker_init)
+        self.cache = ResponseCache(cache_entries, cache_bytes)
+        self.inflight = {}
+        # Keys whose render was rejected -> the reason, so repeats are not rendered again
+        self.rejected = OrderedDict()
+        # Request target -> parsed key, so repeat URLs skip query parsing
+        self.keys = {}
+        self.renders = 0
+        self.deduplicated = 0
+        self.started = time.time()
+
+    async def get_entry(self, key):
+        """Return the CachedResponse for a key, rendering it at most once at a time"""
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry
+        if key in self.rejected:
+            raise self.rejected[key]
+
+        future = self.inflight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.inflight[key] = future
+        try:
+            self.renders += 1
+            body = await loop.run_in_executor(self.pool, render_payload, *key)
+            entry = self.cache.put(key, body)
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if isinstance(e, BadRequest):
+                self.rejected[key] = e
+                if len(self.rejected) > self.cache.max_entries:
+                    self.rejected.popitem(last=False)
+            future.set_exception(e)
+            # Waiters see the error and the creator re-raises it; mark it retrieved
+            future.exception()
+            raise
+        finally:
+            del self.inflight[key]
+
+    def stats(self):
+        return {
+            "cache": self.cache.info(),
+            "renders": self.renders,
+            "deduplicated": self.deduplicated,
+            "inflight": len(self.inflight),
+            "rejected": len(self.rejected),
+            "uptime_s": round(time.time() - self.started, 1),
+        }
+
+    def parse_target(self, target):
+        """Return (path, key) for a request target; key is None for non-/qr paths"""
+        key = self.keys.get(target)
+        if key is not None:
+            return "/qr", key
+
+        url = urlsplit(target)
+        if url.path != "/qr":
+            return url.path, None
+        key = parse_params(url.query)
+        if len(self.keys) >= 4 * self.cache.max_entries:
+            self.keys.clear()
+        self.keys[target] = key
+        return url.path, key
+
+    async def respond(self, method, target, headers):
+        """Return (status, headers, body) or a CachedResponse for one request"""
+        if method not in ("GET", "HEAD"):
+            return 405, {"Allow": "GET, HEAD"}, b""
+
+        try:
+            path, key = self.parse_target(target)
+        except BadRequest as e:
+            return 400, {"Content-Type": "text/plain"}, f"{e}\n".encode()
+
+        if key is not None:
+            try:
+                return await self.get_entry(key)
+            except BadRequest as e:
+                return 400, {"Content-Type": "text/plain"}, f"{e}\n".encode()
+        if path == "/healthz":
+            return 200, {"Content-Type": "text/plain"}, b"ok\n"
+        if path == "/stats":
+            return 200, {"Content-Type": "application/json"}, json.dumps(self.stats()).encode()
+        return 404, {"Content-Type": "text/plain"}, b"not found\n"
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection (keep-alive aware)"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+                except asyncio.LimitOverrunError:
+                    writer.write(response_head(431, {}, 0, keep_alive=False))
+                    break
+
+                request_line, _, header_block = head.decode("latin-1").partition("\r\n")
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                except ValueError:
+                    writer.write(response_head(400, {}, 0, keep_alive=False))
+                    break
+                headers = parse_headers(header_block)
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                try:
+                    result = await self.respond(method, target, headers)
+                except Exception as e:
+                    print(f"⚠️ {target}: {e}", file=sys.stderr)
+                    result = 500, {"Content-Type": "text/plain"}, b"render failed\n"
+
+                if isinstance(result, CachedResponse):
+                    status = 304 if result.matches(headers.get("if-none-match")) else 200
+                    body = result.body if status == 200 else b""
+                    response = result.head(status, keep_alive)
+                else:
+                    status, response_headers, body = result
+                    response = response_head(status, response_headers, len(body), keep_alive)
+
+                writer.write(response if method == "HEAD" else response + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            # Client went away, or the server is shutting down
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, cache_entries=DEFAULT_CACHE_ENTRIES,
+                cache_bytes=DEFAULT_CACHE_BYTES, ready=None):
+    """Run the service until cancelled"""
+    service = QRService(workers, cache_entries, cache_bytes)
+    try:
+        # Stop cleanly on SIGTERM too, so the render pool's workers are shut down
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:  # Windows event loops
+        pass
+    server = await asyncio.start_server(service.handle, host, port, limit=MAX_HEADER_BYTES)
+    bound = server.sockets[0].getsockname()
+    print(f"🌐 Serving QR codes on http://{bound[0]}:{bound[1]}/qr?data=...")
+    sys.stdout.flush()
+    if ready is not None:
+        ready.set_result(bound)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve styled QR codes over HTTP")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-w", "--workers", type=int, default=None, help="render processes (default: CPU count)")
+    parser.add_argument("--cache-entries", type=int, default=DEFAULT_CACHE_ENTRIES)
+    parser.add_argument("--cache-mb", type=int, default=DEFAULT_CACHE_BYTES // (1024 * 1024))
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.cache_entries, args.cache_mb * 1024 * 1024))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Batched QR Stack Compositor
+Renders many same-version codes as one sheet: every module grid goes into
+a single module-space palette image, one upscale and one palette
+conversion color the whole stack, and only gradients, premium corners and
+logos touch individual codes. That replaces a render, mode conversion and
+full-size paste chain per code; the crops match create_beautiful_qr's
+square-module output pixel for pixel
+"""
+
+import functools
+
+from PIL import Image, ImageColor, ImageDraw
+
+from create_premium_qr import STYLE_COLORS, STYLE_FILLS, STYLE_GRADIENTS, create_premium_logo
+from qr_fill import DEFAULT_MIN_CONTRAST, gradient_fill
+from qr_matrix import module_mask
+
+DEFAULT_STACK_SIZE = 128
+
+# create_beautiful_qr's reference geometry: 12 px modules, 100 px logo, 20 px premium corners
+BOX_SIZE = 12
+LOGO_STYLES = {"premium": "gradient", "modern": "modern"}
+
+
+@functools.lru_cache(maxsize=8)
+def _rounded_alpha(side, radius):
+    alpha = Image.new('L', (side, side), 0)
+    ImageDraw.Draw(alpha).rounded_rectangle([0, 0, side, side], radius=radius, fill=255)
+    return alpha
+
+
+def _corner_boxes(side, radius):
+    # The rounded mask only differs from opaque inside these four squares
+    r = radius + 1
+    return [(0, 0, r, r), (side - r, 0, side, r), (0, side - r, r, side), (side - r, side - r, side, side)]
+
+
+def _style_logo(style, box_size):
+    return create_premium_logo(size=round(100 * box_size / BOX_SIZE), style=LOGO_STYLES.get(style, "glass"))
+
+
+def composite_stack(matrices, styles, logos=None, box_size=BOX_SIZE, border=4, columns=1, gap=0,
+                    sheet_color=(0, 0, 0, 0)):
+    """Render same-size module grids onto one RGBA sheet; return (sheet, boxes)
+
+    styles gives each code's style (see STYLE_COLORS); logos, when given,
+    holds each code's logo image or None for the style's own. Codes are
+    placed on a grid of columns with gap modules around each one, so a
+    printable sheet of cards comes out of the same single pass; boxes are
+    the pixel boxes of the codes for cropping them out.
+    """
+    if not matrices:
+        raise ValueError("Empty stack")
+    count = len(matrices[0])
+    if any(len(matrix) != count for matrix in matrices):
+        raise ValueError("Every code in a stack must be the same version")
+
+    modules = count + 2 * border
+    cell = modules + 2 * gap
+    rows = -(-len(matrices) // columns)
+    side = modules * box_size
+
+    # Palette: entry 0 is the sheet, then a (light, dark) pair per style in the stack
+    if isinstance(sheet_color, str):
+        sheet_color = ImageColor.getcolor(sheet_color, "RGBA")
+    palette = [tuple(sheet_color) + (255,) * (4 - len(sheet_color))]
+    entries = {}
+    for style in styles:
+        if style not in entries:
+            fill_color, back_color = STYLE_COLORS.get(style, STYLE_COLORS["classic"])
+            entries[style] = len(palette)
+            palette += [ImageColor.getcolor(back_color, "RGBA"), ImageColor.getcolor(fill_color, "RGBA")]
+    if len(palette) > 256:
+        raise ValueError("Too many styles in one stack")
+
+    # Every grid goes into one module-space index image, upscaled to the whole sheet at once
+    index = Image.new('P', (columns * cell, rows * cell), 0)
+    origins = []
+    for i, (matrix, style) in enumerate(zip(matrices, styles)):
+        x, y = (i % columns) * cell + gap, (i // columns) * cell + gap
+        light = entries[style]
+        index.paste(module_mask(matrix, border).point([light] + [light + 1] * 255), (x, y))
+        origins.append((x * box_size, y * box_size))
+    index.putpalette([channel for color in palette for channel in color], "RGBA")
+    index = index.resize((index.size[0] * box_size, index.size[1] * box_size), Image.Resampling.NEAREST)
+    # One conversion colors every flat code on the sheet
+    sheet = index.convert("RGBA")
+
+    radius = round(20 * box_size / BOX_SIZE)
+    logos = logos or [None] * len(matrices)
+    boxes = []
+    for (x, y), matrix, style, logo in zip(origins, matrices, styles, logos):
+        box = (x, y, x + side, y + side)
+        if style in STYLE_FILLS:
+            # Gradient through this code's own dark modules
+            fill_color, back_color = STYLE_COLORS.get(style, STYLE_COLORS["classic"])
+            stops = STYLE_GRADIENTS.get(style, STYLE_GRADIENTS["classic"])
+            mask = module_mask(matrix, border).resize((side, side), Image.Resampling.NEAREST)
+            sheet.paste(gradient_fill(STYLE_FILLS[style], side, stops, back_color, DEFAULT_MIN_CONTRAST), box, mask)
+        if style == "premium":
+            rounded = _rounded_alpha(side, radius)
+            for corner in _corner_boxes(side, radius):
+                placed = (x + corner[0], y + corner[1], x + corner[2], y + corner[3])
+                patch = sheet.crop(placed)
+                patch.putalpha(rounded.crop(corner))
+                sheet.paste(patch, placed)
+
+        if logo is None:
+            logo = _style_logo(style, box_size)
+        offset = (side - logo.size[0]) // 2
+        sheet.paste(logo, (x + offset, y + offset), logo)
+        boxes.append(box)
+    return sheet, boxes
+
+
+def render_stack(matrices, styles, logos=None, box_size=BOX_SIZE, border=4):
+    """Render a stack and return one RGBA image per code"""
+    sheet, boxes = composite_stack(matrices, styles, logos, box_size, border)
+    return [sheet.crop(box) for box in boxes]
+
+
+def main(argv=None):
+    """Time the stack against one create_beautiful_qr call per code"""
+    import argparse
+    import time
+
+    from create_premium_qr import create_beautiful_qr
+    from qr_matrix import get_matrix, set_cache_size
+
+    parser = argparse.ArgumentParser(description="Composite a stack of QR codes in one pass")
+    parser.add_argument("-n", "--count", type=int, default=DEFAULT_STACK_SIZE, help="codes in the stack")
+    parser.add_argument("--columns", type=int, default=8, help="columns on the contact sheet")
+    parser.add_argument("-o", "--output", default="qr_stack.png", help="write the stack as a sheet")
+    args = parser.parse_args(argv)
+
+    styles = list(STYLE_COLORS)
+    set_cache_size(max(args.count, 256))  # Both timings start from encoded grids
+    urls = [f"https://lotriet.dev/attendee/{i:05d}" for i in range(args.count)]
+    rows = [(get_matrix(url, compact=True), styles[i % len(styles)], url) for i, url in enumerate(urls)]
+    matrices, row_styles = [m for m, _, _ in rows], [s for _, s, _ in rows]
+    for style in styles:
+        _style_logo(style, BOX_SIZE)  # Warm the logo cache for both timings
+
+    start = time.perf_counter()
+    images = render_stack(matrices, row_styles)
+    stacked = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    singles = [create_beautiful_qr(url, style, compact=True) for _, style, url in rows]
+    single = (time.perf_counter() - start) * 1000
+
+    same = all(a.tobytes() == b.tobytes() for a, b in zip(images, singles))
+    sheet, _ = composite_stack(matrices, row_styles, columns=args.columns, gap=2, sheet_color="white")
+    # Premium codes have transparent rounded corners; flatten them onto the sheet
+    Image.alpha_composite(Image.new("RGBA", sheet.size, "white"), sheet).convert("RGB").save(args.output)
+    print(f"✅ {args.count} codes: stacked {stacked:.0f} ms, one at a time {single:.0f} ms "
+          f"({single / stacked:.1f}x), identical output: {'yes' if same else 'NO'}")
+    print(f"📁 Sheet saved as: {args.output}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(main())
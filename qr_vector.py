@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Vector (SVG and PDF) Output for Print Assets
+Writes the QR module grid as merged path runs, embeds logos as images
+and lays out the same card text as the PNG generators, giving print
+shops resolution-independent files instead of upscaled rasters
+"""
+
+import base64
+import io
+import os
+import zlib
+from xml.sax.saxutils import escape
+
+import qrcode
+from PIL import ImageColor
+
+from qr_matrix import fit_box_size, get_matrix
+
+# Helvetica advance widths (1/1000 em) for ASCII 32-126, used to center PDF text
+HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+
+# Distance from the top of a text line to its baseline, as a fraction of font size
+ASCENT = 0.8
+
+
+def module_runs(matrix):
+    """Yield (row, column, length) for every horizontal run of dark modules"""
+    for r, row in enumerate(matrix):
+        c = 0
+        count = len(row)
+        while c < count:
+            if row[c]:
+                start = c
+                while c < count and row[c]:
+                    c += 1
+                yield r, start, c - start
+            else:
+                c += 1
+
+
+def _num(value):
+    return f"{value:.3f}".rstrip("0").rstrip(".")
+
+
+class SvgCanvas:
+    """Collects shapes, images and text and serializes them as SVG"""
+
+    def __init__(self, width, height, background=None):
+        self.width, self.height = width, height
+        self.parts = []
+        if background:
+            self.rect(0, 0, width, height, background)
+
+    def rect(self, x, y, w, h, fill, radius=0):
+        rounded = f' rx="{_num(radius)}"' if radius else ""
+        self.parts.append(
+            f'<rect x="{_num(x)}" y="{_num(y)}" width="{_num(w)}" height="{_num(h)}"{rounded} fill="{fill}"/>'
+        )
+
+    def modules(self, matrix, x, y, module, fill):
+        # One path for the whole grid; each run is a single closed subpath
+        d = "".join(
+            f"M{_num(x + c * module)} {_num(y + r * module)}h{_num(n * module)}v{_num(module)}h{_num(-n * module)}z"
+            for r, c, n in module_runs(matrix)
+        )
+        self.parts.append(f'<path d="{d}" fill="{fill}" shape-rendering="crispEdges"/>')
+
+    def image(self, img, x, y, w, h):
+        buffer = io.BytesIO()
+        # Pixels only, like png_output.save_png, so the card is byte-for-byte reproducible
+        img.save(buffer, "PNG", optimize=True, icc_profile=None)
+        data = base64.b64encode(buffer.getvalue()).decode("ascii")
+        self.parts.append(
+            f'<image x="{_num(x)}" y="{_num(y)}" width="{_num(w)}" height="{_num(h)}" '
+            f'href="data:image/png;base64,{data}"/>'
+        )
+
+    def text(self, x, y, text, size, fill="black", bold=False, anchor="middle"):
+        weight = ' font-weight="bold"' if bold else ""
+        self.parts.append(
+            f'<text x="{_num(x)}" y="{_num(y + size * ASCENT)}" font-family="Arial, Helvetica, sans-serif" '
+            f'font-size="{_num(size)}"{weight} text-anchor="{anchor}" fill="{fill}">{escape(text)}</text>'
+        )
+
+    def to_bytes(self):
+        header = (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{_num(self.width)}" height="{_num(self.height)}" '
+            f'viewBox="0 0 {_num(self.width)} {_num(self.height)}">'
+        )
+        return (header + "".join(self.parts) + "</svg>\n").encode("utf-8")
+
+
+class PdfCanvas:
+    """Same drawing API as SvgCanvas, written out as a single-page PDF
+
+    Coordinates are top-left based like the PNG layouts; page_width_mm
+    scales the whole page to a physical size (default: 1 unit = 1 pt).
+    """
+
+    def __init__(self, width, height, background=None, page_width_mm=None):
+        self.width, self.height = width, height
+        self.scale = page_width_mm / 25.4 * 72 / width if page_width_mm else 1.0
+        self.ops = []
+        self.images = []
+        if background:
+            self.rect(0, 0, width, height, background)
+
+    def _color(self, fill):
+        r, g, b = ImageColor.getrgb(fill)[:3]
+        return f"{_num(r / 255)} {_num(g / 255)} {_num(b / 255)} rg"
+
+    def rect(self, x, y, w, h, fill, radius=0):
+        self.ops.append(self._color(fill))
+        if not radius:
+            self.ops.append(f"{_num(x)} {_num(y)} {_num(w)} {_num(h)} re f")
+            return
+
+        # Rounded rectangle from four cubic corner arcs
+        k = radius * 0.5523
+        x2, y2 = x + w, y + h
+        self.ops.append(" ".join([
+            f"{_num(x + radius)} {_num(y)} m",
+            f"{_num(x2 - radius)} {_num(y)} l",
+            f"{_num(x2 - radius + k)} {_num(y)} {_num(x2)} {_num(y + radius - k)} {_num(x2)} {_num(y + radius)} c",
+            f"{_num(x2)} {_num(y2 - radius)} l",
+            f"{_num(x2)} {_num(y2 - radius + k)} {_num(x2 - radius + k)} {_num(y2)} {_num(x2 - radius)} {_num(y2)} c",
+            f"{_num(x + radius)} {_num(y2)} l",
+            f"{_num(x + radius - k)} {_num(y2)} {_num(x)} {_num(y2 - radius + k)} {_num(x)} {_num(y2 - radius)} c",
+            f"{_num(x)} {_num(y + radius)} l",
+            f"{_num(x)} {_num(y + radius - k)} {_num(x + radius - k)} {_num(y)} {_num(x + radius)} {_num(y)} c",
+            "h f",
+        ]))
+
+    def modules(self, matrix, x, y, module, fill):
+        # All runs go into one path and are filled with a single operator
+        self.ops.append(self._color(fill))
+        self.ops.append(" ".join(
+            f"{_num(x + c * module)} {_num(y + r * module)} {_num(n * module)} {_num(module)} re"
+            for r, c, n in module_runs(matrix)
+        ) + " f")
+
+    def image(self, img, x, y, w, h):
+        name = f"Im{len(self.images) + 1}"
+        self.images.append((name, img))
+        # The page is flipped to y-down, so images are drawn with a negative height
+        self.ops.append(f"q {_num(w)} 0 0 {_num(-h)} {_num(x)} {_num(y + h)} cm /{name} Do Q")
+
+    def text(self, x, y, text, size, fill="black", bold=False, anchor="middle"):
+        # The standard Type1 fonts only cover Latin-1, so emoji and symbols are dropped
+        text = text.encode("latin-1", "ignore").decode("latin-1").strip()
+        if not text:
+            return
+
+        width = sum(HELVETICA_WIDTHS[ord(ch) - 32] if 32 <= ord(ch) <= 126 else 556 for ch in text)
+        width = width / 1000 * size
+        if anchor == "middle":
+            x -= width / 2
+        elif anchor == "end":
+            x -= width
+
+        escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        font = "F2" if bold else "F1"
+        self.ops.append(
+            f"{self._color(fill)} BT /{font} {_num(size)} Tf 1 0 0 -1 {_num(x)} {_num(y + size * ASCENT)} Tm "
+            f"({escaped}) Tj ET"
+        )
+
+    def to_bytes(self):
+        page_w, page_h = self.width * self.scale, self.height * self.scale
+        flip = f"{self.scale:.6f} 0 0 {-self.scale:.6f} 0 {_num(page_h)} cm"
+        content = zlib.compress(("\n".join([flip] + self.ops)).encode("latin-1"), 9)
+
+        objects = []
+
+        def add(body):
+            objects.append(body)
+            return len(objects)
+
+        def stream(dictionary, data):
+            return b"<< " + dictionary + b" /Length %d >>\nstream\n" % len(data) + data + b"\nendstream"
+
+        catalog = add(None)
+        pages = add(None)
+        page = add(None)
+        contents = add(stream(b"/Filter /FlateDecode", content))
+        regular = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        bold = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+
+        xobjects = []
+        for name, img in self.images:
+            rgba = img.convert("RGBA")
+            smask = add(stream(
+                b"/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+                b"/BitsPerComponent 8 /Filter /FlateDecode" % rgba.size,
+                zlib.compress(rgba.getchannel("A").tobytes(), 9),
+            ))
+            image = add(stream(
+                b"/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+                b"/BitsPerComponent 8 /Filter /FlateDecode /SMask %d 0 R" % (*rgba.size, smask),
+                zlib.compress(rgba.convert("RGB").tobytes(), 9),
+            ))
+            xobjects.append(b"/%s %d 0 R" % (name.encode("ascii"), image))
+
+        objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages
+        objects[pages - 1] = b"<< /Type /Pages /Kids [%d 0 R] /Count 1 >>" % page
+        objects[page - 1] = (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> /XObject << %s >> >> >>"
+            % (pages, _num(page_w).encode(), _num(page_h).encode(), contents, regular, bold, b" ".join(xobjects))
+        )
+
+        out = io.BytesIO()
+        out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(out.tell())
+            out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+        xref = out.tell()
+        out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            out.write(b"%010d 00000 n \n" % offset)
+        out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref))
+        return out.getvalue()
+
+
+def new_canvas(fmt, width, height, background=None, page_width_mm=None):
+    """Create an SVG or PDF canvas by format name ("svg" or "pdf")"""
+    if fmt == "svg":
+        return SvgCanvas(width, height, background)
+    if fmt == "pdf":
+        return PdfCanvas(width, height, background, page_width_mm)
+    raise ValueError(f"Unsupported vector format: {fmt} (use svg or pdf)")
+
+
+def open_canvas(path, width, height, background=None, page_width_mm=None):
+    """Pick the SVG or PDF canvas from the output file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in (".svg", ".pdf"):
+        raise ValueError(f"Unsupported vector format: {ext} (use .svg or .pdf)")
+    return new_canvas(ext[1:], width, height, background, page_width_mm)
+
+
+def save_canvas(canvas, path):
+    with open(path, "wb") as f:
+        f.write(canvas.to_bytes())
+    return path
+
+
+def draw_qr(canvas, matrix, x, y, module, border=4, fill="black", back="white", radius=0, logo=None,
+            logo_size=None):
+    """Draw a code (quiet zone, modules and optional centered logo) at (x, y)"""
+    side = (len(matrix) + 2 * border) * module
+    if back:
+        canvas.rect(x, y, side, side, back, radius)
+    canvas.modules(matrix, x + border * module, y + border * module, module, fill)
+    if logo is not None:
+        logo_size = logo_size or side * 0.2
+        offset = (side - logo_size) / 2
+        canvas.image(logo, x + offset, y + offset, logo_size, logo_size)
+    return side
+
+
+def qr_canvas(fmt, data, style="classic", module=10, border=4, with_logo=True):
+    """Draw a single styled QR code on a new SVG or PDF canvas"""
+    from create_premium_qr import STYLE_COLORS, create_premium_logo
+
+    matrix = get_matrix(data, error_correction=qrcode.constants.ERROR_CORRECT_H)
+    side = (len(matrix) + 2 * border) * module
+    fill, back = STYLE_COLORS.get(style, STYLE_COLORS["classic"])
+
+    logo = None
+    if with_logo:
+        logo_style = "gradient" if style == "premium" else "modern" if style == "modern" else "glass"
+        logo = create_premium_logo(size=round(module * 200 / 12), style=logo_style)
+
+    canvas = new_canvas(fmt, side, side)
+    draw_qr(canvas, matrix, 0, 0, module, border, fill, back,
+            radius=module * 20 / 12 if style == "premium" else 0,
+            logo=logo, logo_size=module * 100 / 12)
+    return canvas
+
+
+def write_qr(path, data, style="classic", module=10, border=4, with_logo=True):
+    """Write a single styled QR code as SVG or PDF"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in (".svg", ".pdf"):
+        raise ValueError(f"Unsupported vector format: {ext} (use .svg or .pdf)")
+    return save_canvas(qr_canvas(ext[1:], data, style, module, border, with_logo), path)
+
+
+PORTFOLIO_CARD_SIZE = (800, 1000)
+
+
+def draw_portfolio_card(canvas, logo):
+    """Lay out generate_qr.create_portfolio_qr's 800 x 1000 card (the portfolio card template) on any canvas"""
+    from card_layout import load_templates
+    from generate_qr import DISPLAY_URL, PORTFOLIO_URL
+
+    matrix = get_matrix(PORTFOLIO_URL, error_correction=qrcode.constants.ERROR_CORRECT_H, compact=True)
+    template = load_templates()["portfolio"]
+    fields = {**template.get("defaults", {}), "url": DISPLAY_URL}
+
+    for spec in template["elements"]:
+        if spec["type"] == "image":
+            # Whole-pixel modules, centered in the slot like the PNG card
+            x, y, width, height = spec["box"]
+            module = min(width, height) // (len(matrix) + 8)
+            side = (len(matrix) + 8) * module
+            draw_qr(canvas, matrix, x + (width - side) / 2, y + (height - side) / 2, module,
+                    logo=logo, logo_size=80 * module / 10)
+        elif spec["type"] == "text":
+            lines = spec["text"]
+            left = spec.get("x", 0)
+            center = left + spec.get("width", PORTFOLIO_CARD_SIZE[0] - left) / 2
+            for i, line in enumerate([lines] if isinstance(lines, str) else lines):
+                canvas.text(center, spec["y"] + i * spec.get("line_height", 0), line.format_map(fields),
+                            spec.get("size", 18), spec.get("fill", "black"), bold=spec.get("font") == "sans-bold")
+    return canvas
+
+
+def write_portfolio_card(path, logo_path="logo.png", page_width_mm=None):
+    """Vector version of generate_qr.create_portfolio_qr (800 x 1000 card)"""
+    from generate_qr import create_logo
+
+    canvas = open_canvas(path, *PORTFOLIO_CARD_SIZE, "white", page_width_mm)
+    # Render the logo at 2x its placed size so it stays sharp in print
+    draw_portfolio_card(canvas, create_logo(size=160, logo_path=logo_path))
+    return save_canvas(canvas, path)
+
+
+def write_premium_card(path, qr_size=400, page_width_mm=None):
+    """Vector version of the single premium card (600 x 700)"""
+    from create_premium_qr import PREMIUM_URL, STYLE_COLORS, create_premium_logo
+
+    width, height = 600, 700
+    canvas = open_canvas(path, width, height, "#f8fafc", page_width_mm)
+
+    matrix = get_matrix(PREMIUM_URL, error_correction=qrcode.constants.ERROR_CORRECT_H)
+    box_size, margin = fit_box_size(len(matrix), qr_size)
+    fill, back = STYLE_COLORS["premium"]
+    scale = box_size / 12
+
+    x, y = (width - qr_size) / 2, 100
+    canvas.rect(x, y, qr_size, qr_size, back, radius=20 * scale)
+    logo = create_premium_logo(size=round(200 * scale), style="gradient")
+    draw_qr(canvas, matrix, x + margin, y + margin, box_size, fill=fill, back=None,
+            logo=logo, logo_size=100 * scale)
+
+    canvas.text(width / 2, 30, "Premium Portfolio QR", 48, "#1a365d")
+    canvas.text(width / 2, 520, PREMIUM_URL, 24, "#4a5568")
+
+    return save_canvas(canvas, path)
+
+
+if __name__ == "__main__":
+    for output in ("portfolio_qr_code_with_logo.svg", "portfolio_qr_code_with_logo.pdf"):
+        write_portfolio_card(output)
+        print(f"✅ Saved {output} ({os.path.getsize(output):,} bytes)")
+    for output in ("premium_portfolio_qr.svg", "premium_portfolio_qr.pdf"):
+        write_premium_card(output)
+        print(f"✅ Saved {output} ({os.path.getsize(output):,} bytes)")
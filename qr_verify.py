@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Logo Damage Verifier for QR Codes
+Samples a finished raster back onto its module grid, maps every damaged
+module to its codeword and Reed-Solomon block, and checks each block's
+errors against what the error correction level can recover
+"""
+
+import sys
+from functools import lru_cache
+
+import qrcode
+from qrcode import base
+from PIL import Image, ImageChops, ImageStat
+
+from qr_matrix import module_mask
+
+LEVEL_NAMES = {
+    qrcode.constants.ERROR_CORRECT_L: "L",
+    qrcode.constants.ERROR_CORRECT_M: "M",
+    qrcode.constants.ERROR_CORRECT_Q: "Q",
+    qrcode.constants.ERROR_CORRECT_H: "H",
+}
+
+# Misdecode-protection codewords (ISO 18004 table 9): these EC codewords
+# cannot be spent on corrections for the smallest symbols
+PROTECTION_CODEWORDS = {
+    (1, qrcode.constants.ERROR_CORRECT_L): 3,
+    (1, qrcode.constants.ERROR_CORRECT_M): 2,
+    (1, qrcode.constants.ERROR_CORRECT_Q): 1,
+    (1, qrcode.constants.ERROR_CORRECT_H): 1,
+    (2, qrcode.constants.ERROR_CORRECT_L): 2,
+    (3, qrcode.constants.ERROR_CORRECT_L): 1,
+}
+
+
+class QRVerificationError(ValueError):
+    """Raised when a composited code has an RS block damaged beyond its budget"""
+
+    def __init__(self, report):
+        self.report = report
+        super().__init__(format_report(report))
+
+
+@lru_cache(maxsize=None)
+def _function_layout(version):
+    """Return the blank module grid with function patterns filled in (None = data)"""
+    qr = qrcode.QRCode(version=version)
+    qr.modules_count = version * 4 + 17
+    qr.modules = [[None] * qr.modules_count for _ in range(qr.modules_count)]
+    qr.setup_position_probe_pattern(0, 0)
+    qr.setup_position_probe_pattern(qr.modules_count - 7, 0)
+    qr.setup_position_probe_pattern(0, qr.modules_count - 7)
+    qr.setup_position_adjust_pattern()
+    qr.setup_timing_pattern()
+    qr.setup_type_info(True, 0)
+    if version >= 7:
+        qr.setup_type_number(True)
+    return qr.modules
+
+
+def format_positions(count):
+    """The two copies of the 15-bit format information, in bit order"""
+    first = [(i if i < 6 else i + 1, 8) for i in range(8)] + [(8, 7 if i == 8 else 14 - i) for i in range(8, 15)]
+    second = [(8, count - 1 - i) for i in range(8)] + [(count - 15 + i, 8) for i in range(8, 15)]
+    return first, second
+
+
+def version_positions(count):
+    """The two copies of the 18-bit version information (versions 7+)"""
+    first = [(i // 3, i % 3 + count - 11) for i in range(18)]
+    second = [(i % 3 + count - 11, i // 3) for i in range(18)]
+    return first, second
+
+
+@lru_cache(maxsize=None)
+def codeword_layout(version, error_correction):
+    """Map each module to its RS block and codeword and describe the blocks
+
+    Returns (block_of_module, codeword_of_module, blocks): the first two are
+    indexed by row * count + col (-1 for function patterns and remainder
+    bits) and blocks is a list of (data_count, ec_count).
+    """
+    layout = _function_layout(version)
+    count = len(layout)
+
+    # Data bit order: two-column zigzag from the bottom right, skipping column 6
+    positions = []
+    upward = True
+    col = count - 1
+    while col > 0:
+        if col == 6:
+            col -= 1
+        rows = range(count - 1, -1, -1) if upward else range(count)
+        for row in rows:
+            for c in (col, col - 1):
+                if layout[row][c] is None:
+                    positions.append((row, c))
+        upward = not upward
+        col -= 2
+
+    # Codewords are interleaved across blocks: data first, then error correction
+    rs = base.rs_blocks(version, error_correction)
+    stream = []
+    for i in range(max(b.data_count for b in rs)):
+        stream.extend(index for index, b in enumerate(rs) if i < b.data_count)
+    for i in range(max(b.total_count - b.data_count for b in rs)):
+        stream.extend(index for index, b in enumerate(rs) if i < b.total_count - b.data_count)
+
+    block_of_module = [-1] * (count * count)
+    codeword_of_module = [-1] * (count * count)
+    for bit, (row, col) in enumerate(positions[:len(stream) * 8]):
+        block_of_module[row * count + col] = stream[bit // 8]
+        codeword_of_module[row * count + col] = bit // 8
+
+    blocks = [(b.data_count, b.total_count - b.data_count) for b in rs]
+    return tuple(block_of_module), tuple(codeword_of_module), blocks
+
+
+def sample_modules(img, count, origin, pitch):
+    """Sample one luminance value per module center with a single resize"""
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        flat = Image.new("RGBA", img.size, (255, 255, 255, 255))
+        flat.alpha_composite(img)
+        img = flat
+    gray = img.convert("L")
+
+    ox, oy = origin if isinstance(origin, tuple) else (origin, origin)
+    box = (ox, oy, ox + count * pitch, oy + count * pitch)
+    return gray.resize((count, count), Image.Resampling.NEAREST, box=box)
+
+
+def verify_raster(img, matrix, error_correction=qrcode.constants.ERROR_CORRECT_H, origin=None, pitch=None,
+                  border=4):
+    """Check a rendered code against its module grid and return a report dict
+
+    origin/pitch give the pixel position of the first module and the module
+    size; by default the image is assumed to be exactly the code plus a
+    border-module quiet zone.
+    """
+    count = len(matrix)
+    version = (count - 17) // 4
+    if pitch is None:
+        pitch = img.size[0] / (count + 2 * border)
+    if origin is None:
+        origin = border * pitch
+
+    samples = sample_modules(img, count, origin, pitch)
+    expected = module_mask(matrix, border=0)
+
+    # Threshold halfway between the typical dark and light module
+    dark = ImageStat.Stat(samples, expected).median[0]
+    light = ImageStat.Stat(samples, ImageChops.invert(expected)).median[0]
+    threshold = (dark + light) / 2
+    if dark >= light:
+        raise ValueError("Could not find contrast between dark and light modules")
+    observed = samples.point(lambda v: 255 if v < threshold else 0)
+
+    damage = ImageChops.difference(observed, expected).tobytes()
+    damaged = [i for i, v in enumerate(damage) if v]
+
+    block_of_module, codeword_of_module, blocks = codeword_layout(version, error_correction)
+    bad_codewords = [set() for _ in blocks]
+    for i in damaged:
+        if block_of_module[i] >= 0:
+            bad_codewords[block_of_module[i]].add(codeword_of_module[i])
+
+    protection = PROTECTION_CODEWORDS.get((version, error_correction), 0)
+    block_reports = []
+    for index, ((data_count, ec_count), bad) in enumerate(zip(blocks, bad_codewords)):
+        capacity = (ec_count - protection) // 2
+        block_reports.append({
+            "block": index,
+            "data_codewords": data_count,
+            "ec_codewords": ec_count,
+            "capacity": capacity,
+            "errors": len(bad),
+            "margin": capacity - len(bad),
+        })
+
+    damaged_set = set(damaged)
+
+    def copy_errors(copies):
+        return min(sum(1 for r, c in copy if r * count + c in damaged_set) for copy in copies)
+
+    format_errors = copy_errors(format_positions(count))
+    version_errors = copy_errors(version_positions(count)) if version >= 7 else 0
+
+    ok = all(b["margin"] >= 0 for b in block_reports) and format_errors <= 3 and version_errors <= 3
+    return {
+        "ok": ok,
+        "version": version,
+        "error_correction": LEVEL_NAMES.get(error_correction, error_correction),
+        "damaged_modules": len(damaged),
+        "format_errors": format_errors,
+        "version_errors": version_errors,
+        "min_margin": min(b["margin"] for b in block_reports),
+        "blocks": block_reports,
+    }
+
+
+def check_raster(img, matrix, error_correction=qrcode.constants.ERROR_CORRECT_H, origin=None, pitch=None,
+                 border=4):
+    """Like verify_raster, but raise QRVerificationError when any block is over budget"""
+    report = verify_raster(img, matrix, error_correction, origin, pitch, border)
+    if not report["ok"]:
+        raise QRVerificationError(report)
+    return report
+
+
+def format_report(report):
+    """Summarize a verification report on one line"""
+    status = "OK" if report["ok"] else "OVER BUDGET"
+    worst = min(report["blocks"], key=lambda b: b["margin"])
+    return (f"{status}: version {report['version']}-{report['error_correction']}, "
+            f"{report['damaged_modules']} damaged modules, worst block {worst['block']} has "
+            f"{worst['errors']}/{worst['capacity']} codeword errors, "
+            f"format info errors {report['format_errors']}")
+
+
+def main(argv=None):
+    """Verify a saved QR image: python qr_verify.py image.png --data URL"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check that a QR code with a logo is still within its ECC budget")
+    parser.add_argument("image")
+    parser.add_argument("--data", required=True, help="payload the code should contain")
+    parser.add_argument("--level", choices="LMQH", default="H", help="error correction level (default H)")
+    parser.add_argument("--box", help="x0,y0,x1,y1 of the code (with quiet zone) inside a larger image")
+    parser.add_argument("--border", type=int, default=4, help="quiet zone in modules (default 4)")
+    parser.add_argument("--keep-case", action="store_true",
+                        help="the code encodes --data exactly as given (the generators uppercase scheme and host)")
+    args = parser.parse_args(argv)
+
+    from qr_matrix import get_matrix
+
+    level = {v: k for k, v in LEVEL_NAMES.items()}[args.level]
+    matrix = get_matrix(args.data, error_correction=level, compact=not args.keep_case)
+
+    with Image.open(args.image) as img:
+        img.load()
+    if args.box:
+        img = img.crop(tuple(int(v) for v in args.box.split(",")))
+
+    try:
+        report = verify_raster(img, matrix, level, border=args.border)
+    except ValueError:
+        # Sampling a grid of the wrong size finds no dark/light split
+        version = (len(matrix) - 17) // 4
+        print(f"❌ {args.image} does not look like a {len(matrix)}x{len(matrix)} code "
+              f"(version {version}-{args.level} for this data); check --data, --keep-case, --box and --border")
+        return 1
+    print(("✅ " if report["ok"] else "❌ ") + format_report(report))
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Unified QR Tool
+One command for everything the separate scripts and .bat menus do:
+
+    python qrtool.py qr "https://lotriet.dev" --style modern -o card.png
+    python qrtool.py portfolio | premium | logos | batch | serve | verify | build | pyramid | poster | payload | stack | card | publish
+
+Pillow, qrcode and the generator scripts are only imported by the
+subcommand that needs them, and `qr` answers repeat requests from an
+on-disk cache, so --help and cache hits start in well under 100 ms
+(`python qrtool.py startup` checks that budget)
+"""
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Mirrors qr_server.py, which is not imported here to keep startup fast
+STYLES = ("premium", "modern", "colorful", "classic")
+FORMATS = ("png", "svg")
+MIN_SIZE, MAX_SIZE = 64, 4096
+LOGO_STYLES = ("coffee", "tech", "business", "creative")
+
+# Subcommands that hand their arguments straight to an existing script's main(argv)
+FORWARDED = {
+    "batch": ("batch_qr", "render a CSV/JSONL of attendees in parallel"),
+    "serve": ("qr_server", "run the local HTTP QR service"),
+    "verify": ("qr_verify", "check that a rendered code still decodes"),
+    "build": ("build_assets", "rebuild out-of-date generated files"),
+    "pyramid": ("qr_pyramid", "one code at every web and print size, with a srcset manifest"),
+    "poster": ("qr_poster", "banner-size portfolio card, streamed to PNG/TIFF in bands"),
+    "payload": ("qr_payload", "QR version per error correction level with optimal mode segmentation"),
+    "card": ("card_layout", "render a card from card_templates.json (portfolio, business, ...)"),
+    "stack": ("qr_stack", "time the batched stack compositor against one render per code"),
+    "publish": ("publish_assets", "copy web assets into wwwroot under content-hashed names"),
+}
+
+# Bump when render output changes in a way the source stamps below cannot see
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = os.environ.get("QR_CACHE_DIR", ".qr_cache")
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+STARTUP_BUDGET_MS = 100.0
+
+
+def code_stamp():
+    """(name, size, mtime) of every local script plus the Pillow and qrcode installs
+
+    Any edit to the generators or a library upgrade changes the stamp and so
+    misses the render cache, without hashing or importing anything
+    """
+    from importlib.util import find_spec
+
+    stamp = []
+    with os.scandir(ROOT) as entries:
+        for entry in entries:
+            if entry.name.endswith(".py") and entry.is_file():
+                st = entry.stat()
+                stamp.append((entry.name, st.st_size, st.st_mtime_ns))
+    for package in ("PIL", "qrcode"):
+        spec = find_spec(package)
+        if spec is not None and spec.origin:
+            st = os.stat(spec.origin)
+            stamp.append((package, st.st_size, st.st_mtime_ns))
+    return sorted(stamp)
+
+
+def cache_key(data, style, size, fmt):
+    import hashlib
+    import json
+
+    blob = json.dumps([CACHE_VERSION, data, style, size, fmt, code_stamp()])
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _prune(cache_dir, max_bytes):
+    """Delete the least recently used renders until the cache fits in max_bytes"""
+    with os.scandir(cache_dir) as entries:
+        files = [(entry.stat().st_atime, entry.stat().st_size, entry.path)
+                 for entry in entries if entry.is_file()]
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def render_cached(data, style="premium", size=None, fmt="png", cache_dir=DEFAULT_CACHE_DIR,
+                  max_bytes=DEFAULT_CACHE_BYTES):
+    """Return (body, hit) for one code, rendering only on a cache miss"""
+    path = None
+    if cache_dir:
+        path = os.path.join(cache_dir, f"{cache_key(data, style, size, fmt)}.{fmt}")
+        try:
+            with open(path, "rb") as f:
+                return f.read(), True
+        except OSError:
+            pass
+
+    from qr_server import render_payload
+
+    body = render_payload(data, style, size, fmt)
+    if path:
+        import tempfile
+
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+        _prune(cache_dir, max_bytes)
+    return body, False
+
+
+def cmd_qr(args):
+    output = args.output or f"qr_code.{args.fmt}"
+    body, hit = render_cached(args.data, args.style, args.size, args.fmt,
+                              cache_dir=None if args.no_cache else args.cache_dir)
+    with open(output, "wb") as f:
+        f.write(body)
+    print(f"✅ Saved {output} ({len(body):,} bytes{', cached' if hit else ''})")
+    return 0
+
+
+def cmd_portfolio(args):
+    from generate_qr import create_portfolio_qr
+
+    create_portfolio_qr(output_path=args.output, logo_path=args.logo)
+    return 0
+
+
+def cmd_premium(args):
+    from create_premium_qr import create_portfolio_qr_premium, create_style_review
+
+    if args.review:
+        create_style_review(output_path=args.review, workers=args.workers)
+    else:
+        create_portfolio_qr_premium(output_path=args.output, single_path=args.single, workers=args.workers)
+    return 0
+
+
+def cmd_logos(args):
+    import shutil
+
+    from create_advanced_logos import write_logo
+
+    if args.atlas:
+        from logo_registry import write_atlas
+
+        index = write_atlas(args.atlas)
+        print(f"✅ Atlas: {len(index['sprites'])} styles on {index['width']}x{index['height']} "
+              f"({index['bytes']:,} bytes): {args.atlas}")
+        return 0
+
+    for name in args.styles or LOGO_STYLES:
+        filename = f"logo_{name}.png"
+        report = write_logo(filename)
+        print(f"✅ Created: {filename} ({report['bytes']:,} bytes, {report['mode']})")
+    if args.use:
+        shutil.copyfile(f"logo_{args.use}.png", "logo.png")
+        print(f"✅ {args.use.capitalize()} logo selected as logo.png")
+    return 0
+
+
+def _size(value):
+    size = int(value)
+    if not MIN_SIZE <= size <= MAX_SIZE:
+        raise argparse.ArgumentTypeError(f"size must be between {MIN_SIZE} and {MAX_SIZE}")
+    return size
+
+
+def _logo_style(value):
+    if value not in LOGO_STYLES:
+        raise argparse.ArgumentTypeError(f"choose from {', '.join(LOGO_STYLES)}")
+    return value
+
+
+def _run(command, runs, env):
+    import subprocess
+    import time
+
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _imported(command, env):
+    """Top-level packages a command imports, from python -X importtime"""
+    import subprocess
+
+    result = subprocess.run([sys.executable, "-X", "importtime"] + command[1:], env=env, cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    return {line.rsplit("|", 1)[-1].strip().split(".")[0]
+            for line in result.stderr.splitlines() if line.startswith("import time:")}
+
+
+def startup_check(budget_ms=STARTUP_BUDGET_MS, runs=5):
+    """Time fresh interpreter runs of --help and a qr cache hit; return (ok, rows)"""
+    import tempfile
+
+    heavy = {"PIL", "qrcode", "asyncio", "qr_server", "create_premium_qr"}
+    script = os.path.join(ROOT, "qrtool.py")
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, QR_CACHE_DIR=os.path.join(tmp, "cache"))
+        output = os.path.join(tmp, "startup.png")
+        commands = {
+            "--help": [sys.executable, script, "--help"],
+            "qr --help": [sys.executable, script, "qr", "--help"],
+            "qr (cache hit)": [sys.executable, script, "qr", "https://lotriet.dev", "-o", output],
+        }
+        # Prime the cache so the timed qr runs are all hits
+        _run(commands["qr (cache hit)"], 1, env)
+        baseline = _run([sys.executable, "-c", "pass"], runs, env)
+
+        for name, command in commands.items():
+            ms = _run(command, runs, env)
+            leaked = sorted(heavy & _imported(command, env))
+            rows.append({"command": name, "ms": ms, "leaked": leaked,
+                         "ok": ms <= budget_ms and not leaked})
+    return all(row["ok"] for row in rows), rows, baseline
+
+
+def cmd_startup(args):
+    ok, rows, baseline = startup_check(args.budget, args.runs)
+    print(f"⏱️ Bare interpreter: {baseline:.1f} ms (best of {args.runs})")
+    for row in rows:
+        mark = "✅" if row["ok"] else "❌"
+        leaked = f"  imports {', '.join(row['leaked'])}" if row["leaked"] else ""
+        print(f"{mark} {row['command']:<16} {row['ms']:7.1f} ms{leaked}")
+    if not ok:
+        print(f"❌ Startup is over the {args.budget:g} ms budget or imports heavy modules eagerly")
+        return 1
+    print(f"✅ All commands start within {args.budget:g} ms")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="qrtool.py", description="QR codes and logos for the job fair site")
+    commands = parser.add_subparsers(dest="command", metavar="command", required=True)
+
+    qr = commands.add_parser("qr", help="one styled QR code (PNG or SVG), cached on disk")
+    qr.add_argument("data", help="text or URL to encode")
+    qr.add_argument("--style", choices=STYLES, default="premium")
+    qr.add_argument("--size", type=_size, default=None, help=f"pixels, {MIN_SIZE}-{MAX_SIZE}")
+    qr.add_argument("--fmt", choices=FORMATS, default="png")
+    qr.add_argument("-o", "--output", help="output file (default: qr_code.<fmt>)")
+    qr.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="render cache (default: .qr_cache)")
+    qr.add_argument("--no-cache", action="store_true", help="always render")
+    qr.set_defaults(func=cmd_qr)
+
+    portfolio = commands.add_parser("portfolio", help="portfolio card with logo.png in the center")
+    portfolio.add_argument("-o", "--output", default="portfolio_qr_code_with_logo.png")
+    portfolio.add_argument("--logo", default="logo.png")
+    portfolio.set_defaults(func=cmd_portfolio)
+
+    premium = commands.add_parser("premium", help="premium collection of four styles")
+    premium.add_argument("-o", "--output", default="premium_qr_collection.png")
+    premium.add_argument("--single", default="premium_portfolio_qr.png")
+    premium.add_argument("--review", nargs="?", const="premium_qr_review.png", metavar="PATH",
+                         help="instead write a sheet of every style and module treatment")
+    premium.add_argument("-w", "--workers", type=int, help="render processes (default: one per core)")
+    premium.set_defaults(func=cmd_premium)
+
+    logos = commands.add_parser("logos", help="render the logo styles")
+    logos.add_argument("styles", nargs="*", type=_logo_style, metavar="style",
+                       help=f"styles to render (default: all of {', '.join(LOGO_STYLES)})")
+    logos.add_argument("--use", choices=LOGO_STYLES, help="also copy this style to logo.png")
+    logos.add_argument("--atlas", nargs="?", const=os.path.join("wwwroot", "assets", "logo-atlas.png"), metavar="PNG",
+                       help="instead write every registered style into one sprite atlas with a JSON index")
+    logos.set_defaults(func=cmd_logos)
+
+    for name, (module, help_text) in FORWARDED.items():
+        forwarded = commands.add_parser(name, help=f"{help_text} (see {name} --help)", add_help=False)
+        forwarded.set_defaults(module=module)
+
+    startup = commands.add_parser("startup", help="check that --help and cache hits start fast")
+    startup.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS, help="milliseconds (default 100)")
+    startup.add_argument("--runs", type=int, default=5, help="runs per command, best is kept")
+    startup.set_defaults(func=cmd_startup)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+
+    if getattr(args, "module", None):
+        import importlib
+
+        # The script parses its own arguments and prints its own --help
+        sys.argv[0] = f"qrtool.py {args.command}"
+        return importlib.import_module(args.module).main(rest) or 0
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
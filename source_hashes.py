@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Source Hashes of Local Modules
+SHA-256 of files memoized on size and mtime, and the local modules a
+script imports (transitively, from its AST), shared by the incremental
+build (build_assets.py) and the logo render cache (logo_cache.py) so
+both see a code change the same way
+"""
+
+import ast
+import hashlib
+import os
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class FileHasher:
+    """SHA-256 of files, reusing the manifest's hash while size and mtime are unchanged"""
+
+    def __init__(self, known=None):
+        self.known = dict(known or {})
+
+    def digest(self, path):
+        try:
+            st = os.stat(os.path.join(ROOT, path))
+        except OSError:
+            self.known.pop(path, None)
+            return None
+
+        entry = self.known.get(path)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["sha256"]
+
+        h = hashlib.sha256()
+        with open(os.path.join(ROOT, path), "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+        self.known[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": h.hexdigest()}
+        return h.hexdigest()
+
+    def imports(self, path):
+        """Top-level module names a Python file imports, remembered with its hash"""
+        if self.digest(path) is None:
+            return []
+        entry = self.known[path]
+        if "imports" not in entry:
+            entry["imports"] = _imported_names(path)
+        return entry["imports"]
+
+
+def local_imports(module, hasher, _seen=None):
+    """Source files of a module and every local module it imports (transitively)"""
+    seen = set() if _seen is None else _seen
+    path = module + ".py"
+    if path in seen or not os.path.exists(os.path.join(ROOT, path)):
+        return seen
+    seen.add(path)
+    for name in hasher.imports(path):
+        local_imports(name, hasher, seen)
+    return seen
+
+
+def _imported_names(path):
+    with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+    return sorted(names)
+
+
+def source_digest(module, hasher=None):
+    """SHA-256 over the source of a module and every local module it imports"""
+    hasher = hasher or FileHasher()
+    h = hashlib.sha256()
+    for path in sorted(local_imports(module, hasher)):
+        h.update(f"{path}:{hasher.digest(path)}\n".encode("utf-8"))
+    return h.hexdigest()
@@ -67,6 +67,46 @@ window.addEventListener("DOMContentLoaded", () => {
   }
 });
 
+// Logo sprite atlas written by logo_registry.py: every logo style in one image request
+const LOGO_ATLAS_URL = "assets/dist/logo-atlas.89ae3ca79bf7.json";
+let logoAtlas = null;
+
+function loadLogoAtlas() {
+  logoAtlas =
+    logoAtlas ||
+    fetch(LOGO_ATLAS_URL)
+      .then((response) => response.json())
+      .then((index) => ({
+        ...index,
+        imageUrl: new URL(index.image, new URL(LOGO_ATLAS_URL, location.href)).href,
+      }));
+  return logoAtlas;
+}
+
+// A px x px element showing one logo style, cut from the atlas at the sharpest sprite size
+async function createLogoSprite(name, px) {
+  const atlas = await loadLogoAtlas();
+  const sprites = atlas.sprites[name];
+  if (!sprites) throw new Error(`No logo "${name}" in the atlas`);
+
+  const sizes = Object.keys(sprites).map(Number).sort((a, b) => a - b);
+  const wanted = px * (window.devicePixelRatio || 1);
+  const size = sizes.find((s) => s >= wanted) || sizes[sizes.length - 1];
+  const [x, y, w] = sprites[size];
+  const scale = px / w;
+
+  const sprite = document.createElement("div");
+  sprite.className = "logo-sprite";
+  sprite.title = atlas.styles[name] || name;
+  sprite.style.cssText = `
+    width: ${px}px;
+    height: ${px}px;
+    background: url("${atlas.imageUrl}") ${-x * scale}px ${-y * scale}px /
+      ${atlas.width * scale}px ${atlas.height * scale}px no-repeat;
+  `;
+  return sprite;
+}
+
 function addEnhancedLogoOverlay(qrContainer) {
   // Create logo container
   const logoContainer = document.createElement("div");
@@ -143,6 +183,12 @@ function addEnhancedLogoOverlay(qrContainer) {
   // Make QR container relative for absolute positioning
   qrContainer.style.position = "relative";
   qrContainer.appendChild(logoContainer);
+
+  // Swap in the premium gradient initials from the logo atlas (the same logo as the
+  // printed codes); the CSS circle above stays if the atlas cannot be loaded
+  createLogoSprite("gradient", 40)
+    .then((sprite) => logoContainer.replaceChildren(sprite))
+    .catch(() => {});
 }
 
 function addQRStyling(qrContainer) {